@@ -0,0 +1,352 @@
+"""
+Benchmark the preprocessing scripts and the dashboard's data functions on
+synthetic ITA data at several multiples of a real year.
+
+    python benchmarks/run_benchmarks.py --scales 1 10 100
+    python benchmarks/run_benchmarks.py --scales 1 --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --scales --page-log data/logs/page_runs.jsonl
+
+Every scale gets its own workspace with the raw yearly summaries and one year
+of case detail. The pipeline stages (from scripts/run_pipeline.py) run there
+in dependency order, each timed with the peak RSS of its process; each page
+data function runs in a fresh process, timed over several repeats with its
+peak memory from cold caches (Streamlit's and an empty disk result cache) and
+again with only the disk cache warm. A dashboard run log written with OSHA_DEBUG=1
+(see osha/instrument.py) can be summarized into the same report.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(REPO_ROOT)
+sys.path.append(os.path.join(REPO_ROOT, 'scripts'))
+from osha.instrument import aggregate_log
+from osha.panel import YEARS
+from osha.pipeline import expand
+from osha.synthetic import CASE_DETAIL_DTYPES, REAL_YEAR_CASES, REAL_YEAR_ROWS, write_case_detail, write_summary_year
+
+REPORT_PATH = 'benchmarks/report.json'
+RAW_SUMMARY_PATH = 'data/injury data/ITA Data CY {year}.csv'
+MERGE_INPUT_PATH = 'data/ITA Data CY {year}.csv'
+CASE_DETAIL_PATH = 'data/ITA Case Detail Data {year}.csv'
+
+# Measurements compared against a baseline report
+METRICS = ['seconds', 'seconds_warm', 'peak_mb']
+
+
+def generate(workdir, years, rows_per_year, cases, seed):
+    """
+    Write the synthetic raw files of one scale into workdir.
+    """
+    os.makedirs(os.path.join(workdir, 'data', 'injury data'), exist_ok=True)
+    start = time.perf_counter()
+    rows = 0
+    for year in years:
+        path = os.path.join(workdir, RAW_SUMMARY_PATH.format(year=year))
+        rows += write_summary_year(path, year, rows_per_year, seed)
+
+        # merge_summary_data.py reads the raw files from data/
+        merge_path = os.path.join(workdir, MERGE_INPUT_PATH.format(year=year))
+        try:
+            os.link(path, merge_path)
+        except OSError:
+            shutil.copyfile(path, merge_path)
+
+    case_path = os.path.join(workdir, CASE_DETAIL_PATH.format(year=years[-1]))
+    case_rows = write_case_detail(case_path, years[-1], cases, rows_per_year, seed)
+    return {
+        'seconds': round(time.perf_counter() - start, 3),
+        'summary_rows': rows,
+        'case_rows': case_rows,
+        'bytes': sum(os.path.getsize(p) for p in expand([os.path.join(workdir, 'data', '*.csv'),
+                                                         os.path.join(workdir, 'data', 'injury data', '*.csv')])),
+    }
+
+
+def peak_rss_mb(rusage):
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return round(rusage.ru_maxrss * scale / 2**20, 1)
+
+
+def run_script(command, workdir, log_path):
+    """
+    Run one command in workdir, returning its wall time, peak RSS and exit code.
+    """
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen(command, cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            _, status, rusage = os.wait4(proc.pid, 0)
+            returncode = os.waitstatus_to_exitcode(status)
+            peak = peak_rss_mb(rusage)
+        else:
+            returncode = proc.wait()
+            peak = None
+        seconds = time.perf_counter() - start
+    return {'seconds': round(seconds, 3), 'peak_mb': peak, 'returncode': returncode}
+
+
+def run_scripts(workdir):
+    """
+    Time every pipeline stage in dependency order; stages without their inputs are skipped.
+    """
+    from run_pipeline import build_stages
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        stages = build_stages()
+    finally:
+        os.chdir(cwd)
+
+    os.makedirs(os.path.join(workdir, 'logs'), exist_ok=True)
+    results, failed = [], set()
+    for stage in stages:
+        if failed.intersection(stage.deps):
+            results.append({'name': stage.name, 'status': 'blocked'})
+            failed.add(stage.name)
+            continue
+        if not stage.has_inputs(workdir):
+            continue
+        command = [sys.executable, os.path.join(REPO_ROOT, stage.script)] + stage.args
+        result = run_script(command, workdir, os.path.join(workdir, 'logs', f'{stage.name}.log'))
+        status = 'ok' if result.pop('returncode') == 0 else 'failed'
+        if status == 'failed':
+            failed.add(stage.name)
+        results.append({'name': stage.name, 'status': status, **result})
+        print(f'  {stage.name:<22} {status:<7} {result["seconds"]:>9.2f}s {result["peak_mb"] or 0:>9.1f} MB')
+    return results
+
+
+# Dashboard data functions measured at every scale
+PAGE_FUNCTIONS = [
+    'load_data', 'load_data_correlation', 'treemap_aggregation', 'business_summary', 'state_pivot',
+    'case_detail_read', 'seasonal_counts', 'correlation_matrix', 'load_data_all_years',
+]
+
+
+def page_function(name, year):
+    """
+    Callable running one dashboard data function for `year`.
+    """
+    import pandas as pd
+
+    from osha.correlation import correlation_matrix
+    from views import loaders
+
+    return {
+        'load_data': lambda: loaders.load_data(year),
+        'load_data_correlation': lambda: loaders.load_data(year, loaders.CORRELATION_COLUMNS),
+        'treemap_aggregation': lambda: loaders.load_treemap_data(year),
+        'business_summary': loaders.load_business_info,
+        'state_pivot': lambda: loaders.state_pivot(loaders.load_state_data()),
+        'case_detail_read': lambda: pd.read_csv(CASE_DETAIL_PATH.format(year=year), dtype=CASE_DETAIL_DTYPES),
+        'seasonal_counts': loaders.load_case_counts,
+        'correlation_matrix': lambda: correlation_matrix(loaders.load_correlations(), year),
+        'load_data_all_years': lambda: [
+            loaders.load_data(y, loaders.CORRELATION_COLUMNS) for y in YEARS if os.path.exists(loaders.year_inputs(y)[0])
+        ],
+    }[name]
+
+
+def measure_page(name, year, repeats):
+    """
+    Time one page data function (run inside the workspace).
+
+    seconds is the cold time: Streamlit's caches are cleared and the disk
+    result cache (osha/result_cache.py) points at an empty directory before
+    every run, so the workspace's cache filled by the warm_cache stage is not
+    read. seconds_warm is the time with only the disk cache holding the
+    results, as after a restart. peak_mb is the growth of the process's peak
+    RSS over its size after the imports (Arrow and NumPy buffers included);
+    traced_mb is the peak of the Python-level allocations seen by tracemalloc.
+    """
+    import resource
+
+    import streamlit as st
+
+    from osha.result_cache import use_cache
+
+    func = page_function(name, year)
+    baseline = resource.getrusage(resource.RUSAGE_SELF)
+
+    def timed():
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory(prefix='osha-cache-') as scratch:
+        times = []
+        for k in range(repeats):
+            use_cache(os.path.join(scratch, f'cold-{k}'))
+            times.append(timed())
+        peak = peak_rss_mb(resource.getrusage(resource.RUSAGE_SELF)) - peak_rss_mb(baseline)
+
+        # The last cold run left its results in the disk cache
+        warm_times = [timed() for _ in range(repeats)]
+
+        use_cache(os.path.join(scratch, 'traced'))
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        tracemalloc.start()
+        func()
+        _, traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'name': name,
+        'status': 'ok',
+        'seconds': round(min(times), 4),
+        'seconds_median': round(statistics.median(times), 4),
+        'seconds_warm': round(min(warm_times), 4),
+        'peak_mb': round(peak, 1),
+        'traced_mb': round(traced / 2**20, 1),
+    }
+
+
+def run_pages(workdir, year, repeats):
+    """
+    Measure every page data function, each in a fresh process with workdir as the data root.
+    """
+    results = []
+    for name in PAGE_FUNCTIONS:
+        output = os.path.join(workdir, f'page-{name}.json')
+        command = [sys.executable, os.path.abspath(__file__), '--page', name, '--page-year', str(year),
+                   '--repeats', str(repeats), '--output', output]
+        with open(os.path.join(workdir, 'logs', f'page-{name}.log'), 'w') as log:
+            proc = subprocess.run(command, cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        if proc.returncode == 0:
+            with open(output) as f:
+                result = json.load(f)
+            print(f'  {name:<22} ok      {result["seconds"]:>9.3f}s {result["peak_mb"]:>9.1f} MB'
+                  f'  (warm {result["seconds_warm"]:.3f}s)')
+        else:
+            result = {'name': name, 'status': 'failed'}
+            print(f'  {name:<22} failed  (see logs/page-{name}.log)')
+        results.append(result)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """
+    Measurements more than `tolerance` (a fraction) above the baseline report.
+    """
+    def entries(rep):
+        return {
+            (scale['scale'], kind, entry['name']): entry
+            for scale in rep['scales'] for kind in ('scripts', 'pages') for entry in scale[kind]
+        }
+
+    previous = entries(baseline)
+    regressions = []
+    for key, entry in entries(report).items():
+        if key not in previous:
+            continue
+        if entry.get('status') != 'ok':
+            if previous[key].get('status') == 'ok':
+                regressions.append({'scale': key[0], 'kind': key[1], 'name': key[2], 'metric': 'status',
+                                    'baseline': 'ok', 'current': entry.get('status')})
+            continue
+        for metric in METRICS:
+            old, new = previous[key].get(metric), entry.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append({'scale': key[0], 'kind': key[1], 'name': key[2], 'metric': metric,
+                                    'baseline': old, 'current': new, 'ratio': round(new / old, 2)})
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the pipeline scripts and page data functions on synthetic data.')
+    parser.add_argument('--scales', type=float, nargs='*', default=[1, 10, 100], help='multiples of a real year of data')
+    parser.add_argument('--base-rows', type=int, default=REAL_YEAR_ROWS, help='300A rows per year at scale 1')
+    parser.add_argument('--base-cases', type=int, default=REAL_YEAR_CASES, help='case-detail rows at scale 1')
+    parser.add_argument('--years', type=int, nargs='+', default=YEARS, help='years of summaries to generate')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic data')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs of each page data function')
+    parser.add_argument('--workdir', help='keep the generated workspaces here (default: a temporary directory)')
+    parser.add_argument('--output', default=REPORT_PATH, help='JSON report to write')
+    parser.add_argument('--page-log', help='dashboard run log to summarize per page')
+    parser.add_argument('--compare', help='baseline report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown or growth over the baseline')
+    parser.add_argument('--page', choices=PAGE_FUNCTIONS, help=argparse.SUPPRESS)
+    parser.add_argument('--page-year', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.page:
+        # Child mode: one page data function, run from inside the workspace
+        sys.path.insert(0, REPO_ROOT)
+        with open(args.output, 'w') as f:
+            json.dump(measure_page(args.page, args.page_year, args.repeats), f, indent=2)
+        sys.exit()
+
+    years = sorted(args.years)
+    root = args.workdir or tempfile.mkdtemp(prefix='osha-bench-')
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'base_rows': args.base_rows,
+        'base_cases': args.base_cases,
+        'years': years,
+        'seed': args.seed,
+        'scales': [],
+    }
+    try:
+        for scale in args.scales:
+            rows_per_year = int(args.base_rows * scale)
+            workdir = os.path.join(root, f'scale-{scale:g}')
+            shutil.rmtree(workdir, ignore_errors=True)
+            print(f'Scale {scale:g}x: {rows_per_year:,} rows per year in {workdir}')
+
+            generated = generate(workdir, years, rows_per_year, int(args.base_cases * scale), args.seed)
+            print(f'  generated {generated["summary_rows"]:,} summary and {generated["case_rows"]:,} case rows '
+                  f'in {generated["seconds"]:.1f}s')
+            scripts = run_scripts(workdir)
+            pages = run_pages(workdir, years[-1], args.repeats)
+            report['scales'].append({
+                'scale': scale, 'rows_per_year': rows_per_year, 'generate': generated,
+                'scripts': scripts, 'pages': pages,
+            })
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.page_log:
+        report['page_log'] = aggregate_log(args.page_log)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report['regressions'] = compare(report, json.load(f), args.tolerance)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Report saved to {args.output}')
+
+    for regression in report.get('regressions', []):
+        print(f'Regression: {regression["name"]} ({regression["kind"]}, {regression["scale"]:g}x) '
+              f'{regression["metric"]} {regression["baseline"]} -> {regression["current"]}')
+    if report.get('regressions'):
+        sys.exit(1)
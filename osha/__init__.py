@@ -0,0 +1 @@
+"""Shared data helpers for the OSHA dashboard and preprocessing scripts."""
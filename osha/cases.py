@@ -0,0 +1,275 @@
+"""Typed, year-partitioned store and seasonal aggregates for the ITA case-detail data."""
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from osha.cleaning import detect_encoding
+from osha.store import YearWriter
+
+# Raw case-detail files and what is built from them
+CASE_GLOB = 'data/ITA Case Detail Data *.csv'
+CASE_ROOT = 'data/case detail/parquet'
+CASE_MONTHLY_PATH = 'data/case_monthly_counts.parquet'
+CASE_WEEKDAY_PATH = 'data/case_weekday_counts.parquet'
+
+# Column types of the case-detail files (the dtype_spec of notebooks/case_eda.ipynb)
+CASE_DETAIL_DTYPES = {
+    'ID': str,
+    'establishment_ID': str,
+    'establishment_name': str,
+    'ein': str,
+    'company_name': str,
+    'street_address': str,
+    'city': str,
+    'state': str,
+    'zip_code': str,
+    'naics_code': str,
+    'naics_year': str,
+    'industry_description': str,
+    'establishment_type': str,
+    'size': str,
+    'annual_average_employees': float,
+    'total_hours_worked': float,
+    'case_number': str,
+    'date_of_incident': str,
+    'incident_outcome': str,
+    'dafw_num_away': float,
+    'djtr_num_tr': float,
+    'type_of_incident': str,
+    'time_started_work': str,
+    'time_of_incident': str,
+    'time_unknown': str,
+    'date_of_death': str,
+    'created_timestamp': str,
+    'year_of_filing': str,
+    'job_title': str,
+    'SOC_code': str,
+    'SOC_description': str,
+    'incident_location': str,
+    'incident_description': str,
+    'nar_before_incident': str,
+    'nar_what_happened': str,
+    'nar_injury_illness': str,
+    'nar_object_substance': str
+}
+
+# Incident dates are written as month/day/year
+DATE_FORMAT = '%m/%d/%Y'
+DATE_COLUMNS = ['date_of_incident', 'date_of_death']
+
+CATEGORICAL_COLUMNS = [
+    'state', 'naics_code', 'naics_year', 'size', 'establishment_type', 'incident_outcome', 'type_of_incident',
+    'time_unknown'
+]
+FLOAT32_COLUMNS = ['annual_average_employees', 'dafw_num_away', 'djtr_num_tr']
+ID_COLUMNS = ['id', 'establishment_id']
+
+# Parquet type of every column to_case_typed converts; any other column is stored as text
+CASE_STORE_TYPES = {
+    **{col: pa.timestamp('ns') for col in DATE_COLUMNS},
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+    **{col: pa.float32() for col in FLOAT32_COLUMNS},
+    'total_hours_worked': pa.float64(),
+    **{col: pa.int64() for col in ID_COLUMNS},
+    'year_filing_for': pa.int16(),
+}
+
+INCIDENT_OUTCOMES = {'1': 'Death', '2': 'Days away from work', '3': 'Job transfer or restriction', '4': 'Other recordable'}
+INCIDENT_TYPES = {
+    '1': 'Injury', '2': 'Skin disorder', '3': 'Respiratory condition', '4': 'Poisoning', '5': 'Hearing loss',
+    '6': 'All other illnesses'
+}
+
+# Dimensions of the precomputed counts
+COUNT_DIMENSIONS = ['state', 'naics_prefix', 'incident_outcome', 'type_of_incident']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def read_dtypes(path, encoding):
+    """
+    dtype mapping for one file's header (column names differ in case between releases).
+    """
+    lower = {name.lower(): dtype for name, dtype in CASE_DETAIL_DTYPES.items()}
+    header = pd.read_csv(path, encoding=encoding, nrows=0).columns
+    return {col: lower.get(col.lower(), str) for col in header}
+
+
+def parse_dates(values, date_format=DATE_FORMAT):
+    """
+    Parse dates with a fixed format, falling back to ISO dates for values that do not match.
+    """
+    parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+    missed = parsed.isna() & values.notna()
+    if missed.any():
+        parsed[missed] = pd.to_datetime(values[missed], format='ISO8601', errors='coerce')
+    return parsed
+
+
+def to_case_typed(df):
+    """
+    Convert a raw case-detail chunk to the store's dtypes.
+
+    Column names are lower-cased (year_of_filing becomes year_filing_for, as in
+    the summary data), incident and death dates are parsed and codes are
+    zero-padded.
+    """
+    df = df.rename(columns=str.lower).rename(columns={'year_of_filing': 'year_filing_for'})
+
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_dates(df[col])
+
+    if 'zip_code' in df.columns:
+        df['zip_code'] = df['zip_code'].str.zfill(5)
+    if 'naics_code' in df.columns:
+        df['naics_code'] = df['naics_code'].str.zfill(6)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    if 'year_filing_for' in df.columns:
+        df['year_filing_for'] = pd.to_numeric(df['year_filing_for'], errors='coerce', downcast='integer')
+    return df
+
+
+def count_cases(df):
+    """
+    Monthly and weekday case counts of a typed chunk by state, 2-digit NAICS
+    prefix, incident outcome and incident type. Both are sums, so chunk
+    results add up.
+
+    Returns:
+    - (monthly, weekday) DataFrames; monthly also sums the days away and
+      days of job transfer or restriction.
+    """
+    dated = df[df['date_of_incident'].notna()]
+    dims = pd.DataFrame({
+        'state': dated['state'].astype(str),
+        'naics_prefix': dated['naics_code'].astype(str).str[:2],
+        'incident_outcome': dated['incident_outcome'].astype(str),
+        'type_of_incident': dated['type_of_incident'].astype(str),
+    })
+    dates = dated['date_of_incident']
+
+    monthly = dims.assign(
+        month=dates.dt.to_period('M').dt.to_timestamp(),
+        cases=1,
+        dafw_days=dated['dafw_num_away'].fillna(0).to_numpy(),
+        djtr_days=dated['djtr_num_tr'].fillna(0).to_numpy(),
+    ).groupby(['month'] + COUNT_DIMENSIONS, as_index=False)[['cases', 'dafw_days', 'djtr_days']].sum()
+
+    weekday = dims.assign(weekday=dates.dt.dayofweek, cases=1).groupby(
+        ['weekday'] + COUNT_DIMENSIONS, as_index=False
+    )['cases'].sum()
+    return monthly, weekday
+
+
+def _combine(parts, keys, measures):
+    combined = pd.concat(parts, ignore_index=True).groupby(keys, as_index=False)[measures].sum()
+    for col in COUNT_DIMENSIONS:
+        combined[col] = combined[col].astype('category')
+    combined['cases'] = combined['cases'].astype('int64')
+    return combined
+
+
+def ingest_case_files(paths, root=CASE_ROOT, chunk_size=500_000):
+    """
+    Stream case-detail CSVs into the store and compute their seasonal counts.
+
+    Every chunk is typed and appended to the partition of its filing year;
+    only the per-chunk counts are kept in memory.
+
+    Parameters:
+    - paths: Raw case-detail CSV files.
+    - root: Root directory of the store (one directory per filing year).
+    - chunk_size: Number of rows read per chunk.
+
+    Returns:
+    - (monthly, weekday, rows) with the combined counts and rows written per year.
+    """
+    writers = {}
+    monthly_parts, weekday_parts = [], []
+    rows = {}
+    try:
+        for path in paths:
+            encoding = detect_encoding(path)
+            dtypes = read_dtypes(path, encoding)
+            for chunk in pd.read_csv(path, encoding=encoding, dtype=dtypes, chunksize=chunk_size):
+                chunk = to_case_typed(chunk)
+                for year, part in chunk.groupby('year_filing_for', sort=False):
+                    year = int(year)
+                    if year not in writers:
+                        writers[year] = YearWriter(year, root, convert=None, types=CASE_STORE_TYPES)
+                    writers[year].write(part)
+                    rows[year] = rows.get(year, 0) + len(part)
+
+                monthly, weekday = count_cases(chunk)
+                monthly_parts.append(monthly)
+                weekday_parts.append(weekday)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    monthly = _combine(monthly_parts, ['month'] + COUNT_DIMENSIONS, ['cases', 'dafw_days', 'djtr_days'])
+    weekday = _combine(weekday_parts, ['weekday'] + COUNT_DIMENSIONS, ['cases'])
+    weekday['weekday'] = weekday['weekday'].astype('int8')
+    return monthly, weekday, rows
+
+
+def load_case_counts(monthly_path=CASE_MONTHLY_PATH, weekday_path=CASE_WEEKDAY_PATH):
+    """
+    Precomputed monthly and weekday counts, or None if they have not been built.
+    """
+    if not (os.path.exists(monthly_path) and os.path.exists(weekday_path)):
+        return None
+    return pd.read_parquet(monthly_path), pd.read_parquet(weekday_path)
+
+
+def filter_counts(counts, states=None, sectors=None, outcomes=None, types=None):
+    """
+    Rows of a count table matching the selections (None or empty keeps everything).
+    Sectors are NAICS sector nodes (see osha.naics.sector_of).
+    """
+    from osha.naics import sector_of
+
+    keep = pd.Series(True, index=counts.index)
+    if states:
+        keep &= counts['state'].isin(states)
+    if sectors:
+        keep &= sector_of(counts['naics_prefix'].astype(str)).isin(sectors).to_numpy()
+    if outcomes:
+        keep &= counts['incident_outcome'].isin(outcomes)
+    if types:
+        keep &= counts['type_of_incident'].isin(types)
+    return counts[keep]
+
+
+def seasonal_index(monthly):
+    """
+    Cases per day in each calendar month relative to the average day (1.0 = no
+    seasonal effect), so months of different lengths compare fairly.
+
+    Parameters:
+    - monthly: Monthly count rows (possibly filtered).
+
+    Returns:
+    - DataFrame with month_of_year (1-12), cases, cases_per_day and seasonal_index.
+    """
+    series = monthly.groupby('month')['cases'].sum()
+    per_day = series / series.index.days_in_month
+    by_month = pd.DataFrame({
+        'cases': series.groupby(series.index.month).sum(),
+        'cases_per_day': per_day.groupby(per_day.index.month).mean(),
+    }).rename_axis('month_of_year').reset_index()
+    by_month['seasonal_index'] = by_month['cases_per_day'] / per_day.mean()
+    return by_month
@@ -0,0 +1,270 @@
+"""Validity rules and a bounded-memory chunked engine for cleaning ITA CSVs."""
+import codecs
+import os
+
+import numpy as np
+import pandas as pd
+
+ENCODINGS = ['utf-8', 'ISO-8859-1', 'cp1252']
+
+# Rows missing any of these are dropped
+REQUIRED_COLUMNS = [
+    'establishment_name', 'street_address', 'city', 'state', 'zip_code', 'naics_code', 
+    'annual_average_employees', 'total_hours_worked', 'total_deaths', 'total_dafw_cases', 
+    'total_djtr_cases', 'total_other_cases', 'total_dafw_days', 'total_djtr_days', 'total_injuries', 
+    'total_skin_disorders', 'total_respiratory_conditions', 'total_poisonings', 'total_hearing_loss', 
+    'total_other_illnesses', 'establishment_id', 'size', 'year_filing_for', 'created_timestamp'
+]
+
+NUMERIC_COLUMNS = [
+    'annual_average_employees', 'total_hours_worked', 'total_deaths', 
+    'total_dafw_cases', 'total_djtr_cases', 'total_other_cases', 
+    'total_dafw_days', 'total_djtr_days', 'total_injuries', 
+    'total_skin_disorders', 'total_respiratory_conditions', 
+    'total_poisonings', 'total_hearing_loss', 'total_other_illnesses'
+]
+
+ILLNESS_COLUMNS = [
+    'total_skin_disorders', 'total_respiratory_conditions', 'total_poisonings',
+    'total_hearing_loss', 'total_other_illnesses'
+]
+
+SAMPLE_BYTES = 1 << 20
+
+
+def detect_encoding(file_path, sample_bytes=SAMPLE_BYTES, samples=4):
+    """
+    Pick the first encoding in ENCODINGS that decodes byte samples of the file.
+
+    Samples are taken from the start, the end and evenly spaced points in
+    between, so the file is only partially read and the result is a first
+    guess (see candidate_encodings).
+
+    Parameters:
+    - file_path: File to inspect.
+    - sample_bytes: Size of each sample.
+    - samples: Number of samples taken across the file.
+
+    Returns:
+    - Name of the encoding.
+    """
+    size = os.path.getsize(file_path)
+    offsets = sorted({int(i * max(size - sample_bytes, 0) / max(samples - 1, 1)) for i in range(samples)})
+    with open(file_path, 'rb') as f:
+        blocks = []
+        for offset in offsets:
+            f.seek(offset)
+            blocks.append(f.read(sample_bytes))
+
+    for encoding in ENCODINGS:
+        try:
+            for offset, block in zip(offsets, blocks):
+                decoder = codecs.getincrementaldecoder(encoding)()
+                # Samples starting mid-file may begin inside a multi-byte character
+                if offset and encoding == 'utf-8':
+                    block = block.lstrip(bytes(range(0x80, 0xC0)))
+                decoder.decode(block, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("Failed to read the file with available encodings")
+
+
+def candidate_encodings(file_path):
+    """
+    Encodings to try for a full read of the file, in order.
+
+    The sampled guess of detect_encoding comes first, followed by the later
+    entries of ENCODINGS, since a byte outside the samples can still fail to
+    decode with the guess.
+    """
+    guess = detect_encoding(file_path)
+    return ENCODINGS[ENCODINGS.index(guess):]
+
+
+def read_csv_any_encoding(file_path, **kwargs):
+    """
+    Read a whole CSV, trying each of candidate_encodings until one decodes it.
+    """
+    for encoding in candidate_encodings(file_path):
+        try:
+            return pd.read_csv(file_path, encoding=encoding, **kwargs)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("Failed to read the file with available encodings")
+
+
+def clean_frame(df):
+    """
+    Apply every validity rule to a frame in one combined mask.
+
+    Only rules whose columns are present are applied, so case-detail files
+    (which share the employee/hours columns) can go through the same engine.
+
+    Parameters:
+    - df: Raw ITA DataFrame (or chunk), already de-duplicated.
+
+    Returns:
+    - The valid rows, with numeric columns coerced and codes zero-padded.
+    """
+    required = [c for c in REQUIRED_COLUMNS if c in df.columns]
+    mask = df[required].notna().all(axis=1).to_numpy(copy=True)
+
+    numeric = {
+        col: pd.to_numeric(df[col], errors='coerce').to_numpy()
+        for col in NUMERIC_COLUMNS if col in df.columns
+    }
+
+    with np.errstate(invalid='ignore'):
+        if 'total_injuries' in numeric and 'annual_average_employees' in numeric:
+            # No more injuries than annual average employees
+            mask &= numeric['total_injuries'] <= numeric['annual_average_employees']
+
+        if 'total_hours_worked' in numeric and 'annual_average_employees' in numeric:
+            # Hours worked between a quarter and double the expected hours, and positive
+            hours = numeric['total_hours_worked']
+            expected_hours_worked = numeric['annual_average_employees'] * 40 * 52
+            mask &= (hours >= 0.25 * expected_hours_worked) & (hours <= 2 * expected_hours_worked)
+            mask &= hours > 0
+
+        if 'total_injuries' in numeric and all(c in numeric for c in ILLNESS_COLUMNS):
+            # Logical consistency of the injury and illness counts
+            mask &= numeric['total_injuries'] >= sum(numeric[c] for c in ILLNESS_COLUMNS)
+
+    cleaned = df[mask].copy()
+    for col, values in numeric.items():
+        cleaned[col] = values[mask]
+
+    # Correct data formatting
+    if 'zip_code' in cleaned.columns:
+        cleaned['zip_code'] = cleaned['zip_code'].astype(str).str.zfill(5)
+    if 'naics_code' in cleaned.columns:
+        cleaned['naics_code'] = cleaned['naics_code'].astype(str).str.zfill(6)
+    return cleaned
+
+
+def estimate_chunk_rows(file_path, encoding, memory_budget_mb, sample_rows=2000, overhead=4):
+    """
+    Number of rows per chunk that keeps the working set near the memory budget.
+
+    Parameters:
+    - file_path: CSV file to be cleaned.
+    - encoding: Encoding of the file.
+    - memory_budget_mb: Target peak memory for one chunk and its working copies.
+    - sample_rows: Rows read to estimate the in-memory size of a row.
+    - overhead: Working copies made per chunk while cleaning.
+
+    Returns:
+    - Rows per chunk (at least 1,000).
+    """
+    sample = pd.read_csv(file_path, encoding=encoding, dtype=str, nrows=sample_rows)
+    bytes_per_row = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1)
+    return max(int(memory_budget_mb * 2**20 / (bytes_per_row * overhead)), 1000)
+
+
+class RowHashSet:
+    """
+    Set of 64-bit row hashes for de-duplicating across chunks.
+
+    Hashes are kept in one sorted array (8 bytes per distinct row); lookups are
+    binary searches and new hashes are merged in place, so the seen set is
+    never re-sorted.
+    """
+
+    def __init__(self):
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self._seen)
+
+    def first_occurrences(self, df):
+        """
+        Mask of rows not seen in this chunk or any earlier one, and record them.
+        """
+        return self.first_hashes(pd.util.hash_pandas_object(df, index=False, categorize=False).to_numpy())
+
+    def first_hashes(self, hashes):
+        """
+        Mask of row hashes not seen in this batch or any earlier one, and record them.
+        """
+        mask = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(self._seen):
+            pos = np.searchsorted(self._seen, hashes)
+            mask &= self._seen[np.minimum(pos, len(self._seen) - 1)] != hashes
+        new = np.sort(hashes[mask])
+        self._seen = np.insert(self._seen, np.searchsorted(self._seen, new), new)
+        return mask
+
+
+# Hash standing in for a missing value in arrow_row_hashes
+NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+def arrow_row_hashes(table):
+    """
+    64-bit hash of every row of an Arrow table.
+
+    Each column is dictionary-encoded by Arrow and only its distinct values are
+    hashed, which is several times faster than hashing a pandas copy of the
+    table; nulls hash as NULL_HASH.
+    """
+    import pyarrow.compute as pc
+
+    combined = np.zeros(len(table), dtype=np.uint64)
+    for column in table.columns:
+        encoded = pc.dictionary_encode(column.combine_chunks())
+        values = pd.util.hash_array(encoded.dictionary.to_numpy(zero_copy_only=False), categorize=False)
+        indices = pc.fill_null(encoded.indices, len(encoded.dictionary)).to_numpy()
+        combined = (combined * np.uint64(1_000_003)) ^ np.append(values, NULL_HASH)[indices]
+    return combined
+
+
+def clean_csv_chunked(file_path, output_path, memory_budget_mb=512, chunk_rows=None, on_chunk=None,
+                      on_restart=None):
+    """
+    Clean a CSV in bounded memory, streaming the valid rows to output_path.
+
+    The encoding is guessed from byte samples, every chunk is read as text (so
+    duplicates hash the same in every chunk), de-duplicated against earlier
+    chunks and filtered with clean_frame. If a chunk fails to decode, the file
+    is cleaned again from the start with the next encoding.
+
+    Parameters:
+    - file_path: Raw CSV file.
+    - output_path: Cleaned CSV file to write (overwritten).
+    - memory_budget_mb: Target peak memory used to size the chunks.
+    - chunk_rows: Rows per chunk, overriding the memory-based estimate.
+    - on_chunk: Optional function called with each cleaned chunk.
+    - on_restart: Optional function called before starting over with another
+      encoding, to discard the chunks already passed to on_chunk.
+
+    Returns:
+    - Dict with rows_read and rows_written.
+    """
+    encodings = candidate_encodings(file_path)
+    if chunk_rows is None:
+        chunk_rows = estimate_chunk_rows(file_path, encodings[0], memory_budget_mb)
+
+    for attempt, encoding in enumerate(encodings):
+        if attempt and on_restart is not None:
+            on_restart()
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        seen = RowHashSet()
+        rows_read = 0
+        rows_written = 0
+        try:
+            for chunk in pd.read_csv(file_path, encoding=encoding, dtype=str, chunksize=chunk_rows):
+                cleaned = clean_frame(chunk[seen.first_occurrences(chunk)])
+                # The first chunk writes the header, even when none of its rows are kept
+                cleaned.to_csv(output_path, mode='a', header=rows_read == 0, index=False)
+                if on_chunk is not None:
+                    on_chunk(cleaned)
+                rows_read += len(chunk)
+                rows_written += len(cleaned)
+        except UnicodeDecodeError:
+            continue
+        return {'rows_read': rows_read, 'rows_written': rows_written}
+
+    raise ValueError("Failed to read the file with available encodings")
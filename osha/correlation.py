@@ -0,0 +1,110 @@
+"""Precomputed pairwise correlations of the establishment measures, per year."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from osha.cleaning import NUMERIC_COLUMNS
+
+CORRELATION_PATH = 'data/correlations.parquet'
+
+# Measures correlated with each other (the numeric columns of the Correlation page)
+CORRELATION_MEASURES = NUMERIC_COLUMNS + ['injury_rate']
+
+# Column -> display name of each coefficient
+METHODS = {
+    'pearson': 'Pearson',
+    'pearson_log1p': 'Pearson (log1p)',
+    'spearman': 'Spearman',
+}
+
+
+def injured_rows(df):
+    """
+    Rows the Correlation page analyses: establishments with injuries and a
+    known employee count and injury rate.
+    """
+    return df.loc[injured_mask(df)]
+
+
+def injured_mask(df):
+    """
+    Boolean Series of the rows injured_rows keeps.
+    """
+    return (df['total_injuries'] != 0) & df['annual_average_employees'].notna() & df['injury_rate'].notna()
+
+
+def year_correlations(df, year, columns=CORRELATION_MEASURES):
+    """
+    Every pairwise coefficient of one year's measures.
+
+    Coefficients use the rows where both values are finite (infinite injury
+    rates count as missing); Spearman is the Pearson correlation of ranks.
+
+    Parameters:
+    - df: Rows to correlate (see injured_rows).
+    - year: Calendar year.
+    - columns: Measures to correlate; those missing from df are skipped.
+
+    Returns:
+    - One row per ordered pair (x, y), diagonal included, with the METHODS
+      coefficients and the pair count.
+    """
+    columns = [c for c in dict.fromkeys(columns) if c in df.columns]
+    values = df[columns].astype('float64').replace([np.inf, -np.inf], np.nan)
+    present = values.notna().to_numpy(dtype='float64')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        matrices = {
+            'pearson': values.corr(method='pearson'),
+            'pearson_log1p': np.log1p(values).corr(method='pearson'),
+            'spearman': values.corr(method='spearman'),
+        }
+
+    table = pd.DataFrame({
+        'year': np.int16(year),
+        'x': np.repeat(columns, len(columns)),
+        'y': np.tile(columns, len(columns)),
+    })
+    for method, matrix in matrices.items():
+        table[method] = matrix.to_numpy().ravel().astype('float32')
+    table['pairs'] = (present.T @ present).ravel().astype('int32')
+    return table
+
+
+def finalize_correlations(year_tables):
+    """
+    Concatenate the per-year tables, storing the column names as categories.
+    """
+    table = pd.concat(year_tables, ignore_index=True)
+    for col in ['x', 'y']:
+        table[col] = table[col].astype('category')
+    return table
+
+
+def load_correlations(path=CORRELATION_PATH):
+    """
+    Precomputed coefficients, or None if they have not been built.
+    """
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def lookup(table, year, x, y):
+    """
+    Coefficients and pair count of one pair, or None if the table does not have it.
+    """
+    if table is None:
+        return None
+    match = table[(table['year'] == year) & (table['x'] == x) & (table['y'] == y)]
+    return None if match.empty else match.iloc[0]
+
+
+def correlation_matrix(table, year, value='pearson'):
+    """
+    Square x by y matrix of one coefficient (or 'pairs') for one year, in
+    CORRELATION_MEASURES order.
+    """
+    rows = table[table['year'] == year]
+    matrix = rows.pivot(index='x', columns='y', values=value)
+    order = [c for c in CORRELATION_MEASURES if c in matrix.index]
+    return matrix.reindex(index=order, columns=order)
@@ -0,0 +1,187 @@
+"""Additive rollup cube: year x state x NAICS prefix (2-6 digits) x size x injured."""
+import pandas as pd
+
+from osha.correlation import injured_mask
+
+CUBE_PATH = 'data/rollup_cube.parquet'
+
+NAICS_LEVELS = [2, 3, 4, 5, 6]
+
+# injured: whether the establishments had injuries (the rows correlation.injured_rows keeps)
+DIMENSIONS = ['year', 'state', 'naics_level', 'naics_prefix', 'size', 'injured']
+
+# Valid US state abbreviations
+US_STATES = [
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 
+    'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 
+    'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
+]
+
+# Source column -> summed measure
+MEASURES = {
+    'annual_average_employees': 'employees',
+    'total_hours_worked': 'hours_worked',
+    'total_injuries': 'injuries',
+    'total_dafw_cases': 'dafw_cases',
+    'total_djtr_cases': 'djtr_cases',
+    'total_dafw_days': 'dafw_days',
+    'total_djtr_days': 'djtr_days',
+    'total_skin_disorders': 'skin_disorders',
+    'total_respiratory_conditions': 'respiratory_conditions',
+    'total_poisonings': 'poisonings',
+    'total_hearing_loss': 'hearing_loss',
+    'total_other_illnesses': 'other_illnesses',
+}
+
+SUM_COLUMNS = ['establishments'] + list(MEASURES.values())
+
+# Columns read from the yearly store to build the cube
+SOURCE_COLUMNS = ['state', 'naics_code', 'size', 'industry_description'] + list(MEASURES)
+
+
+def build_year_cube(df, year):
+    """
+    Sum one year of cleaned data over every NAICS level.
+
+    Parameters:
+    - df: Cleaned data for the year (SOURCE_COLUMNS).
+    - year: Calendar year.
+
+    Returns:
+    - Cube rows for the year, with the 6-digit industry description attached.
+    """
+    base = pd.DataFrame({
+        'state': df['state'].astype(str).str.upper(),
+        'naics_code': df['naics_code'].astype(str).str.zfill(6),
+        'size': df['size'].astype(str),
+        'establishments': 1,
+    })
+    for source, measure in MEASURES.items():
+        base[measure] = pd.to_numeric(df[source], errors='coerce').astype('float64').to_numpy()
+    base['injured'] = injured_mask(pd.DataFrame({
+        'total_injuries': base['injuries'],
+        'annual_average_employees': base['employees'],
+        'injury_rate': base['injuries'] / base['employees'],
+    }))
+
+    levels = []
+    for level in NAICS_LEVELS:
+        grouped = base.assign(naics_prefix=base['naics_code'].str[:level]).groupby(
+            ['state', 'naics_prefix', 'size', 'injured'], observed=True
+        )[SUM_COLUMNS].sum().reset_index()
+        grouped.insert(1, 'naics_level', level)
+        levels.append(grouped)
+
+    cube = pd.concat(levels, ignore_index=True)
+    cube.insert(0, 'year', year)
+
+    # Most common description of each 6-digit code
+    descriptions = (
+        pd.DataFrame({'naics_prefix': base['naics_code'], 'industry_description': df['industry_description'].to_numpy()})
+        .dropna()
+        .value_counts()
+        .reset_index()
+        .drop_duplicates('naics_prefix')
+        .set_index('naics_prefix')['industry_description']
+    )
+    cube['industry_description'] = cube['naics_prefix'].map(descriptions).where(cube['naics_level'] == 6)
+    return cube
+
+
+def finalize_cube(year_cubes):
+    """
+    Stack per-year cubes, set compact dtypes and add the derived rates.
+    """
+    cube = pd.concat(year_cubes, ignore_index=True).sort_values(DIMENSIONS, ignore_index=True)
+    cube['year'] = cube['year'].astype('int16')
+    cube['naics_level'] = cube['naics_level'].astype('int8')
+    for col in ['state', 'naics_prefix', 'size', 'industry_description']:
+        cube[col] = cube[col].astype('category')
+    cube['establishments'] = cube['establishments'].astype('int32')
+    return add_rates(cube)
+
+
+def add_rates(df):
+    """
+    Derived rates from summed measures (recompute after any further grouping).
+
+    - injury_rate: injuries per average employee.
+    - injuries_per_200k_hours: injuries per 100 full-time workers per year.
+    - dart_rate: DAFW + DJTR cases per 200,000 hours.
+    - dafw_days_per_case: average days away per DAFW case.
+    """
+    df['injury_rate'] = df['injuries'] / df['employees']
+    df['injuries_per_200k_hours'] = df['injuries'] * 200_000 / df['hours_worked']
+    df['dart_rate'] = (df['dafw_cases'] + df['djtr_cases']) * 200_000 / df['hours_worked']
+    df['dafw_days_per_case'] = df['dafw_days'] / df['dafw_cases']
+    return df
+
+
+def slice_cube(cube, by, naics_level=2, years=None, states=None, sizes=None, naics_prefix=None, injured=None):
+    """
+    Aggregate a slice of the cube.
+
+    Parameters:
+    - cube: Cube DataFrame.
+    - by: Columns to group by (any of DIMENSIONS, or 'industry_description' at level 6).
+    - naics_level: NAICS level to read (every level sums to the same totals).
+    - years, states, sizes: Optional lists to filter on.
+    - naics_prefix: Optional prefix that codes must start with.
+    - injured: Optional True (or False) to keep only establishments with (or
+      without) injuries, as correlation.injured_rows defines them.
+
+    Returns:
+    - Summed measures and derived rates per group.
+    """
+    mask = cube['naics_level'] == naics_level
+    if years is not None:
+        mask &= cube['year'].isin(years)
+    if states is not None:
+        mask &= cube['state'].isin(states)
+    if sizes is not None:
+        mask &= cube['size'].isin(sizes)
+    if naics_prefix:
+        mask &= cube['naics_prefix'].astype(str).str.startswith(naics_prefix)
+    if injured is not None:
+        mask &= cube['injured'] == injured
+
+    grouped = cube[mask].groupby(list(by), observed=True)[SUM_COLUMNS].sum().reset_index()
+    return add_rates(grouped)
+
+
+def load_cube(path=CUBE_PATH):
+    return pd.read_parquet(path)
+
+
+# Cube measure -> column name of the dashboard's NAICS x industry table
+TREEMAP_NAMES = {
+    'naics_prefix': 'naics_code', 'employees': 'total_employees',
+    'hours_worked': 'total_hours_worked', 'injuries': 'total_injuries'
+}
+TREEMAP_COLUMNS = ['naics_code', 'industry_description', 'total_employees', 'total_hours_worked', 'total_injuries']
+
+
+def naics_table(cube, year):
+    """
+    6-digit NAICS x industry sums of one year, as the treemap reads them.
+
+    Only establishments with injuries are summed, the rows the treemap's
+    fallback groups from load_data, so both give the same table.
+    """
+    table = slice_cube(cube, ['naics_prefix', 'industry_description'], naics_level=6, years=[year], injured=True)
+    return table.rename(columns=TREEMAP_NAMES)[TREEMAP_COLUMNS]
+
+
+def state_year_metrics(cube, states=US_STATES):
+    """
+    Injuries and employees per state and year, in the layout of data/state_year_metrics.csv.
+    """
+    metrics = slice_cube(cube, ['state', 'year'], states=states)
+    metrics['state'] = metrics['state'].astype(str)
+    return pd.DataFrame({
+        'state': metrics['state'],
+        'year': metrics['year'],
+        'total_injuries': metrics['injuries'],
+        'total_annual_average_employees': metrics['employees'],
+        'avg_injuries_per_employee': metrics['injury_rate'],
+    })
@@ -0,0 +1,212 @@
+"""
+Sharded ingest of the DOL enforcement CSVs (osha_inspection*.csv, osha_violation*.csv).
+
+Shards are parsed by Arrow with an explicit schema (dates parsed with
+fixed formats after the read) on a thread pool, de-duplicated across shards
+with a 64-bit row hash and written to a year-partitioned Parquet store.
+"""
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from osha.cleaning import RowHashSet, arrow_row_hashes, detect_encoding
+from osha.parallel import resolve_workers
+from osha.store import year_path
+
+ENFORCEMENT_ROOT = 'data/enforcement'
+INSPECTION_ROOT = os.path.join(ENFORCEMENT_ROOT, 'inspections')
+VIOLATION_ROOT = os.path.join(ENFORCEMENT_ROOT, 'violations')
+
+# Dates are written as YYYY-MM-DD (YYYYMMDD in older extracts)
+DATE_FORMATS = ['%Y-%m-%d', '%Y%m%d']
+DATE = pa.timestamp('s')
+
+INSPECTION_TYPES = {
+    'activity_nr': pa.int64(), 'reporting_id': pa.int64(), 'state_flag': pa.string(), 'estab_name': pa.string(),
+    'site_address': pa.string(), 'site_city': pa.string(), 'site_state': pa.string(), 'site_zip': pa.string(),
+    'owner_type': pa.string(), 'owner_code': pa.string(), 'adv_notice': pa.string(), 'safety_hlth': pa.string(),
+    'sic_code': pa.string(), 'naics_code': pa.string(), 'insp_type': pa.string(), 'insp_scope': pa.string(),
+    'why_no_insp': pa.string(), 'union_status': pa.string(), 'safety_manuf': pa.string(),
+    'safety_const': pa.string(), 'safety_marit': pa.string(), 'health_manuf': pa.string(),
+    'health_const': pa.string(), 'health_marit': pa.string(), 'migrant': pa.string(), 'mail_street': pa.string(),
+    'mail_city': pa.string(), 'mail_state': pa.string(), 'mail_zip': pa.string(), 'host_est_key': pa.string(),
+    'nr_in_estab': pa.int64(), 'open_date': DATE, 'case_mod_date': DATE, 'close_conf_date': DATE,
+    'close_case_date': DATE, 'ld_dt': pa.string(),
+}
+VIOLATION_TYPES = {
+    'activity_nr': pa.int64(), 'citation_id': pa.string(), 'delete_flag': pa.string(), 'standard': pa.string(),
+    'viol_type': pa.string(), 'issuance_date': DATE, 'abate_date': DATE, 'abate_complete': pa.string(),
+    'current_penalty': pa.float64(), 'initial_penalty': pa.float64(), 'contest_date': DATE,
+    'final_order_date': DATE, 'nr_instances': pa.int64(), 'nr_exposed': pa.int64(), 'rec': pa.string(),
+    'gravity': pa.string(), 'emphasis': pa.string(), 'hazcat': pa.string(), 'fta_insp_nr': pa.int64(),
+    'fta_issuance_date': DATE, 'fta_penalty': pa.float64(), 'fta_contest_date': DATE,
+    'fta_final_order_date': DATE, 'hazsub1': pa.string(), 'hazsub2': pa.string(), 'hazsub3': pa.string(),
+    'hazsub4': pa.string(), 'hazsub5': pa.string(), 'load_dt': pa.string(),
+}
+
+# (file pattern, column types, partition date column, store root) per dataset
+DATASETS = {
+    'inspections': ('data/inspections/osha_inspection*.csv', INSPECTION_TYPES, 'open_date', INSPECTION_ROOT),
+    'violations': ('data/violations/osha_violation*.csv', VIOLATION_TYPES, 'issuance_date', VIOLATION_ROOT),
+}
+
+# Partition of rows without a date
+UNKNOWN_YEAR = 'unknown'
+
+
+def shard_schema(path, types, encoding):
+    """
+    Schema of a shard: the known type of each header column, text for the rest.
+    """
+    header = pd.read_csv(path, encoding=encoding, nrows=0).columns
+    return pa.schema([(col, types.get(col, pa.string())) for col in header])
+
+
+def parse_dates(values):
+    """
+    Dates of a text column, trying each of DATE_FORMATS in turn; values no
+    format matches (malformed or out of range, e.g. 2019-02-30) become NaT.
+    """
+    parsed = pd.to_datetime(values, format=DATE_FORMATS[0], errors='coerce')
+    for fmt in DATE_FORMATS[1:]:
+        parsed = parsed.fillna(pd.to_datetime(values, format=fmt, errors='coerce'))
+    return parsed
+
+
+def read_shard(path, schema, encoding):
+    """
+    Parse one shard with the given schema.
+
+    Date columns are read as text and parsed by parse_dates, since Arrow's
+    parsers roll out-of-range dates over (2019-02-30 becomes 2019-03-02).
+    Values a typed numeric column cannot hold make Arrow reject the shard; it
+    is then re-read with those columns as text too and such values become
+    nulls, as pd.to_numeric(errors='coerce') would.
+    """
+    read_options = pa_csv.ReadOptions(encoding=encoding)
+
+    def read(text):
+        types = {**{f.name: f.type for f in schema}, **{name: pa.string() for name in text}}
+        return pa_csv.read_csv(path, read_options=read_options, convert_options=pa_csv.ConvertOptions(
+            column_types=types, strings_can_be_null=True))
+
+    dates = [f.name for f in schema if pa.types.is_timestamp(f.type)]
+    numbers = [f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+    try:
+        table, text = read(dates), dates
+    except pa.ArrowInvalid:
+        table, text = read(dates + numbers), dates + numbers
+
+    for name in text:
+        field = schema.field(name)
+        values = table.column(name).to_pandas()
+        values = parse_dates(values) if name in dates else pd.to_numeric(values, errors='coerce')
+        table = table.set_column(table.schema.get_field_index(name), field,
+                                 pa.array(values, type=field.type, from_pandas=True))
+    return table
+
+
+def _read_ahead(pool, func, items, depth):
+    """
+    Ordered pool.map keeping at most `depth` results in flight, so finished
+    shards do not pile up in memory while earlier ones are written.
+    """
+    items = list(items)
+    pending = [pool.submit(func, item) for item in items[:depth]]
+    for k in range(len(items)):
+        if k + depth < len(items):
+            pending.append(pool.submit(func, items[k + depth]))
+        yield pending.pop(0).result()
+
+
+def _partition_years(dates):
+    years = pd.Series(dates).dt.year
+    return years.astype('Int64').astype(str).where(years.notna(), UNKNOWN_YEAR).to_numpy()
+
+
+def ingest_shards(paths, types, partition_column, root, workers=0):
+    """
+    Read CSV shards in parallel and write their distinct rows to a
+    year-partitioned Parquet store.
+
+    Shards are read in path order by a pool of threads (Arrow releases the
+    GIL while parsing); rows are kept the first time their 64-bit hash over
+    every typed column is seen, so duplicates across shards are dropped while
+    holding only the shards in flight and the hash set.
+
+    Parameters:
+    - paths: CSV shards, in priority order.
+    - types: Arrow type of each known column (others are read as text).
+    - partition_column: Date column whose year names the partition.
+    - root: Root directory of the store (existing partitions are replaced).
+    - workers: Shards parsed at the same time (0 = one per CPU).
+
+    Returns:
+    - Dict with shards, rows_read, rows_written, bytes_read, seconds,
+      rows_per_second and mb_per_second.
+    """
+    paths = list(paths)
+    encodings = {path: detect_encoding(path) for path in paths}
+    schemas = {path: shard_schema(path, types, encodings[path]) for path in paths}
+    # One schema for every shard: the first shard's header plus columns only later shards have
+    schema = pa.schema([])
+    for path in paths:
+        for field in schemas[path]:
+            if schema.get_field_index(field.name) < 0:
+                schema = schema.append(field)
+
+    for old in glob.glob(os.path.join(root, 'year=*', '*.parquet')):
+        os.remove(old)
+
+    seen = RowHashSet()
+    writers = {}
+    rows_read = rows_written = 0
+    start = time.perf_counter()
+
+    def read(path):
+        return read_shard(path, schemas[path], encodings[path])
+
+    workers = min(resolve_workers(workers), max(len(paths), 1))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for table in _read_ahead(pool, read, paths, workers):
+                # Same columns in the same order for every shard
+                table = pa.table(
+                    [table[f.name] if f.name in table.column_names else pa.nulls(len(table), f.type) for f in schema],
+                    schema=schema,
+                )
+                rows_read += len(table)
+                keep = seen.first_hashes(arrow_row_hashes(table))
+                table = table.filter(pa.array(keep))
+                rows_written += len(table)
+
+                years = _partition_years(table[partition_column].to_pandas())
+                for year in np.unique(years):
+                    if year not in writers:
+                        path = year_path(year, root)
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        writers[year] = pq.ParquetWriter(path, schema)
+                    writers[year].write_table(table.filter(pa.array(years == year)))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    seconds = time.perf_counter() - start
+    bytes_read = sum(os.path.getsize(path) for path in paths)
+    return {
+        'shards': len(paths),
+        'rows_read': rows_read,
+        'rows_written': rows_written,
+        'bytes_read': bytes_read,
+        'seconds': seconds,
+        'rows_per_second': rows_read / seconds if seconds > 0 else float('inf'),
+        'mb_per_second': bytes_read / 2**20 / seconds if seconds > 0 else float('inf'),
+    }
+
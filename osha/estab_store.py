@@ -0,0 +1,92 @@
+"""Disk-backed establishment store keyed by establishment ID (SQLite)."""
+import json
+import os
+import sqlite3
+
+from osha.panel import YEARS, panel_to_records
+
+ESTAB_STORE_PATH = 'data/estab_store.sqlite'
+
+# Per-establishment listing stored next to the store
+ESTAB_SUMMARY_PATH = 'data/estab_summary.parquet'
+
+
+def iter_panel_records(panel, years=YEARS, batch_size=50_000):
+    """
+    Yield (establishment_id, record) pairs from a panel, a batch at a time.
+
+    Parameters:
+    - panel: DataFrame returned by build_panel / read_panel.
+    - years: Years the panel was built over.
+    - batch_size: Establishments converted per batch.
+    """
+    rows_per_batch = batch_size * len(years)
+    for start in range(0, len(panel), rows_per_batch):
+        yield from panel_to_records(panel.iloc[start:start + rows_per_batch], years).items()
+
+
+def write_store(records, path=ESTAB_STORE_PATH):
+    """
+    Write establishment records to a SQLite store, replacing any existing one.
+
+    Parameters:
+    - records: Iterable of (establishment_id, {field: [one value per year]}) pairs.
+    - path: Path of the SQLite file.
+
+    Returns:
+    - Number of establishments written.
+    """
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('CREATE TABLE establishments (id TEXT PRIMARY KEY, record TEXT NOT NULL) WITHOUT ROWID')
+    rows = ((str(estab_id), json.dumps(record, separators=(',', ':'))) for estab_id, record in records)
+    with conn:
+        conn.executemany('INSERT INTO establishments VALUES (?, ?)', rows)
+    count = conn.execute('SELECT COUNT(*) FROM establishments').fetchone()[0]
+    conn.close()
+
+    # Swap the finished file in so readers never see a partial store
+    os.replace(tmp_path, path)
+    return count
+
+
+class EstablishmentStore:
+    """
+    Read-only access to the establishment store.
+
+    Lookups go through the primary-key index, so only the requested record
+    is read from disk.
+    """
+
+    def __init__(self, path=ESTAB_STORE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+
+    def get(self, establishment_id, default=None):
+        row = self._conn.execute(
+            'SELECT record FROM establishments WHERE id = ?', (str(establishment_id).strip(),)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def __contains__(self, establishment_id):
+        return self._conn.execute(
+            'SELECT 1 FROM establishments WHERE id = ?', (str(establishment_id).strip(),)
+        ).fetchone() is not None
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM establishments').fetchone()[0]
+
+    def items(self):
+        """
+        Stream every (establishment_id, record) pair without loading the whole store.
+        """
+        for estab_id, record in self._conn.execute('SELECT id, record FROM establishments'):
+            yield estab_id, json.loads(record)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,325 @@
+"""
+Opt-in per-page instrumentation for the dashboard.
+
+Turned on with the OSHA_DEBUG=1 environment variable or the ?debug=1 URL
+parameter. Each rerun is split into phases by mark() calls (load, transform,
+figure, ...); time spent inside plotly_chart/dataframe is counted as render
+time together with the size of the payload sent to the browser, and the
+cache_data/cache_resource decorators record hits and misses of the loaders,
+and loaders report the memory held by the frames they load (track_frame).
+Results are shown in a sidebar panel and appended to a JSON-lines log.
+"""
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import weakref
+
+import streamlit as st
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+DEBUG_ENV = 'OSHA_DEBUG'
+LOG_PATH = os.environ.get('OSHA_DEBUG_LOG', 'data/logs/page_runs.jsonl')
+PROFILE_DIR = 'data/logs'
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+# Label -> (weak reference, rows, bytes) of frames held by the loaders
+_frames = {}
+_frames_lock = threading.Lock()
+
+
+def enabled():
+    if os.environ.get(DEBUG_ENV) == '1':
+        return True
+    try:
+        return st.query_params.get('debug') == '1'
+    except Exception:
+        # No script run context (bare imports, benchmarks)
+        return False
+
+
+class RunRecorder:
+    """
+    Timings of one script rerun: phases, rendered payloads and loader calls.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.payloads = []
+        self.cache = []
+        self._phase = 'load'
+        self._phase_started = self.started
+        self._excluded = 0.0
+        self.profiler = None
+
+    def mark(self, phase):
+        """
+        End the current phase and start `phase` (render time is left out of both).
+        """
+        now = time.perf_counter()
+        elapsed = now - self._phase_started - self._excluded
+        self.phases[self._phase] = self.phases.get(self._phase, 0.0) + max(elapsed, 0.0)
+        self._phase, self._phase_started, self._excluded = phase, now, 0.0
+
+    def render(self, kind, label, nbytes, seconds):
+        self._excluded += seconds
+        self.payloads.append({'kind': kind, 'label': label, 'bytes': nbytes, 'seconds': round(seconds, 4)})
+
+    def cache_call(self, name, hit, seconds):
+        self.cache.append({'name': name, 'hit': hit, 'seconds': round(seconds, 4)})
+
+    def summary(self):
+        return {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'page': self.page,
+            'seconds': round(time.perf_counter() - self.started, 4),
+            'phases': {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            'render_seconds': round(sum(p['seconds'] for p in self.payloads), 4),
+            'payload_bytes': sum(p['bytes'] for p in self.payloads),
+            'payloads': self.payloads,
+            'cache_hits': sum(c['hit'] for c in self.cache),
+            'cache_misses': sum(not c['hit'] for c in self.cache),
+            'cache': self.cache,
+            'frames': loaded_frames(),
+        }
+
+
+def current():
+    return getattr(_local, 'recorder', None)
+
+
+def begin(page):
+    """
+    Start recording a rerun of `page` when instrumentation is on; returns the recorder or None.
+    """
+    _local.recorder = RunRecorder(page) if enabled() else None
+    recorder = _local.recorder
+    if recorder is not None and st.session_state.pop('_profile_next_run', False):
+        # Sampling profiler when pyinstrument is installed, cProfile otherwise
+        if Profiler is not None:
+            recorder.profiler = Profiler()
+            recorder.profiler.start()
+        else:
+            recorder.profiler = cProfile.Profile()
+            recorder.profiler.enable()
+    return recorder
+
+
+def track_frame(label, frame):
+    """
+    Record the in-memory size of a frame a loader holds, reported while the frame is alive.
+    """
+    nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+    with _frames_lock:
+        _frames[label] = (weakref.ref(frame), len(frame), nbytes)
+
+
+def loaded_frames():
+    """
+    Rows and MB of every tracked frame still held by this process (evicted ones drop out).
+    """
+    with _frames_lock:
+        for label in [label for label, (ref, _, _) in _frames.items() if ref() is None]:
+            del _frames[label]
+        return [{'frame': label, 'rows': rows, 'MB': round(nbytes / 2**20, 2)}
+                for label, (_, rows, nbytes) in sorted(_frames.items())]
+
+
+def mark(phase):
+    recorder = current()
+    if recorder is not None:
+        recorder.mark(phase)
+
+
+def finish():
+    """
+    Close the rerun: write the log line and draw the sidebar debug panel.
+    """
+    recorder = current()
+    _local.recorder = None
+    if recorder is None:
+        return
+    recorder.mark('done')
+    recorder.phases.pop('done', None)
+    profile = _stop_profiler(recorder)
+    summary = recorder.summary()
+    write_log(summary)
+    _debug_panel(summary, profile)
+
+
+def write_log(summary, path=LOG_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with _log_lock, open(path, 'a') as f:
+        f.write(json.dumps(summary) + '\n')
+
+
+def _stop_profiler(recorder):
+    if recorder.profiler is None:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    if Profiler is not None:
+        recorder.profiler.stop()
+        text = recorder.profiler.output_text(unicode=True)
+        path = os.path.join(PROFILE_DIR, f'profile-{stamp}.html')
+        with open(path, 'w') as f:
+            f.write(recorder.profiler.output_html())
+    else:
+        recorder.profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(recorder.profiler, stream=out).sort_stats('cumulative').print_stats(40)
+        text = out.getvalue()
+        path = os.path.join(PROFILE_DIR, f'profile-{stamp}.txt')
+        with open(path, 'w') as f:
+            f.write(text)
+    return {'text': text, 'path': path}
+
+
+def _profile_next_run():
+    st.session_state['_profile_next_run'] = True
+
+
+def _debug_panel(summary, profile):
+    with st.sidebar.expander('Performance', expanded=True):
+        st.write(f"**{summary['page']}**: {summary['seconds']:.3f}s, "
+                 f"{summary['payload_bytes'] / 2**20:.2f} MB sent")
+        rows = [{'phase': name, 'seconds': seconds} for name, seconds in summary['phases'].items()]
+        rows.append({'phase': 'render', 'seconds': summary['render_seconds']})
+        st.table(rows)
+        if summary['payloads']:
+            st.table([{'element': f"{p['kind']}: {p['label']}", 'KB': round(p['bytes'] / 1024, 1), 'seconds': p['seconds']}
+                      for p in summary['payloads']])
+        if summary['cache']:
+            st.write(f"Cache: {summary['cache_hits']} hits, {summary['cache_misses']} misses")
+            st.table([{'loader': c['name'], 'hit': c['hit'], 'seconds': c['seconds']} for c in summary['cache']])
+        if summary['frames']:
+            st.write(f"Loaded data: {sum(f['MB'] for f in summary['frames']):.1f} MB in memory")
+            st.table(summary['frames'])
+        st.button('Profile next rerun', on_click=_profile_next_run)
+        if profile is not None:
+            st.caption(f"Profile saved to {profile['path']}")
+            st.code(profile['text'][:20000])
+
+
+def _tracked(decorator):
+    """
+    Wrap a Streamlit cache decorator so every call records whether it was a hit.
+    """
+    def wrap(func=None, **kwargs):
+        if func is None:
+            return lambda f: wrap(f, **kwargs)
+
+        @functools.wraps(func)
+        def body(*args, **kw):
+            # Only runs on a cache miss
+            calls = getattr(_local, 'calls', None)
+            if calls:
+                calls[-1] = False
+            return func(*args, **kw)
+
+        cached = decorator(**kwargs)(body) if kwargs else decorator(body)
+
+        @functools.wraps(func)
+        def call(*args, **kw):
+            recorder = current()
+            if recorder is None:
+                return cached(*args, **kw)
+            calls = _local.__dict__.setdefault('calls', [])
+            calls.append(True)
+            start = time.perf_counter()
+            try:
+                return cached(*args, **kw)
+            finally:
+                recorder.cache_call(func.__name__, calls.pop(), time.perf_counter() - start)
+
+        call.clear = cached.clear
+        return call
+    return wrap
+
+
+cache_data = _tracked(st.cache_data)
+cache_resource = _tracked(st.cache_resource)
+
+
+def figure_bytes(fig):
+    return len(fig.to_json())
+
+
+def frame_bytes(data):
+    """
+    Arrow IPC size of a frame (or a Styler's frame), as serialized for st.dataframe.
+    """
+    import pyarrow as pa
+
+    frame = getattr(data, 'data', data)
+    try:
+        table = pa.Table.from_pandas(frame)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.size()
+    except Exception:
+        return int(frame.memory_usage(deep=True).sum())
+
+
+def _rendered(kind, element, measure):
+    def draw(data, *args, label=None, **kwargs):
+        recorder = current()
+        if recorder is None:
+            return element(data, *args, **kwargs)
+        start = time.perf_counter()
+        result = element(data, *args, **kwargs)
+        seconds = time.perf_counter() - start
+        recorder.render(kind, label or type(data).__name__, measure(data), seconds)
+        return result
+    return draw
+
+
+plotly_chart = _rendered('plotly_chart', st.plotly_chart, figure_bytes)
+dataframe = _rendered('dataframe', st.dataframe, frame_bytes)
+
+
+def aggregate_log(path=LOG_PATH):
+    """
+    Per-page statistics of a run log: reruns, mean/p95/max seconds, mean phase
+    times and payload bytes, and the cache hit ratio.
+    """
+    import pandas as pd
+
+    with open(path) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    if not runs:
+        return {}
+    df = pd.DataFrame(runs)
+    phases = pd.json_normalize(df['phases']).add_prefix('phase_')
+    df = pd.concat([df.drop(columns=['phases']), phases], axis=1)
+
+    stats = {}
+    for page, group in df.groupby('page'):
+        calls = group['cache_hits'] + group['cache_misses']
+        stats[page] = {
+            'runs': len(group),
+            'seconds_mean': round(group['seconds'].mean(), 4),
+            'seconds_p95': round(group['seconds'].quantile(0.95), 4),
+            'seconds_max': round(group['seconds'].max(), 4),
+            'render_seconds_mean': round(group['render_seconds'].mean(), 4),
+            'payload_bytes_mean': int(group['payload_bytes'].mean()),
+            'phases_mean': {
+                col[len('phase_'):]: round(group[col].mean(), 4)
+                for col in phases.columns if group[col].notna().any()
+            },
+            'cache_hit_ratio': round(group['cache_hits'].sum() / calls.sum(), 3) if calls.sum() else None,
+        }
+    return stats
@@ -0,0 +1,420 @@
+"""
+Record linkage of OSHA enforcement inspections to ITA establishments.
+
+The two sources share no key, so records are matched on name and address.
+Candidates are limited to blocks of records in the same state that share a
+ZIP code or one of their rarest name tokens; within a block every pair is
+scored at once from hashed character-trigram vectors, and states are spread
+over a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from osha.naics import sector_of
+from osha.name_index import normalize
+from osha.panel import YEARS
+from osha.parallel import resolve_workers
+from osha.store import load_cleaned_year
+
+CROSSWALK_PATH = 'data/inspection_ita_crosswalk.parquet'
+
+# Columns read from each side
+INSPECTION_COLUMNS = ['activity_nr', 'estab_name', 'site_address', 'site_city', 'site_state', 'site_zip', 'naics_code']
+ITA_COLUMNS = [
+    'establishment_id', 'establishment_name', 'company_name', 'street_address', 'city', 'state', 'zip_code',
+    'naics_code'
+]
+
+# Words that say nothing about which business it is
+NAME_STOPWORDS = {
+    'the', 'and', 'of', 'inc', 'incorporated', 'llc', 'llp', 'lp', 'ltd', 'co', 'corp', 'corporation', 'company',
+    'dba', 'pc', 'pllc', 'plc', 'group', 'holdings'
+}
+ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'drive': 'dr', 'boulevard': 'blvd', 'highway': 'hwy',
+    'lane': 'ln', 'court': 'ct', 'place': 'pl', 'parkway': 'pkwy', 'circle': 'cir', 'suite': 'ste',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w', 'route': 'rte', 'terrace': 'ter', 'square': 'sq',
+}
+
+# Hashed trigram vectors: buckets per vector and characters kept per string
+TRIGRAM_BUCKETS = 512
+TRIGRAM_WIDTH = 48
+
+# Score weights (sum to 1): name, street address, house number, NAICS sector
+WEIGHTS = {'name': 0.5, 'address': 0.3, 'number': 0.1, 'sector': 0.1}
+DEFAULT_THRESHOLD = 0.7
+
+# Rarest name tokens used as extra blocking keys, and the largest token block
+# (ITA side) still worth comparing
+TOKEN_KEYS = 2
+MAX_TOKEN_BLOCK = 500
+
+# Small blocks are scored together in batches of up to BATCH_ROWS inspections
+# (and four times as many establishments); larger blocks are scored alone, at
+# most MAX_BLOCK_PAIRS pairs per matrix product
+BATCH_ROWS = 256
+MAX_BLOCK_PAIRS = 1_000_000
+
+
+def normalize_name(names):
+    """
+    Names for matching: case-folded, '&' spelled out, punctuation and legal
+    suffixes dropped.
+    """
+    names = normalize(names).str.replace('&', ' and ', regex=False)
+    names = names.str.replace(r"[^\w\s]", ' ', regex=True).str.replace('_', ' ', regex=False)
+    tokens = names.str.split()
+    return tokens.map(lambda words: ' '.join(w for w in words if w not in NAME_STOPWORDS) or ' '.join(words))
+
+
+def normalize_address(addresses):
+    """
+    Street addresses for matching: case-folded, punctuation dropped and common
+    street words abbreviated.
+    """
+    addresses = normalize(addresses).str.replace(r"[^\w\s]", ' ', regex=True)
+    return addresses.str.split().map(lambda words: ' '.join(ADDRESS_ABBREVIATIONS.get(w, w) for w in words))
+
+
+def normalize_zip(zips):
+    """
+    Five-digit ZIP codes (ZIP+4 and floats read from CSV cut back), '' when missing.
+    """
+    digits = pd.Series(zips, dtype=object).fillna('').astype(str).str.replace(r'\.0$', '', regex=True)
+    digits = digits.str.extract(r'^(\d{1,5})', expand=False).fillna('')
+    return digits.where(digits == '', digits.str.zfill(5))
+
+
+def prepare(df, id_column, name_columns, address_column, state_column, zip_column):
+    """
+    Normalized matching fields of one side.
+
+    Returns:
+    - DataFrame with record_id, names (one column per name_columns entry),
+      address, number (leading house number), state, zip and sector.
+    """
+    prepared = pd.DataFrame({'record_id': pd.to_numeric(df[id_column], errors='coerce').to_numpy()})
+    for i, col in enumerate(name_columns):
+        prepared[f'name_{i}'] = normalize_name(df[col]).to_numpy()
+    address = normalize_address(df[address_column])
+    prepared['address'] = address.to_numpy()
+    prepared['number'] = address.str.extract(r'^(\d+)', expand=False).fillna('').to_numpy()
+    prepared['state'] = normalize(df[state_column]).str.upper().to_numpy()
+    prepared['zip'] = normalize_zip(df[zip_column]).to_numpy()
+    naics = pd.Series(df['naics_code'], dtype=object).fillna('').astype(str).str.replace(r'\.0$', '', regex=True)
+    prepared['sector'] = sector_of(naics.str[:2]).where(naics.str.len() >= 2, '').to_numpy()
+
+    prepared = prepared[prepared['record_id'].notna() & (prepared['name_0'] != '')]
+    # Identical records (an establishment filing several years) are scored once
+    return prepared.drop_duplicates().reset_index(drop=True)
+
+
+def prepare_inspections(df):
+    return prepare(df, 'activity_nr', ['estab_name'], 'site_address', 'site_state', 'site_zip')
+
+
+def prepare_establishments(df):
+    return prepare(df, 'establishment_id', ['establishment_name', 'company_name'], 'street_address', 'state',
+                   'zip_code')
+
+
+def trigram_buckets(texts, buckets=TRIGRAM_BUCKETS, width=TRIGRAM_WIDTH):
+    """
+    Hashed character trigrams of each text, as an (n, width - 2) array of
+    bucket numbers (-1 past the end of a text). Texts are padded with a space
+    on both sides and cut to `width` characters, and every trigram of every
+    text is hashed in one pass over their code points.
+    """
+    texts = np.asarray([' ' + t + ' ' for t in texts], dtype=f'U{width}')
+    codes = texts.view(np.uint32).reshape(len(texts), width).astype(np.int64)
+    hashed = ((codes[:, :-2] * 1_000_003 + codes[:, 1:-1]) * 1_000_003 + codes[:, 2:]) % buckets
+    return np.where(codes[:, 2:] != 0, hashed, -1).astype(np.int16)
+
+
+def trigram_vectors(grams, buckets=TRIGRAM_BUCKETS):
+    """
+    L2-normalized trigram counts of rows of trigram_buckets output, so the dot
+    product of two rows is the cosine similarity of their texts.
+    """
+    present = grams >= 0
+    rows = np.broadcast_to(np.arange(len(grams))[:, None], grams.shape)[present]
+    counts = np.bincount(rows * buckets + grams[present], minlength=len(grams) * buckets)
+    vectors = counts.reshape(len(grams), buckets).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class Side:
+    """
+    Numpy arrays of one side of a state: name and address trigrams, house
+    number and sector codes (shared by both sides, -1 when missing) and record
+    id, indexed by position.
+    """
+
+    def __init__(self, records, name_columns, number, sector):
+        self.record_id = records['record_id'].to_numpy()
+        self.names = [trigram_buckets(records[col]) for col in name_columns]
+        self.address = trigram_buckets(records['address'])
+        self.number = number
+        self.sector = sector
+
+
+def _shared_codes(left, right):
+    # Integer codes of two columns in one code space, -1 for ''
+    codes, _ = pd.factorize(pd.concat([left, right], ignore_index=True).replace('', None))
+    return codes[:len(left)], codes[len(left):]
+
+
+def _agreement(left, right):
+    # 1 when both known and equal, 0 when both known and different, 0.5 otherwise
+    known = (left[:, None] >= 0) & (right[None, :] >= 0)
+    return np.where(known, (left[:, None] == right[None, :]).astype(np.float32), np.float32(0.5))
+
+
+def score_pairs(inspections, establishments, insp_pos, ita_pos):
+    """
+    Scores of every inspection x establishment pair of a block.
+
+    Parameters:
+    - inspections, establishments: Side arrays of the state.
+    - insp_pos, ita_pos: Positions of the block's records on each side.
+
+    Returns:
+    - (score, name, address) matrices of shape (len(insp_pos), len(ita_pos)).
+    """
+    insp_name = trigram_vectors(inspections.names[0][insp_pos])
+    name = np.maximum.reduce([insp_name @ trigram_vectors(grams[ita_pos]).T for grams in establishments.names])
+    address = trigram_vectors(inspections.address[insp_pos]) @ trigram_vectors(establishments.address[ita_pos]).T
+    number = _agreement(inspections.number[insp_pos], establishments.number[ita_pos])
+    sector = _agreement(inspections.sector[insp_pos], establishments.sector[ita_pos])
+    score = (WEIGHTS['name'] * name + WEIGHTS['address'] * address
+             + WEIGHTS['number'] * number + WEIGHTS['sector'] * sector)
+    return score, name, address
+
+
+def _rare_tokens(names, frequency):
+    """
+    (position, token) rows for the TOKEN_KEYS rarest tokens of each name found in `frequency`.
+    """
+    exploded = names.str.split().explode()
+    table = pd.DataFrame({'position': exploded.index.to_numpy(), 'token': exploded.to_numpy()}).drop_duplicates()
+    table['frequency'] = table['token'].map(frequency)
+    table = table.dropna(subset=['frequency']).sort_values(['position', 'frequency', 'token'])
+    return table.groupby('position').head(TOKEN_KEYS)
+
+
+def _keys(records, name_columns, frequency):
+    # (position, key) of every blocking key of one side
+    zips = records.loc[records['zip'] != '', 'zip']
+    keys = [pd.DataFrame({'position': zips.index.to_numpy(), 'key': 'zip:' + zips.to_numpy()})]
+    for col in name_columns:
+        tokens = _rare_tokens(records[col], frequency)
+        keys.append(pd.DataFrame({'position': tokens['position'].to_numpy(), 'key': 'token:' + tokens['token'].to_numpy()}))
+    return pd.concat(keys, ignore_index=True).drop_duplicates()
+
+
+def blocks(inspections, establishments):
+    """
+    Blocks of a state's records: the ZIP codes and rare name tokens (those of at
+    most MAX_TOKEN_BLOCK establishments, at least three letters long) both
+    sides share.
+
+    Parameters:
+    - inspections, establishments: Prepared records of one state, indexed by position.
+
+    Yields:
+    - (kind, inspection positions, establishment positions) per block.
+    """
+    ita_names = ['name_0', 'name_1']
+    tokens = pd.concat([establishments[col].str.split().explode() for col in ita_names])
+    tokens = tokens[tokens.str.len() >= 3]
+    # Establishments (not rows) carrying each token
+    frequency = pd.DataFrame({'position': tokens.index.to_numpy(), 'token': tokens.to_numpy()}).drop_duplicates()
+    frequency = frequency['token'].value_counts()
+    frequency = frequency[frequency <= MAX_TOKEN_BLOCK]
+
+    insp_keys = _keys(inspections, ['name_0'], frequency)
+    ita_keys = _keys(establishments, ita_names, frequency)
+
+    # Shared key codes, then each side's positions grouped by code (CSR offsets)
+    codes, uniques = pd.factorize(pd.concat([insp_keys['key'], ita_keys['key']], ignore_index=True))
+    insp_codes, ita_codes = codes[:len(insp_keys)], codes[len(insp_keys):]
+    grouped = []
+    for side_codes, positions in ((insp_codes, insp_keys['position'].to_numpy()), (ita_codes, ita_keys['position'].to_numpy())):
+        order = np.argsort(side_codes, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(side_codes, minlength=len(uniques)))])
+        grouped.append((positions[order], offsets))
+    (insp_sorted, insp_offsets), (ita_sorted, ita_offsets) = grouped
+
+    kinds = pd.Series(uniques).str.split(':', n=1).str[0].to_numpy()
+    shared = np.flatnonzero((np.diff(insp_offsets) > 0) & (np.diff(ita_offsets) > 0))
+    for code in shared:
+        yield (kinds[code], insp_sorted[insp_offsets[code]:insp_offsets[code + 1]],
+               ita_sorted[ita_offsets[code]:ita_offsets[code + 1]])
+
+
+def _batches(block_iter, max_rows=BATCH_ROWS):
+    """
+    Group small blocks so one matrix product scores many of them; blocks
+    larger than a batch come alone.
+    """
+    batch, insp_rows, ita_rows = [], 0, 0
+    for block in block_iter:
+        _, insp_pos, ita_pos = block
+        if batch and (insp_rows + len(insp_pos) > max_rows or ita_rows + len(ita_pos) > 4 * max_rows):
+            yield batch
+            batch, insp_rows, ita_rows = [], 0, 0
+        batch.append(block)
+        insp_rows += len(insp_pos)
+        ita_rows += len(ita_pos)
+    if batch:
+        yield batch
+
+
+def _batch_pairs(batch):
+    """
+    Stacked positions of a batch's blocks and the (row, column, kind) of every
+    within-block pair in the batch's score matrix.
+    """
+    insp_pos = np.concatenate([block[1] for block in batch])
+    ita_pos = np.concatenate([block[2] for block in batch])
+    rows, cols, kinds = [], [], []
+    i0 = j0 = 0
+    for kind, insp, ita in batch:
+        rows.append(np.repeat(np.arange(i0, i0 + len(insp)), len(ita)))
+        cols.append(np.tile(np.arange(j0, j0 + len(ita)), len(insp)))
+        kinds.append(np.full(len(insp) * len(ita), kind, dtype=object))
+        i0 += len(insp)
+        j0 += len(ita)
+    return insp_pos, ita_pos, np.concatenate(rows), np.concatenate(cols), np.concatenate(kinds)
+
+
+def link_state(inspections, establishments, threshold=DEFAULT_THRESHOLD):
+    """
+    Candidate matches of one state's records (both sides already prepared).
+
+    Returns:
+    - DataFrame of activity_nr, establishment_id, score, name_score,
+      address_score and block for every pair at or above threshold, or None.
+    """
+    inspections = inspections.reset_index(drop=True)
+    establishments = establishments.reset_index(drop=True)
+    insp_number, ita_number = _shared_codes(inspections['number'], establishments['number'])
+    insp_sector, ita_sector = _shared_codes(inspections['sector'], establishments['sector'])
+    insp_side = Side(inspections, ['name_0'], insp_number, insp_sector)
+    ita_side = Side(establishments, ['name_0', 'name_1'], ita_number, ita_sector)
+
+    found = {'activity_nr': [], 'establishment_id': [], 'score': [], 'name_score': [], 'address_score': [],
+             'block': []}
+
+    def keep(insp_pos, ita_pos, i, j, kinds, score, name, address):
+        hit = score >= threshold
+        if not hit.any():
+            return
+        found['activity_nr'].append(insp_side.record_id[insp_pos[i[hit]]])
+        found['establishment_id'].append(ita_side.record_id[ita_pos[j[hit]]])
+        found['score'].append(score[hit])
+        found['name_score'].append(name[hit])
+        found['address_score'].append(address[hit])
+        found['block'].append(kinds[hit])
+
+    for batch in _batches(blocks(inspections, establishments)):
+        if len(batch) == 1 and len(batch[0][1]) * len(batch[0][2]) > MAX_BLOCK_PAIRS:
+            # One large block, scored in slices of inspections
+            kind, insp_pos, ita_pos = batch[0]
+            step = max(1, MAX_BLOCK_PAIRS // len(ita_pos))
+            for start in range(0, len(insp_pos), step):
+                chunk = insp_pos[start:start + step]
+                score, name, address = score_pairs(insp_side, ita_side, chunk, ita_pos)
+                i, j = np.nonzero(score >= threshold)
+                keep(chunk, ita_pos, i, j, np.full(len(i), kind, dtype=object),
+                     score[i, j], name[i, j], address[i, j])
+            continue
+
+        insp_pos, ita_pos, i, j, kinds = _batch_pairs(batch)
+        score, name, address = score_pairs(insp_side, ita_side, insp_pos, ita_pos)
+        keep(insp_pos, ita_pos, i, j, kinds, score[i, j], name[i, j], address[i, j])
+
+    if not found['score']:
+        return None
+    pairs = pd.DataFrame({col: np.concatenate(values) for col, values in found.items()})
+    # A pair found in several blocks (or via several name variants) keeps its best score
+    pairs = pairs.sort_values('score', ascending=False, kind='stable')
+    return pairs.drop_duplicates(subset=['activity_nr', 'establishment_id'])
+
+
+def _link_state_task(args):
+    return link_state(*args)
+
+
+def link_records(inspections, establishments, threshold=DEFAULT_THRESHOLD, top=1, workers=1):
+    """
+    Link prepared inspections to prepared establishments.
+
+    Parameters:
+    - inspections: Output of prepare_inspections.
+    - establishments: Output of prepare_establishments.
+    - threshold: Lowest score kept.
+    - top: Best matches kept per inspection.
+    - workers: Worker processes (states are the units of work; 0 uses every CPU).
+
+    Returns:
+    - Crosswalk DataFrame sorted by activity_nr then rank.
+    """
+    by_state = dict(tuple(establishments.groupby('state')))
+    tasks = [
+        (group, by_state[state], threshold)
+        for state, group in inspections.groupby('state')
+        if state in by_state
+    ]
+    # Largest states first so the pool is not left waiting on one
+    tasks.sort(key=lambda task: len(task[0]) * len(task[1]), reverse=True)
+
+    workers = min(resolve_workers(workers), len(tasks)) if tasks else 1
+    if workers <= 1:
+        results = [_link_state_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_link_state_task, tasks))
+
+    results = [r for r in results if r is not None]
+    if not results:
+        return pd.DataFrame({
+            'activity_nr': pd.Series(dtype='int64'), 'establishment_id': pd.Series(dtype='int64'),
+            'score': pd.Series(dtype='float32'), 'name_score': pd.Series(dtype='float32'),
+            'address_score': pd.Series(dtype='float32'), 'block': pd.Series(dtype='category'),
+            'rank': pd.Series(dtype='int8'),
+        })
+
+    crosswalk = pd.concat(results, ignore_index=True)
+    crosswalk = crosswalk.sort_values(['activity_nr', 'score', 'establishment_id'], ascending=[True, False, True])
+    crosswalk['rank'] = crosswalk.groupby('activity_nr').cumcount().add(1).astype('int8')
+    crosswalk = crosswalk[crosswalk['rank'] <= top].reset_index(drop=True)
+    crosswalk['activity_nr'] = crosswalk['activity_nr'].astype('int64')
+    crosswalk['establishment_id'] = crosswalk['establishment_id'].astype('int64')
+    crosswalk['block'] = crosswalk['block'].astype('category')
+    return crosswalk
+
+
+def load_inspections(path):
+    """
+    Matching columns of an inspection file (CSV, Parquet or a partitioned store), read as text.
+    """
+    if path.endswith('.parquet') or os.path.isdir(path):
+        return pd.read_parquet(path, columns=INSPECTION_COLUMNS).astype(object)
+    return pd.read_csv(path, usecols=INSPECTION_COLUMNS, dtype=str)
+
+
+def load_establishments(years=YEARS):
+    """
+    Matching columns of every establishment in the cleaned yearly data, one row
+    per distinct name and address an establishment filed under.
+    """
+    frames = [load_cleaned_year(year, ITA_COLUMNS) for year in years]
+    frames = [df.astype(object) for df in frames if df is not None]
+    if not frames:
+        return pd.DataFrame(columns=ITA_COLUMNS)
+    return pd.concat(frames, ignore_index=True).drop_duplicates()
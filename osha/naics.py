@@ -0,0 +1,141 @@
+"""NAICS hierarchy aggregates (sector -> subsector -> industry group -> industry) for drill-down treemaps."""
+import pandas as pd
+
+from osha.cube import NAICS_LEVELS, SUM_COLUMNS, add_rates, slice_cube
+
+HIERARCHY_PATH = 'data/naics_hierarchy.parquet'
+
+# Root node of the hierarchy
+ROOT = ''
+
+LEVEL_NAMES = {2: 'Sector', 3: 'Subsector', 4: 'Industry group', 5: 'Industry', 6: 'National industry'}
+
+# Two-digit codes that share one sector
+SECTOR_RANGES = {'31': '31-33', '32': '31-33', '33': '31-33', '44': '44-45', '45': '44-45', '48': '48-49', '49': '48-49'}
+
+SECTOR_NAMES = {
+    '11': 'Agriculture, Forestry, Fishing and Hunting',
+    '21': 'Mining, Quarrying, and Oil and Gas Extraction',
+    '22': 'Utilities',
+    '23': 'Construction',
+    '31-33': 'Manufacturing',
+    '42': 'Wholesale Trade',
+    '44-45': 'Retail Trade',
+    '48-49': 'Transportation and Warehousing',
+    '51': 'Information',
+    '52': 'Finance and Insurance',
+    '53': 'Real Estate and Rental and Leasing',
+    '54': 'Professional, Scientific, and Technical Services',
+    '55': 'Management of Companies and Enterprises',
+    '56': 'Administrative and Support and Waste Management and Remediation Services',
+    '61': 'Educational Services',
+    '62': 'Health Care and Social Assistance',
+    '71': 'Arts, Entertainment, and Recreation',
+    '72': 'Accommodation and Food Services',
+    '81': 'Other Services (except Public Administration)',
+    '92': 'Public Administration',
+}
+
+
+def sector_of(prefixes):
+    """
+    Sector node of each code (two-digit prefix, with the 31-33, 44-45 and 48-49 ranges merged).
+    """
+    two = pd.Series(prefixes, dtype=str).str[:2]
+    return two.map(SECTOR_RANGES).fillna(two)
+
+
+def wrap_labels(text, width=20):
+    """
+    Word-wrap labels for treemap tiles with <br> line breaks.
+    """
+    return text.astype(str).str.wrap(width).str.replace('\n', '<br>', regex=False)
+
+
+def build_hierarchy(cube):
+    """
+    National NAICS hierarchy aggregates for every year of the cube.
+
+    Parameters:
+    - cube: Rollup cube (see osha.cube).
+
+    Returns:
+    - DataFrame with one row per year and node: naics_level, node, parent
+      (ROOT for sectors), label, display_label, summed measures, rates, the
+      number of child nodes and the largest 6-digit industry in the node.
+    """
+    leaves = slice_cube(cube, ['year', 'naics_prefix', 'industry_description'], naics_level=6)
+    leaves['naics_prefix'] = leaves['naics_prefix'].astype(str)
+    leaves['industry_description'] = leaves['industry_description'].astype(object)
+
+    levels = []
+    for level in NAICS_LEVELS:
+        nodes = slice_cube(cube, ['year', 'naics_prefix'], naics_level=level)
+        nodes['naics_prefix'] = nodes['naics_prefix'].astype(str)
+        if level == 2:
+            nodes['node'] = sector_of(nodes['naics_prefix']).to_numpy()
+            nodes['parent'] = ROOT
+            nodes = nodes.groupby(['year', 'node', 'parent'])[SUM_COLUMNS].sum().reset_index()
+            nodes = add_rates(nodes)
+        else:
+            nodes['node'] = nodes['naics_prefix']
+            parent = nodes['naics_prefix'].str[:level - 1]
+            nodes['parent'] = sector_of(parent).to_numpy() if level == 3 else parent
+        nodes['naics_level'] = level
+        levels.append(nodes.drop(columns=['naics_prefix'], errors='ignore'))
+    hierarchy = pd.concat(levels, ignore_index=True)
+
+    # Largest 6-digit industry (by employees) inside every node
+    largest = []
+    for level in NAICS_LEVELS:
+        node = sector_of(leaves['naics_prefix']) if level == 2 else leaves['naics_prefix'].str[:level]
+        top = leaves.assign(node=node.to_numpy()).sort_values('employees', ascending=False).drop_duplicates(['year', 'node'])
+        largest.append(top.assign(naics_level=level)[['year', 'naics_level', 'node', 'industry_description']])
+    hierarchy = hierarchy.merge(
+        pd.concat(largest).rename(columns={'industry_description': 'largest_industry'}),
+        on=['year', 'naics_level', 'node'], how='left'
+    )
+
+    children = hierarchy.groupby(['year', 'parent']).size().rename('children')
+    hierarchy = hierarchy.merge(children, left_on=['year', 'node'], right_index=True, how='left')
+    hierarchy['children'] = hierarchy['children'].fillna(0).astype('int32')
+
+    # Sector names, 6-digit descriptions, and the code alone in between
+    label = pd.Series('NAICS ' + hierarchy['node'], index=hierarchy.index)
+    is_sector = hierarchy['naics_level'] == 2
+    label[is_sector] = hierarchy.loc[is_sector, 'node'].map(SECTOR_NAMES).fillna('Sector ' + hierarchy.loc[is_sector, 'node'])
+    is_leaf = hierarchy['naics_level'] == 6
+    label[is_leaf] = hierarchy.loc[is_leaf, 'largest_industry'].fillna(label[is_leaf])
+    hierarchy['label'] = label
+
+    # Tile text: wrapped name and code (once when the name is the code); intermediate levels
+    # have no title, so show their largest industry
+    display = wrap_labels(label) + '<br>(' + hierarchy['node'] + ')'
+    is_code = label == 'NAICS ' + hierarchy['node']
+    display[is_code] = label[is_code]
+    is_mid = ~(is_sector | is_leaf) & hierarchy['largest_industry'].notna()
+    display[is_mid] = label[is_mid] + '<br>' + wrap_labels('incl. ' + hierarchy.loc[is_mid, 'largest_industry'])
+    hierarchy['display_label'] = display
+
+    return hierarchy.sort_values(['year', 'naics_level', 'node'], ignore_index=True)
+
+
+def children_of(hierarchy, year, node=ROOT):
+    """
+    Child nodes of one node in one year (the visible depth of a drill-down treemap).
+    """
+    return hierarchy[(hierarchy['year'] == year) & (hierarchy['parent'] == node)]
+
+
+def titled(label, node):
+    """
+    'label (code)' of a node, or the label alone when it already is 'NAICS <code>'.
+    """
+    return label if label == f'NAICS {node}' else f'{label} ({node})'
+
+
+def node_label(hierarchy, node):
+    if node == ROOT:
+        return 'All industries'
+    match = hierarchy.loc[hierarchy['node'] == node, 'label']
+    return titled(match.iloc[0], node) if len(match) else node
@@ -0,0 +1,311 @@
+"""Trigram and prefix index over establishment/company names."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from osha.estab_store import ESTAB_SUMMARY_PATH
+from osha.panel import YEARS
+from osha.store import CLEANED_CSV_PATH, has_year, load_cleaned_year, year_path
+
+NAME_INDEX_DIR = 'data/name_index'
+
+# Name columns of the yearly data with an index across every year
+YEAR_INDEX_COLUMNS = ['establishment_name', 'company_name']
+
+# Index over the establishment names of the Business Injury Rates listing
+SUMMARY_INDEX = 'estab_summary'
+
+# Match kinds, best first (used to rank top-k results)
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+
+def normalize(names):
+    """
+    Case-fold names and collapse runs of whitespace.
+
+    Parameters:
+    - names: Iterable of names (missing values allowed).
+
+    Returns:
+    - Series of normalized names, with missing values as empty strings.
+    """
+    names = pd.Series(names, dtype=object).fillna('').astype(str)
+    return names.str.casefold().str.split().str.join(' ')
+
+
+def _trigram_codes(name):
+    # Three code points packed into one int64 (21 bits each)
+    codes = [ord(c) for c in name]
+    return {(codes[i] << 42) | (codes[i + 1] << 21) | codes[i + 2] for i in range(len(codes) - 2)}
+
+
+class NameIndex:
+    """
+    Inverted trigram index plus a sorted prefix table over a column of names.
+
+    Rows are addressed by position in the indexed column. When the column is
+    several years concatenated, year_offsets maps global positions back to
+    positions within each year. sources fingerprints the files the column was
+    read from (see fingerprint), so an index whose positions no longer match
+    its sources can be detected.
+    """
+
+    def __init__(self, names, name_ids, row_order, row_offsets, sorted_names, gram_codes, gram_offsets,
+                 gram_postings, years=None, year_offsets=None, sources=None):
+        self.names = names                  # distinct normalized names
+        self.name_ids = name_ids            # row -> distinct name id
+        self.row_order = row_order          # rows grouped by name id
+        self.row_offsets = row_offsets      # CSR offsets into row_order per name id
+        self.sorted_names = sorted_names    # name ids in lexicographic order
+        self.gram_codes = gram_codes        # sorted distinct trigram codes
+        self.gram_offsets = gram_offsets    # CSR offsets into gram_postings per trigram
+        self.gram_postings = gram_postings  # name ids containing each trigram
+        self.years = years if years is not None else np.empty(0, dtype=np.int64)
+        self.year_offsets = year_offsets if year_offsets is not None else np.array([0, len(name_ids)])
+        self.sources = sources if sources is not None else np.empty(0, dtype=str)
+        self._sorted_values = names[sorted_names].astype(str)
+
+    @classmethod
+    def build(cls, names, years=None, year_offsets=None):
+        """
+        Build an index over a column of names.
+
+        Parameters:
+        - names: Names to index, one per row.
+        - years: Optional years the rows were concatenated from.
+        - year_offsets: Start position of each year plus the total row count.
+
+        Returns:
+        - NameIndex.
+        """
+        name_ids, uniques = pd.factorize(normalize(names))
+        uniques = np.asarray(uniques, dtype=object)
+        name_ids = name_ids.astype(np.int32)
+
+        row_order = np.argsort(name_ids, kind='stable').astype(np.int64)
+        row_offsets = np.concatenate([[0], np.cumsum(np.bincount(name_ids, minlength=len(uniques)))])
+
+        gram_lists = [_trigram_codes(name) for name in uniques]
+        lengths = np.fromiter((len(g) for g in gram_lists), dtype=np.int64, count=len(gram_lists))
+        all_codes = np.fromiter((c for g in gram_lists for c in g), dtype=np.int64, count=int(lengths.sum()))
+        owners = np.repeat(np.arange(len(uniques), dtype=np.int32), lengths)
+        order = np.lexsort((owners, all_codes))
+        all_codes, owners = all_codes[order], owners[order]
+        gram_codes, starts = np.unique(all_codes, return_index=True)
+        gram_offsets = np.append(starts, len(all_codes))
+
+        return cls(
+            uniques, name_ids, row_order, row_offsets, np.argsort(uniques.astype(str), kind='stable'),
+            gram_codes, gram_offsets, owners,
+            None if years is None else np.asarray(years, dtype=np.int64),
+            None if year_offsets is None else np.asarray(year_offsets, dtype=np.int64),
+        )
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(
+            path, names=self.names.astype(str), name_ids=self.name_ids, row_order=self.row_order,
+            row_offsets=self.row_offsets, sorted_names=self.sorted_names, gram_codes=self.gram_codes,
+            gram_offsets=self.gram_offsets, gram_postings=self.gram_postings, years=self.years,
+            year_offsets=self.year_offsets, sources=self.sources,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            arrays = {key: f[key] for key in f.files}
+        arrays['names'] = arrays['names'].astype(object)
+        return cls(**arrays)
+
+    def _prefix_ids(self, term):
+        lo = np.searchsorted(self._sorted_values, term, side='left')
+        hi = np.searchsorted(self._sorted_values, term + '\U0010ffff', side='left')
+        return self.sorted_names[lo:hi]
+
+    def _substring_ids(self, term):
+        grams = _trigram_codes(term)
+        if not grams:
+            # Too short for trigrams: check the distinct names directly
+            return np.flatnonzero(pd.Series(self.names).str.contains(term, regex=False).to_numpy())
+
+        candidates = None
+        for code in sorted(grams, key=self._posting_length):
+            i = np.searchsorted(self.gram_codes, code)
+            if i == len(self.gram_codes) or self.gram_codes[i] != code:
+                return np.empty(0, dtype=np.int64)
+            posting = self.gram_postings[self.gram_offsets[i]:self.gram_offsets[i + 1]]
+            candidates = posting if candidates is None else np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                return candidates
+
+        # Trigrams can match out of order, so verify the survivors
+        keep = pd.Series(self.names[candidates]).str.contains(term, regex=False).to_numpy()
+        return candidates[keep]
+
+    def _posting_length(self, code):
+        i = np.searchsorted(self.gram_codes, code)
+        if i == len(self.gram_codes) or self.gram_codes[i] != code:
+            return 0
+        return self.gram_offsets[i + 1] - self.gram_offsets[i]
+
+    def _rows(self, ids):
+        """
+        Rows of the given name ids, grouped in the order of ids.
+        """
+        if not len(ids):
+            return np.empty(0, dtype=np.int64)
+        if len(ids) < 1000:
+            return np.concatenate([self.row_order[self.row_offsets[i]:self.row_offsets[i + 1]] for i in ids])
+
+        # Many names: one vectorized pass over the rows instead of a slice per name
+        rank = np.full(len(self.names), len(ids), dtype=np.int64)
+        rank[ids] = np.arange(len(ids))
+        row_rank = rank[self.name_ids]
+        rows = np.flatnonzero(row_rank < len(ids))
+        return rows[np.argsort(row_rank[rows], kind='stable')]
+
+    def _to_year(self, rows, year):
+        if year is None:
+            return rows
+        k = int(np.flatnonzero(self.years == year)[0])
+        lo, hi = self.year_offsets[k], self.year_offsets[k + 1]
+        return rows[(rows >= lo) & (rows < hi)] - lo
+
+    def search(self, term, prefix=False, year=None):
+        """
+        Positions of the rows whose name contains (or starts with) term.
+
+        Parameters:
+        - term: Search text (normalized the same way as the names).
+        - prefix: Match only names starting with term.
+        - year: Restrict to one year's rows, returned as positions within that year.
+
+        Returns:
+        - Sorted array of row positions.
+        """
+        term = normalize([term]).iloc[0]
+        if not term:
+            return np.arange(len(self.name_ids)) if year is None else self._to_year(np.arange(len(self.name_ids)), year)
+        ids = self._prefix_ids(term) if prefix else self._substring_ids(term)
+        return np.sort(self._to_year(self._rows(ids), year))
+
+    def top_k(self, term, k=10, year=None):
+        """
+        Row positions of the best matches for term, best first.
+
+        Names are ranked exact match, then prefix, then word-prefix, then any
+        substring; ties go to names shared by more rows, then shorter names.
+
+        Parameters:
+        - term: Search text.
+        - k: Number of rows to return (None returns every match).
+        - year: Restrict to one year's rows.
+
+        Returns:
+        - Array of row positions.
+        """
+        term = normalize([term]).iloc[0]
+        ids = self._substring_ids(term) if term else np.arange(len(self.names))
+        if not len(ids):
+            return np.empty(0, dtype=np.int64)
+
+        matched = pd.Series(self.names[ids]).astype(str)
+        kind = np.full(len(ids), SUBSTRING)
+        kind[matched.str.contains(' ' + term, regex=False).to_numpy()] = WORD_PREFIX
+        kind[matched.str.startswith(term).to_numpy()] = PREFIX
+        kind[(matched == term).to_numpy()] = EXACT
+        counts = self.row_offsets[ids + 1] - self.row_offsets[ids]
+        ranked = ids[np.lexsort((matched.str.len().to_numpy(), -counts, kind))]
+
+        rows = self._to_year(self._rows(ranked), year)
+        return rows if k is None else rows[:k]
+
+    def year_rows(self, year):
+        k = int(np.flatnonzero(self.years == year)[0])
+        return self.year_offsets[k + 1] - self.year_offsets[k]
+
+
+def index_path(name, directory=NAME_INDEX_DIR):
+    return os.path.join(directory, f'{name}.npz')
+
+
+def fingerprint(paths):
+    """
+    'path|size|mtime_ns' of each source file, as stored with an index built from them.
+    """
+    stats = ((path, os.stat(path)) for path in paths)
+    return np.array([f'{path}|{stat.st_size}|{stat.st_mtime_ns}' for path, stat in stats], dtype=str)
+
+
+def index_sources(name):
+    """
+    Files an index is built from: the yearly store (or cleaned CSV) of every
+    year with data, or the establishment summary.
+    """
+    if name == SUMMARY_INDEX:
+        return [ESTAB_SUMMARY_PATH] if os.path.exists(ESTAB_SUMMARY_PATH) else []
+    paths = [year_path(year) if has_year(year) else CLEANED_CSV_PATH.format(year=year) for year in YEARS]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def build_indexes(names):
+    """
+    Build the named indexes from their current sources.
+
+    Year indexes are over every year with data, with positions that are rows
+    of the yearly store; the summary index is over the rows of the
+    establishment summary.
+
+    Parameters:
+    - names: Index names (YEAR_INDEX_COLUMNS and/or SUMMARY_INDEX).
+
+    Returns:
+    - Dict of name -> NameIndex, without the indexes that have no source.
+    """
+    indexes = {}
+    columns = [name for name in names if name in YEAR_INDEX_COLUMNS]
+    if columns:
+        sources = fingerprint(index_sources(columns[0]))
+        frames = {}
+        for year in YEARS:
+            df = load_cleaned_year(year, columns)
+            if df is not None:
+                frames[year] = df
+        if frames:
+            years = list(frames)
+            year_offsets = np.concatenate([[0], np.cumsum([len(frames[year]) for year in years])])
+            for column in columns:
+                index = NameIndex.build(pd.concat([frames[year][column] for year in years], ignore_index=True),
+                                        years, year_offsets)
+                index.sources = sources
+                indexes[column] = index
+
+    if SUMMARY_INDEX in names and index_sources(SUMMARY_INDEX):
+        sources = fingerprint(index_sources(SUMMARY_INDEX))
+        summary = pd.read_parquet(ESTAB_SUMMARY_PATH, columns=['establishment_name'])
+        indexes[SUMMARY_INDEX] = NameIndex.build(summary['establishment_name'])
+        indexes[SUMMARY_INDEX].sources = sources
+    return indexes
+
+
+def load_index(name, directory=NAME_INDEX_DIR):
+    """
+    A saved index, rebuilt and saved again when its source files changed since
+    it was built (its row positions would point at the wrong rows otherwise).
+
+    Returns:
+    - NameIndex, or None if it has never been built or has no source left.
+    """
+    path = index_path(name, directory)
+    sources = index_sources(name)
+    if not (os.path.exists(path) and sources):
+        return None
+    index = NameIndex.load(path)
+    if np.array_equal(index.sources, fingerprint(sources)):
+        return index
+
+    index = build_indexes([name]).get(name)
+    if index is not None:
+        index.save(path)
+    return index
@@ -0,0 +1,122 @@
+"""Establishment x year panel built from the cleaned yearly ITA data."""
+import json
+
+import numpy as np
+import pandas as pd
+
+YEARS = list(range(2016, 2024))
+
+# Derived columns kept out of the per-establishment records
+DERIVED_COLUMNS = ['injury_rate']
+
+
+def build_panel(frames, years=YEARS, min_years=6):
+    """
+    Stack the yearly frames into a long establishment x year panel.
+
+    Every kept establishment gets exactly one row per year in `years`, with
+    NaN in the years it did not report.
+
+    Parameters:
+    - frames: Dict mapping year -> cleaned DataFrame for that year.
+    - years: Ordered list of years forming the panel slots.
+    - min_years: Minimum number of reported years for an establishment to be kept.
+
+    Returns:
+    - DataFrame indexed by (establishment_id, year), sorted by establishment then year.
+    """
+    stacked = pd.concat(
+        [df.assign(year=year) for year, df in frames.items() if year in years],
+        ignore_index=True
+    )
+
+    # One record per establishment and year (later rows win, as the dict build did)
+    stacked = stacked.drop_duplicates(subset=['establishment_id', 'year'], keep='last')
+
+    # Min-years filter as a vector mask
+    year_counts = stacked['establishment_id'].map(stacked['establishment_id'].value_counts())
+    stacked = stacked[year_counts.to_numpy() >= min_years]
+
+    ids = np.sort(stacked['establishment_id'].unique())
+    full_index = pd.MultiIndex.from_product([ids, years], names=['establishment_id', 'year'])
+    panel = stacked.set_index(['establishment_id', 'year']).reindex(full_index)
+    return panel.drop(columns=[c for c in DERIVED_COLUMNS if c in panel.columns])
+
+
+def _column_values(series):
+    # Integral float columns go out as ints, missing values as None
+    if pd.api.types.is_float_dtype(series):
+        present = series.dropna()
+        if (present % 1 == 0).all():
+            series = series.astype('Int64')
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def panel_to_records(panel, years=YEARS):
+    """
+    Convert a panel to the {establishment_id: {field: [one value per year]}} shape.
+
+    Parameters:
+    - panel: DataFrame returned by build_panel.
+    - years: Years the panel was built over.
+
+    Returns:
+    - Dict keyed by establishment ID as a string.
+    """
+    width = len(years)
+    ids = panel.index.get_level_values('establishment_id')[::width]
+    columns = {col: _column_values(panel[col]) for col in panel.columns}
+
+    records = {}
+    for i, establishment_id in enumerate(ids):
+        start = i * width
+        records[str(establishment_id)] = {col: values[start:start + width] for col, values in columns.items()}
+    return records
+
+
+def summarize_panel(panel):
+    """
+    One summary row per establishment for the Business Injury Rates listing.
+
+    Parameters:
+    - panel: DataFrame returned by build_panel / read_panel.
+
+    Returns:
+    - DataFrame with the first non-empty company and establishment names, the
+      mean employees and injuries over reported years and their ratio.
+    """
+    names = panel[['company_name', 'establishment_name']].astype(object)
+    names = names.mask(names.isin([''])).groupby(level='establishment_id').first().fillna('N/A')
+
+    means = panel.groupby(level='establishment_id')[['annual_average_employees', 'total_injuries']].mean()
+
+    summary = pd.DataFrame({
+        'establishment_id': names.index.astype(str),
+        'company_name': names['company_name'].to_numpy(),
+        'establishment_name': names['establishment_name'].to_numpy(),
+        'avg_annual_employees': means['annual_average_employees'].to_numpy(dtype='float64'),
+        'avg_annual_injuries': means['total_injuries'].to_numpy(dtype='float64'),
+    })
+    summary['avg_injuries_per_employee'] = summary['avg_annual_injuries'] / summary['avg_annual_employees']
+    return summary
+
+
+def write_panel(panel, path):
+    """
+    Write the panel in its compact binary (Parquet) form.
+    """
+    panel.reset_index().to_parquet(path, index=False)
+
+
+def read_panel(path):
+    """
+    Read a panel written by write_panel.
+    """
+    return pd.read_parquet(path).set_index(['establishment_id', 'year'])
+
+
+def write_records_json(records, path):
+    with open(path, 'w') as json_file:
+        json.dump(records, json_file, separators=(',', ':'))
@@ -0,0 +1,33 @@
+"""Process-pool fan-out for per-year pipeline work."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def resolve_workers(workers):
+    """
+    Number of worker processes for a --workers value (0 means one per CPU).
+    """
+    return (os.cpu_count() or 1) if workers == 0 else max(workers, 1)
+
+
+def map_years(func, years, workers=1):
+    """
+    Apply func to every year, in a process pool when workers > 1.
+
+    Results come back in the order of `years` whatever order the workers
+    finish in, so callers merge them exactly as the serial loop would.
+
+    Parameters:
+    - func: Picklable function of one year (top-level function or functools.partial).
+    - years: Years to process.
+    - workers: Number of worker processes (1 runs serially, 0 uses every CPU).
+
+    Returns:
+    - List of func results, one per year.
+    """
+    years = list(years)
+    workers = min(resolve_workers(workers), len(years)) if years else 1
+    if workers <= 1:
+        return [func(year) for year in years]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, years))
@@ -0,0 +1,212 @@
+"""Incremental, dependency-aware runner for the preprocessing scripts."""
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+MANIFEST_PATH = 'data/.pipeline_manifest.json'
+
+# Sources of the osha package, imported by the stage scripts
+PACKAGE_SOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py')
+
+
+class Stage:
+    """
+    One pipeline step: a script run with arguments, its input and output globs
+    and the stages that must finish before it. Inputs listed in `required`
+    must each match a file, or the stage is skipped.
+    """
+
+    def __init__(self, name, script, inputs, outputs, deps=(), args=(), required=()):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.required = list(required)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.args = list(args)
+
+    def has_inputs(self, root=''):
+        """
+        Whether any input exists and every required input does (globs taken relative to root).
+        """
+        def matches(patterns):
+            return expand(os.path.join(root, pattern) for pattern in patterns)
+        return bool(matches(self.inputs)) and all(matches([pattern]) for pattern in self.required)
+
+    def command(self):
+        return [sys.executable, self.script] + self.args
+
+    def __repr__(self):
+        return f'Stage({self.name!r})'
+
+
+def expand(patterns):
+    """
+    Sorted list of files matching any of the glob patterns (directories are walked).
+    """
+    files = set()
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    files.update(os.path.join(root, name) for name in names)
+            else:
+                files.add(path)
+    return sorted(files)
+
+
+class Manifest:
+    """
+    Content hashes of every stage's inputs and code at its last successful run.
+
+    File hashes are cached by (size, mtime), so unchanged multi-GB inputs are
+    not re-read on every run.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.data = {'files': {}, 'stages': {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.data = json.load(f)
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        cached = self.data['files'].get(path)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        sha = digest.hexdigest()
+        self.data['files'][path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha}
+        return sha
+
+    def code_hash(self, stage):
+        """
+        Hash over the contents of the stage's script and of every osha module,
+        so a code change reruns the stages it may affect.
+        """
+        digest = hashlib.sha256()
+        for path in [stage.script] + expand([PACKAGE_SOURCES]):
+            if os.path.exists(path):
+                digest.update(self.file_hash(path).encode())
+        return digest.hexdigest()
+
+    def inputs_hash(self, stage):
+        """
+        Hash over the stage's command, its code and the names and contents of its input files.
+        """
+        digest = hashlib.sha256(json.dumps([stage.script] + stage.args).encode())
+        digest.update(self.code_hash(stage).encode())
+        for path in expand(stage.inputs):
+            digest.update(path.encode())
+            digest.update(self.file_hash(path).encode())
+        return digest.hexdigest()
+
+    def is_current(self, stage):
+        if not all(glob.glob(pattern) for pattern in stage.outputs):
+            return False
+        return self.data['stages'].get(stage.name) == self.inputs_hash(stage)
+
+    def record(self, stage):
+        self.data['stages'][stage.name] = self.inputs_hash(stage)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def run_pipeline(stages, manifest=None, workers=1, force=False, dry_run=False, log=print):
+    """
+    Run the stages whose inputs changed since their last run, in dependency order.
+
+    A stage is checked only once all of its dependencies have finished, so a
+    rebuilt upstream output changes its inputs hash and it runs too.
+    Independent stages run concurrently, up to `workers` at a time.
+
+    Parameters:
+    - stages: List of Stage.
+    - manifest: Manifest to check and update (default: MANIFEST_PATH).
+    - workers: Maximum number of stages running at once.
+    - force: Run every stage regardless of the manifest.
+    - dry_run: Only report which stages are out of date (assumes upstream stages stay current).
+    - log: Function used to report progress.
+
+    Returns:
+    - Dict mapping stage name to 'ran', 'skipped', 'failed' or 'blocked'.
+      Stages with no input files yet, or missing a required one, are skipped.
+    """
+    manifest = manifest or Manifest()
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f'Stage {stage.name} depends on unknown stages {missing}')
+
+    status = {}
+    pending = list(stages)
+    running = {}
+
+    workers = max(workers, 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            progressed = False
+            for stage in list(pending):
+                dep_status = [status.get(dep) for dep in stage.deps]
+                if any(s in ('failed', 'blocked') for s in dep_status):
+                    pending.remove(stage)
+                    status[stage.name] = 'blocked'
+                    log(f'[blocked] {stage.name}')
+                    progressed = True
+                elif None not in dep_status and len(running) < workers:
+                    pending.remove(stage)
+                    progressed = True
+                    if not stage.has_inputs():
+                        status[stage.name] = 'skipped'
+                        log(f'[no inputs] {stage.name}')
+                    elif not force and manifest.is_current(stage):
+                        status[stage.name] = 'skipped'
+                        log(f'[up to date] {stage.name}')
+                    elif dry_run:
+                        status[stage.name] = 'skipped'
+                        log(f'[would run] {stage.name}')
+                    else:
+                        log(f'[run] {stage.name}: {" ".join(stage.command()[1:])}')
+                        running[pool.submit(_run, stage)] = stage
+
+            if not running:
+                if pending and not progressed:
+                    raise ValueError(f'Dependency cycle among {pending}')
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                returncode, seconds = future.result()
+                if returncode == 0:
+                    manifest.record(stage)
+                    manifest.save()
+                    status[stage.name] = 'ran'
+                    log(f'[done] {stage.name} in {seconds:.1f}s')
+                else:
+                    status[stage.name] = 'failed'
+                    log(f'[failed] {stage.name} (exit code {returncode})')
+
+    return status
+
+
+def _run(stage):
+    start = time.perf_counter()
+    returncode = subprocess.run(stage.command()).returncode
+    return returncode, time.perf_counter() - start
@@ -0,0 +1,269 @@
+"""
+Disk-backed result cache shared by every process on the machine.
+
+Results of the dashboard loaders are stored under CACHE_DIR, keyed by the
+function, its arguments and a content hash of its input files, so a restart
+or another worker process reads the stored result instead of re-parsing the
+inputs, and a changed input file is never served stale. DataFrames are
+stored as Parquet (dtypes, categories and index kept), anything else is
+pickled. A SQLite index records the size and last use of each entry; once
+the total exceeds the byte budget the least recently used entries are
+deleted.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+CACHE_DIR = os.environ.get('OSHA_CACHE_DIR', 'data/cache')
+
+# Byte budget of the cache (0 turns it off)
+CACHE_MB = float(os.environ.get('OSHA_CACHE_MB', 2048))
+
+# Bump when a cached function's output changes for the same inputs
+CACHE_VERSION = 2
+
+HASH_BLOCK = 1 << 20
+
+
+class ResultCache:
+    """
+    Byte-bounded LRU store of function results on local disk.
+
+    Entries are written to a temporary file and renamed into place, and the
+    index is a SQLite database in WAL mode, so any number of processes can
+    read and write the same cache directory.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=int(CACHE_MB * 2**20)):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._digests = {}
+        self._local = threading.local()
+        os.makedirs(root, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS entries '
+                         '(key TEXT PRIMARY KEY, file TEXT, bytes INTEGER, last_used REAL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS files '
+                         '(path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)')
+
+    def _conn(self):
+        # One connection per thread; SQLite serializes writers across processes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.root, 'index.sqlite'), timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def file_digest(self, path):
+        """
+        Content hash of an input file, recomputed only when its size or
+        modification time changes (remembered in the index for other processes).
+        """
+        if not os.path.exists(path):
+            return 'missing'
+        stat = os.stat(path)
+        signature = (path, stat.st_size, stat.st_mtime_ns)
+        if signature in self._digests:
+            return self._digests[signature]
+
+        row = self._conn().execute('SELECT size, mtime_ns, digest FROM files WHERE path = ?', (path,)).fetchone()
+        if row is not None and tuple(row[:2]) == signature[1:]:
+            digest = row[2]
+        else:
+            h = hashlib.blake2b(digest_size=16)
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK), b''):
+                    h.update(block)
+            digest = h.hexdigest()
+            self._conn().execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)', (path, *signature[1:], digest))
+        self._digests[signature] = digest
+        return digest
+
+    def key(self, name, arguments, inputs):
+        """
+        Cache key of a call: function name, arguments and input file hashes.
+        """
+        parts = [CACHE_VERSION, name, sorted(arguments.items()), [(p, self.file_digest(p)) for p in inputs]]
+        return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """
+        Stored result of a key, or None on a miss.
+        """
+        row = self._conn().execute('SELECT file FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        path = os.path.join(self.root, row[0])
+        try:
+            value = pd.read_parquet(path) if path.endswith('.parquet') else _read_pickle(path)
+        except (FileNotFoundError, EOFError):
+            # Evicted by another process since the lookup
+            return None
+        self._conn().execute('UPDATE entries SET last_used = ? WHERE key = ?', (time.time(), key))
+        return value
+
+    def __contains__(self, key):
+        return self._conn().execute('SELECT 1 FROM entries WHERE key = ?', (key,)).fetchone() is not None
+
+    def put(self, key, value):
+        """
+        Store a result and evict least recently used entries past the budget.
+        """
+        file = key + ('.parquet' if isinstance(value, pd.DataFrame) else '.pkl')
+        path = os.path.join(self.root, file)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            if file.endswith('.parquet'):
+                try:
+                    value.to_parquet(tmp_path)
+                except (ValueError, TypeError, pa.ArrowException):
+                    # Mixed-type columns Parquet cannot hold are pickled instead
+                    file = key + '.pkl'
+                    path = os.path.join(self.root, file)
+                    _write_pickle(value, tmp_path)
+            else:
+                _write_pickle(value, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        size = os.path.getsize(path)
+        if size > self.max_bytes:
+            os.remove(path)
+            return
+        self._conn().execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)', (key, file, size, time.time()))
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits its byte budget.
+        """
+        conn = self._conn()
+        total = conn.execute('SELECT COALESCE(SUM(bytes), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, file, size in conn.execute('SELECT key, file, bytes FROM entries ORDER BY last_used').fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            try:
+                os.remove(os.path.join(self.root, file))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        entries, total = self._conn().execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries').fetchone()
+        return {'entries': entries, 'bytes': total, 'max_bytes': self.max_bytes}
+
+
+def _write_pickle(value, path):
+    with open(path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def default_cache():
+    """
+    The process's cache on CACHE_DIR, or None when OSHA_CACHE_MB is 0.
+    """
+    global _cache
+    if CACHE_MB <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
+
+
+def use_cache(root):
+    """
+    Point the process's default cache at another directory (a fresh one makes
+    every loader call cold), returning it; None when OSHA_CACHE_MB is 0.
+    """
+    global _cache
+    if CACHE_MB <= 0:
+        return None
+    with _cache_lock:
+        _cache = ResultCache(root)
+        return _cache
+
+
+def disk_cached(inputs):
+    """
+    Decorator storing a function's results in the default cache.
+
+    Parameters:
+    - inputs: Function taking the same arguments and returning the paths of
+      the files the result is computed from.
+
+    The wrapped function gets a `key(*args, **kwargs)` attribute returning
+    the cache key of a call (None when the cache is off), used to check
+    whether a warm-up still has work to do.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        def call_key(cache, args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return cache.key(f'{func.__module__}.{func.__qualname__}', bound.arguments, inputs(*args, **kwargs))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = default_cache()
+            if cache is None:
+                return func(*args, **kwargs)
+            key = call_key(cache, args, kwargs)
+            value = cache.get(key)
+            if value is None:
+                value = func(*args, **kwargs)
+                cache.put(key, value)
+            return value
+
+        def key(*args, **kwargs):
+            cache = default_cache()
+            return None if cache is None else call_key(cache, args, kwargs)
+
+        wrapper.key = key
+        return wrapper
+    return decorate
+
+
+def warm(calls):
+    """
+    Compute and store every (function, args) call whose result is not cached yet.
+
+    Parameters:
+    - calls: (disk_cached function, tuple of arguments) pairs.
+
+    Returns:
+    - Number of results computed.
+    """
+    cache = default_cache()
+    if cache is None:
+        return 0
+    computed = 0
+    for func, args in calls:
+        if func.key(*args) not in cache:
+            func(*args)
+            computed += 1
+    return computed
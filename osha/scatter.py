@@ -0,0 +1,262 @@
+"""Point-count-aware rendering strategies for large scatter plots."""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Up to this many points an SVG trace stays responsive
+SVG_MAX_POINTS = 5_000
+
+# Up to this many points a WebGL trace is still reasonable to ship
+WEBGL_MAX_POINTS = 100_000
+
+# Points kept by the sampling strategy
+SAMPLE_POINTS = 20_000
+
+# Cells per axis of the density grid
+DENSITY_BINS = 150
+
+# Points sent to a 3D trace
+POINT_BUDGET_3D = 20_000
+
+# Cells per axis of the 3D voxel grid
+VOXEL_BINS = 30
+
+RENDER_MODES = ['Auto', 'All points', 'Sampled', 'Density']
+
+
+def choose_strategy(n_points, mode='Auto'):
+    """
+    Pick how to draw a scatter of n_points.
+
+    Parameters:
+    - n_points: Number of points to plot.
+    - mode: One of RENDER_MODES; 'Auto' picks from the point count.
+
+    Returns:
+    - 'svg', 'webgl', 'sample' or 'density'.
+    """
+    if mode == 'Sampled':
+        return 'sample' if n_points > SAMPLE_POINTS else choose_strategy(n_points)
+    if mode == 'Density':
+        return 'density'
+    if n_points <= SVG_MAX_POINTS:
+        return 'svg'
+    if n_points <= WEBGL_MAX_POINTS or mode == 'All points':
+        return 'webgl'
+    return 'density'
+
+
+def _axis_values(series, log):
+    values = series.to_numpy(dtype='float64')
+    if log:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(values > 0, np.log10(values), np.nan)
+    return values
+
+
+def stratified_sample(df, x, y, n=SAMPLE_POINTS, log_x=False, log_y=False, outlier_columns=(), bins=None,
+                      outlier_quantile=0.001, seed=0, z=None, log_z=False):
+    """
+    Sample rows evenly across a 2D (or 3D) grid while keeping sparse cells and extremes.
+
+    Every non-empty grid cell keeps at least one point, so isolated points
+    survive, and rows in the outer quantiles of the axes and outlier_columns
+    are always kept.
+
+    Parameters:
+    - df: DataFrame to sample.
+    - x, y: Plotted columns.
+    - n: Target number of rows.
+    - log_x, log_y: Bin in log space for log axes.
+    - outlier_columns: Extra columns whose extremes are always kept (e.g. the color field).
+    - bins: Grid cells per axis (default: about n / 4 cells in total).
+    - outlier_quantile: Fraction kept at each tail of every column.
+    - seed: Random seed (the sample is deterministic for a given input).
+    - z, log_z: Optional third axis for 3D plots.
+
+    Returns:
+    - The sampled rows, in their original order.
+    """
+    if len(df) <= n:
+        return df
+
+    axes = [_axis_values(df[x], log_x), _axis_values(df[y], log_y)]
+    if z is not None:
+        axes.append(_axis_values(df[z], log_z))
+    if bins is None:
+        # Keep the one-point-per-cell floor well under the target size
+        bins = max(int((n / 4) ** (1 / len(axes))), 2)
+    cells = _cells(axes, bins)
+
+    # Rank rows randomly within their cell and keep each cell's proportional quota
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(df)), cells))
+    sorted_cells = cells[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    counts = np.diff(np.r_[starts, len(df)])
+    rank = np.arange(len(df)) - np.repeat(starts, counts)
+    quota = np.maximum(1, np.floor(counts * n / len(df))).astype(np.int64)
+    keep = np.zeros(len(df), dtype=bool)
+    keep[order[rank < np.repeat(quota, counts)]] = True
+
+    for values in axes + [df[col].to_numpy(dtype='float64') for col in outlier_columns]:
+        finite = values[np.isfinite(values)]
+        if len(finite):
+            lo, hi = np.quantile(finite, [outlier_quantile, 1 - outlier_quantile])
+            keep |= (values < lo) | (values > hi)
+
+    return df[keep]
+
+
+def _bin(values, bins):
+    # Grid cell per value; missing values share an extra cell
+    finite = np.isfinite(values)
+    out = np.full(len(values), bins, dtype=np.int64)
+    if finite.any():
+        lo, hi = values[finite].min(), values[finite].max()
+        scaled = (values[finite] - lo) / (hi - lo) if hi > lo else np.zeros(finite.sum())
+        out[finite] = np.minimum((scaled * bins).astype(np.int64), bins - 1)
+    return out
+
+
+def _cells(axes, bins):
+    # One grid cell id per row from the per-axis bins
+    cells = np.zeros(len(axes[0]), dtype=np.int64)
+    for values in axes:
+        cells = cells * (bins + 1) + _bin(values, bins)
+    return cells
+
+
+def voxel_aggregate(df, x, y, z, color, log_x=True, log_y=True, log_z=True, bins=VOXEL_BINS):
+    """
+    Collapse points into a 3D voxel grid (in log space for log axes).
+
+    Parameters:
+    - df: DataFrame with the points.
+    - x, y, z: Plotted columns.
+    - color: Column averaged per voxel.
+    - log_x, log_y, log_z: Bin and average in log space for log axes.
+    - bins: Cells per axis.
+
+    Returns:
+    - DataFrame with one row per non-empty voxel: mean position (geometric
+      mean on log axes), mean color and the number of points.
+    """
+    logs = {x: log_x, y: log_y, z: log_z}
+    coords = {col: _axis_values(df[col], log) for col, log in logs.items()}
+    finite = np.logical_and.reduce([np.isfinite(v) for v in coords.values()])
+
+    grid = pd.DataFrame({col: values[finite] for col, values in coords.items()})
+    grid['_color'] = df[color].to_numpy(dtype='float64')[finite]
+    grid['_cell'] = _cells([grid[col].to_numpy() for col in logs], bins)
+
+    voxels = grid.groupby('_cell').agg(
+        **{col: (col, 'mean') for col in logs}, color=('_color', 'mean'), points=('_color', 'size')
+    ).reset_index(drop=True)
+    for col, log in logs.items():
+        if log:
+            voxels[col] = 10 ** voxels[col]
+    return voxels.rename(columns={'color': color}) if color not in logs else voxels
+
+
+def scatter_3d_figure(df, x, y, z, color, mode='Sampled', budget=POINT_BUDGET_3D, height=800):
+    """
+    3D scatter that sends at most `budget` markers to the browser.
+
+    Parameters:
+    - df: DataFrame with the points.
+    - x, y, z: Plotted columns (drawn on log axes).
+    - color: Column for the color scale.
+    - mode: 'Sampled' (outlier-preserving sample) or 'Voxel' (voxel-grid aggregation).
+    - budget: Maximum number of markers.
+    - height: Figure height.
+
+    Returns:
+    - (Plotly Figure, description of what is drawn).
+    """
+    if len(df) <= budget:
+        plot_df, note, size = df, f"Showing all {len(df):,} points.", None
+    elif mode == 'Voxel':
+        plot_df = voxel_aggregate(df, x, y, z, color)
+        size = np.log1p(plot_df['points'])
+        note = f"{len(df):,} points aggregated into {len(plot_df):,} voxels (marker size = point count)."
+    else:
+        plot_df = stratified_sample(df, x, y, n=budget, log_x=True, log_y=True, outlier_columns=[color], z=z, log_z=True)
+        size = None
+        note = f"Showing a stratified sample of {len(plot_df):,} of {len(df):,} points."
+
+    fig = px.scatter_3d(plot_df, x=x, y=y, z=z, color=color, size=size, height=height, log_x=True, log_y=True, log_z=True, color_continuous_scale='temps')
+    if size is None:
+        # Update trace to set marker size
+        fig.update_traces(marker=dict(size=3, sizeref=1))
+    return fig, note
+
+
+def density_figure(df, x, y, log_x=False, log_y=False, bins=DENSITY_BINS, title=None):
+    """
+    2D histogram of the points, binned server-side (in log space for log axes).
+
+    The payload is bins x bins cells whatever the number of points. Log axes
+    are drawn in log10 units with tick labels in the original units.
+
+    Parameters:
+    - df: DataFrame with the points.
+    - x, y: Plotted columns.
+    - log_x, log_y: Bin and draw the axis in log space.
+    - bins: Cells per axis.
+    - title: Figure title.
+
+    Returns:
+    - Plotly Figure with one Heatmap trace.
+    """
+    xv = _axis_values(df[x], log_x)
+    yv = _axis_values(df[y], log_y)
+    finite = np.isfinite(xv) & np.isfinite(yv)
+    counts, x_edges, y_edges = np.histogram2d(xv[finite], yv[finite], bins=bins)
+
+    z = counts.T
+    z[z == 0] = np.nan
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=np.log10(z),
+        customdata=z,
+        colorscale='Sunset',
+        colorbar=dict(title='Points (log10)'),
+        hovertemplate='Points: %{customdata:,.0f}<extra></extra>',
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    _log_ticks(fig, 'xaxis', x_edges, log_x)
+    _log_ticks(fig, 'yaxis', y_edges, log_y)
+    return fig
+
+
+def _log_ticks(fig, axis, edges, log):
+    if not log or not len(edges):
+        return
+    powers = np.arange(np.floor(edges[0]), np.ceil(edges[-1]) + 1)
+    fig.update_layout({axis: dict(tickvals=powers, ticktext=[f'{10 ** p:g}' for p in powers])})
+
+
+def points_in_region(df, x, y, x_range, y_range):
+    """
+    Rows whose x and y fall inside the given (inclusive) ranges.
+    """
+    return df[df[x].between(*x_range) & df[y].between(*y_range)]
+
+
+def add_region_points(fig, region_df, x, y, log_x, log_y, hover_columns, hovertemplate):
+    """
+    Overlay a region's points (with hover detail) on a density figure.
+    """
+    fig.add_trace(go.Scattergl(
+        x=_axis_values(region_df[x], log_x),
+        y=_axis_values(region_df[y], log_y),
+        mode='markers',
+        marker=dict(size=4, color='black', opacity=0.6),
+        customdata=region_df[list(hover_columns)].to_numpy(),
+        hovertemplate=hovertemplate + '<extra></extra>',
+        showlegend=False,
+    ))
+    return fig
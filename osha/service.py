@@ -0,0 +1,343 @@
+"""
+Read-only HTTP query service over the dashboard's aggregates.
+
+Data is loaded once per process and shared by every request; responses are
+cached by endpoint and parameters and carry an ETag, so a client repeating a
+query gets the cached body (or a 304 when it sends If-None-Match) without
+touching the data. Bodies are JSON or an Arrow IPC stream.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+import pandas as pd
+import pyarrow as pa
+
+from osha.correlation import injured_rows
+from osha.cube import CUBE_PATH, NAICS_LEVELS, US_STATES, load_cube, slice_cube, state_year_metrics
+from osha.estab_store import ESTAB_STORE_PATH, EstablishmentStore
+from osha.panel import YEARS
+from osha.store import load_cleaned_year
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+JSON_TYPE = 'application/json'
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Responses kept in memory, least recently used dropped first
+CACHE_BYTES = 256 * 2**20
+
+# Rows returned by /establishments when no limit is given, and the largest limit allowed
+DEFAULT_LIMIT = 1_000
+MAX_LIMIT = 100_000
+
+# Endpoint -> parameters, served at /
+ENDPOINTS = {
+    '/establishments': 'year (required), state, naics, size, name, min_employees, columns, limit, offset',
+    '/naics': 'year, level (2-6, default 6), state, size, prefix',
+    '/states': 'state',
+    '/establishment/<id>': '',
+}
+
+
+class QueryError(Exception):
+    """
+    A request that cannot be answered, with its HTTP status.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU map of response key -> (ETag, content type, body), bounded in bytes.
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry[2])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= len(self._entries.pop(key)[2])
+            self._entries[key] = entry
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self.bytes -= len(self._entries.popitem(last=False)[1][2])
+
+
+def _list(params, name):
+    """
+    Values of a repeatable, comma-separated parameter, or None if it is absent.
+    """
+    values = [v.strip() for value in params.get(name, []) for v in value.split(',') if v.strip()]
+    return values or None
+
+
+def _one(params, name, cast=str, default=None):
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        return cast(values[-1])
+    except ValueError:
+        raise QueryError(400, f'invalid value for {name}: {values[-1]!r}')
+
+
+def etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def to_arrow(df):
+    sink = io.BytesIO()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def to_json(df, **extra):
+    rows = df.to_json(orient='records', date_format='iso')
+    head = json.dumps(extra)[:-1] + (', ' if extra else '')
+    return (head + '"rows": ' + rows + '}').encode()
+
+
+class QueryService:
+    """
+    The aggregates behind the dashboard pages, answered from data loaded once.
+
+    Yearly establishment rows (the Correlation page's rows: establishments
+    with injuries), the rollup cube and the establishment store are each
+    loaded on first use and kept for the life of the process.
+    """
+
+    def __init__(self, cache_bytes=CACHE_BYTES, cube_path=CUBE_PATH, store_path=ESTAB_STORE_PATH):
+        self.cache = ResponseCache(cache_bytes)
+        self.cube_path = cube_path
+        self.store_path = store_path
+        self._years = {}
+        self._cube = None
+        self._store = None
+        self._lock = threading.Lock()
+
+    def year_frame(self, year):
+        with self._lock:
+            if year not in self._years:
+                df = load_cleaned_year(year)
+                self._years[year] = None if df is None else injured_rows(df)
+            df = self._years[year]
+        if df is None:
+            raise QueryError(404, f'no data for {year}')
+        return df
+
+    def cube(self):
+        with self._lock:
+            if self._cube is None and os.path.exists(self.cube_path):
+                self._cube = load_cube(self.cube_path)
+            return self._cube
+
+    def store(self):
+        with self._lock:
+            if self._store is None and os.path.exists(self.store_path):
+                self._store = EstablishmentStore(self.store_path)
+            return self._store
+
+    def establishments(self, params):
+        year = _one(params, 'year', int)
+        if year is None:
+            raise QueryError(400, 'year is required')
+        df = self.year_frame(year)
+
+        keep = pd.Series(True, index=df.index)
+        states = _list(params, 'state')
+        if states:
+            keep &= df['state'].isin([s.upper() for s in states])
+        naics = _list(params, 'naics')
+        if naics:
+            keep &= df['naics_code'].astype(str).str.startswith(tuple(naics))
+        sizes = _list(params, 'size')
+        if sizes:
+            keep &= df['size'].isin(sizes)
+        name = _one(params, 'name')
+        if name:
+            keep &= df['establishment_name'].str.contains(name, case=False, na=False, regex=False)
+        min_employees = _one(params, 'min_employees', float)
+        if min_employees is not None:
+            keep &= df['annual_average_employees'] >= min_employees
+
+        columns = _list(params, 'columns')
+        if columns:
+            unknown = [c for c in columns if c not in df.columns]
+            if unknown:
+                raise QueryError(400, f'unknown columns: {", ".join(unknown)}')
+        limit = _one(params, 'limit', int, DEFAULT_LIMIT)
+        offset = _one(params, 'offset', int, 0)
+        if limit < 0 or offset < 0:
+            raise QueryError(400, 'limit and offset must not be negative')
+        limit = min(limit, MAX_LIMIT)
+
+        selected = df[keep.to_numpy()]
+        page = selected.iloc[offset:offset + limit]
+        if columns:
+            page = page[columns]
+        return page, {'total': len(selected), 'offset': offset, 'limit': limit}
+
+    def naics(self, params):
+        cube = self.cube()
+        if cube is None:
+            raise QueryError(503, 'rollup cube not built; run scripts/build_rollup_cube.py')
+        level = _one(params, 'level', int, 6)
+        if level not in NAICS_LEVELS:
+            raise QueryError(400, f'level must be one of {NAICS_LEVELS}')
+        try:
+            years = [int(y) for y in _list(params, 'year') or []] or None
+        except ValueError:
+            raise QueryError(400, 'year must be a list of years')
+        states = _list(params, 'state')
+        by = ['year', 'naics_prefix'] + (['industry_description'] if level == 6 else [])
+        return slice_cube(
+            cube, by, naics_level=level, years=years, states=[s.upper() for s in states] if states else None,
+            sizes=_list(params, 'size'), naics_prefix=_one(params, 'prefix'),
+        ), {}
+
+    def states(self, params):
+        cube = self.cube()
+        states = [s.upper() for s in _list(params, 'state') or US_STATES]
+        if cube is not None:
+            return state_year_metrics(cube, states), {}
+        metrics = pd.read_csv('data/state_year_metrics.csv')
+        return metrics[metrics['state'].isin(states)], {}
+
+    def establishment(self, establishment_id):
+        store = self.store()
+        record = store.get(establishment_id) if store is not None else None
+        if record is None:
+            raise QueryError(404, f'establishment {establishment_id} not found')
+        history = pd.DataFrame(record, index=YEARS).rename_axis('year').reset_index()
+        return history, {'establishment_id': establishment_id}
+
+    def query(self, path, params):
+        """
+        DataFrame and extra JSON fields answering one endpoint.
+        """
+        if path == '/establishments':
+            return self.establishments(params)
+        if path == '/naics':
+            return self.naics(params)
+        if path == '/states':
+            return self.states(params)
+        if path.startswith('/establishment/'):
+            return self.establishment(path[len('/establishment/'):])
+        raise QueryError(404, f'unknown endpoint {path}')
+
+    def respond(self, path, params, fmt):
+        """
+        (ETag, content type, body) of a query, from the cache when it has been answered before.
+        """
+        key = (path, tuple(sorted((k, tuple(v)) for k, v in params.items() if k != 'format')), fmt)
+        entry = self.cache.get(key)
+        if entry is None:
+            df, extra = self.query(path, params)
+            body = to_arrow(df) if fmt == 'arrow' else to_json(df, **extra)
+            entry = (etag(body), ARROW_TYPE if fmt == 'arrow' else JSON_TYPE, body)
+            self.cache.put(key, entry)
+        return entry
+
+
+def make_handler(service):
+    """
+    Request handler class answering GET requests from `service`.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+            path = url.path.rstrip('/') or '/'
+            if path == '/':
+                return self._send(200, JSON_TYPE, json.dumps({'endpoints': ENDPOINTS}).encode())
+
+            fmt = _one(params, 'format') or ('arrow' if ARROW_TYPE in self.headers.get('Accept', '') else 'json')
+            try:
+                if fmt not in ('json', 'arrow'):
+                    raise QueryError(400, 'format must be json or arrow')
+                tag, content_type, body = service.respond(path, params, fmt)
+            except QueryError as e:
+                return self._send(e.status, JSON_TYPE, json.dumps({'error': str(e)}).encode())
+            except Exception as e:
+                return self._send(500, JSON_TYPE, json.dumps({'error': f'{type(e).__name__}: {e}'}).encode())
+
+            if self.headers.get('If-None-Match') == tag:
+                return self._send(304, content_type, b'', tag)
+            self._send(200, content_type, body, tag)
+
+        def _send(self, status, content_type, body, tag=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if tag is not None:
+                self.send_header('ETag', tag)
+                self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, service=None):
+    """
+    Serve queries on host:port, one thread per connection, until interrupted.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(service or QueryService()))
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def fetch(endpoint, base_url=f'http://{DEFAULT_HOST}:{DEFAULT_PORT}', **params):
+    """
+    Client side: a DataFrame answering `endpoint` (e.g. '/naics'), read as Arrow.
+
+    Parameters:
+    - endpoint: Endpoint path.
+    - base_url: Address of a running service.
+    - params: Query parameters; lists are sent comma-separated.
+    """
+    params = {k: ','.join(map(str, v)) if isinstance(v, (list, tuple)) else v for k, v in params.items()}
+    query = urlencode({**params, 'format': 'arrow'})
+    with urlopen(Request(f'{base_url}{endpoint}?{query}')) as response:
+        return pa.ipc.open_stream(response.read()).read_pandas()
@@ -0,0 +1,291 @@
+"""Year-partitioned Parquet store for the cleaned ITA summary data."""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Root of the partitioned dataset (one directory per year)
+PARQUET_ROOT = 'data/injury data/parquet'
+
+# Cleaned CSVs written alongside the store
+CLEANED_CSV_PATH = 'data/injury data/ITA Data CY {year}_cleaned.csv'
+
+# Repeated strings stored as categoricals
+CATEGORICAL_COLUMNS = ['state', 'naics_code', 'size']
+
+# Injury/illness counts, downcast to float32 (keeps NaN for coerced values)
+COUNT_COLUMNS = [
+    'annual_average_employees', 'total_deaths', 'total_dafw_cases',
+    'total_djtr_cases', 'total_other_cases', 'total_dafw_days', 'total_djtr_days',
+    'total_injuries', 'total_skin_disorders', 'total_respiratory_conditions',
+    'total_poisonings', 'total_hearing_loss', 'total_other_illnesses'
+]
+
+
+# Numeric identifiers (read as text by the chunked cleaner)
+ID_COLUMNS = ['id', 'establishment_id']
+
+# Repeated strings the dashboard loader also holds as categoricals
+LOADED_CATEGORICAL_COLUMNS = CATEGORICAL_COLUMNS + ['city', 'industry_description']
+
+# Smallest integer types tried for whole-number counts, in order
+COUNT_INTEGER_TYPES = ['int16', 'int32']
+
+# Parquet type of every column to_typed converts; any other column is stored as text
+STORE_TYPES = {
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+    **{col: pa.float32() for col in COUNT_COLUMNS},
+    'total_hours_worked': pa.float64(),
+    **{col: pa.int64() for col in ID_COLUMNS},
+    'year_filing_for': pa.int16(),
+    'injury_rate': pa.float32(),
+}
+
+
+def year_path(year, root=PARQUET_ROOT):
+    """
+    Path of the Parquet file holding one year of cleaned data.
+    """
+    return os.path.join(root, f'year={year}', 'part-0.parquet')
+
+
+def to_typed(df):
+    """
+    Convert a cleaned ITA DataFrame to the store's explicit dtypes.
+
+    Parameters:
+    - df: Cleaned DataFrame as produced by clean_osha_data.
+
+    Returns:
+    - A new DataFrame with categorical, downcast numeric and injury_rate columns.
+    """
+    df = df.copy()
+
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+
+    # Hours can exceed float32's exact integer range
+    df['total_hours_worked'] = pd.to_numeric(df['total_hours_worked'], errors='coerce').astype('float64')
+
+    # Codes lose their leading zeros when a cleaned CSV is re-read
+    if 'naics_code' in df.columns:
+        df['naics_code'] = df['naics_code'].astype(str).str.zfill(6)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype('category')
+
+    for col in ID_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    if 'year_filing_for' in df.columns:
+        df['year_filing_for'] = pd.to_numeric(df['year_filing_for'], errors='coerce', downcast='integer')
+
+    # Precompute the injury rate per employee
+    df['injury_rate'] = (df['total_injuries'] / df['annual_average_employees']).astype('float32')
+
+    return df
+
+
+def write_year(df, year, root=PARQUET_ROOT):
+    """
+    Write one year of cleaned data to the partitioned store.
+
+    Parameters:
+    - df: Cleaned DataFrame for the year.
+    - year: Calendar year the data covers.
+    - root: Root directory of the dataset.
+
+    Returns:
+    - Path of the written Parquet file.
+    """
+    path = year_path(year, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    to_typed(df).to_parquet(path, index=False)
+    return path
+
+
+class YearWriter:
+    """
+    Write one year to the store chunk by chunk.
+
+    The Parquet schema is declared from `types` (column -> Arrow type, text
+    for columns not listed) rather than inferred from a chunk, so a later
+    chunk whose ids or counts have missing values, or whose text column is
+    empty in the first chunk, still casts to it. Chunks are passed through
+    `convert` first (to_typed by default; None writes them as given).
+    """
+
+    def __init__(self, year, root=PARQUET_ROOT, convert=to_typed, types=STORE_TYPES):
+        self.path = year_path(year, root)
+        self.convert = convert
+        self.types = types
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        if df.empty:
+            return
+        if self.convert is not None:
+            df = self.convert(df)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            # Columns are those of the file's header, in order
+            self._schema = pa.schema([(name, self.types.get(name, pa.string())) for name in table.column_names])
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(table.select(self._schema.names).cast(self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def reset(self):
+        """
+        Discard every chunk written so far.
+        """
+        self.close()
+        self._writer = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_year(year, columns=None, root=PARQUET_ROOT):
+    """
+    Read one year from the store, optionally projecting to a subset of columns.
+
+    Parameters:
+    - year: Calendar year to read.
+    - columns: Iterable of column names to load (None loads every column).
+    - root: Root directory of the dataset.
+
+    Returns:
+    - DataFrame with the store's dtypes.
+    """
+    if columns is not None:
+        columns = list(columns)
+    return pd.read_parquet(year_path(year, root), columns=columns)
+
+
+def has_year(year, root=PARQUET_ROOT):
+    return os.path.exists(year_path(year, root))
+
+
+def load_cleaned_year(year, columns=None, root=PARQUET_ROOT):
+    """
+    Load one year of cleaned data with the store's dtypes.
+
+    Reads the Parquet store when it has the year and otherwise falls back to
+    the cleaned CSV.
+
+    Parameters:
+    - year: Calendar year to read.
+    - columns: Iterable of column names to load (None loads every column).
+    - root: Root directory of the dataset.
+
+    Returns:
+    - Typed DataFrame, or None if neither source exists.
+    """
+    if has_year(year, root):
+        return read_year(year, columns, root)
+
+    csv_path = CLEANED_CSV_PATH.format(year=year)
+    if not os.path.exists(csv_path):
+        return None
+    df = to_typed(pd.read_csv(csv_path))
+    return df if columns is None else df[list(columns)]
+
+
+def compact_dtypes(df):
+    """
+    Shrink a loaded frame for holding in memory.
+
+    Repeated strings become categoricals, and counts and identifiers holding
+    only whole numbers become the smallest signed integer type that fits them
+    (16 bits at least, so log1p and friends still return float32). Columns
+    with missing or fractional values are left as they are.
+
+    Parameters:
+    - df: Frame from read_year or a cleaned CSV (any subset of columns).
+
+    Returns:
+    - A new DataFrame with compact dtypes.
+    """
+    df = df.copy()
+    for col in LOADED_CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    for col in COUNT_COLUMNS + ['total_hours_worked'] + ID_COLUMNS:
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]) or df[col].empty:
+            continue
+        values = df[col].to_numpy(dtype='float64')
+        if not (np.isfinite(values).all() and (values == np.floor(values)).all()):
+            continue
+        for dtype in COUNT_INTEGER_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= values.min() and values.max() <= info.max:
+                df[col] = values.astype(dtype)
+                break
+    return df
+
+
+class _ReadOnlyIndexer:
+    # loc/iloc/at/iat of a ReadOnlyFrame: lookups pass through, assignments raise
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __call__(self, *args, **kwargs):
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs))
+
+    def __setitem__(self, key, value):
+        ReadOnlyFrame._read_only()
+
+
+class ReadOnlyFrame(pd.DataFrame):
+    """
+    DataFrame shared between sessions, which cannot be modified in place.
+
+    Adding, replacing or deleting columns and assigning through
+    loc/iloc/at/iat raise TypeError. Anything derived from it (filters,
+    .assign(), .copy(), ...) is an ordinary DataFrame.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    @staticmethod
+    def _read_only(*args, **kwargs):
+        raise TypeError('this frame is shared and read-only; use .assign() or .copy() to change a copy')
+
+    __setitem__ = __delitem__ = insert = pop = _read_only
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat)
@@ -0,0 +1,131 @@
+"""Chunked CSV filtering and merging for files too large to load whole."""
+import glob
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+from osha.cleaning import RowHashSet, detect_encoding
+
+DEFAULT_CHUNK_SIZE = 500_000
+
+
+def read_chunks(input_path, chunk_size=DEFAULT_CHUNK_SIZE, **read_kwargs):
+    """
+    DataFrame chunks of a CSV file, or of every Parquet file under a directory
+    (a partitioned store, read file by file in path order).
+    """
+    if not os.path.isdir(input_path):
+        yield from pd.read_csv(input_path, chunksize=chunk_size, **read_kwargs)
+        return
+    for path in sorted(glob.glob(os.path.join(input_path, '**', '*.parquet'), recursive=True)):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def stream_filter(input_path, output_path, filter_chunk, chunk_size=DEFAULT_CHUNK_SIZE, desc=None, **read_kwargs):
+    """
+    Filter a CSV (or Parquet store) chunk by chunk, appending the kept rows to the output as it goes.
+
+    Parameters:
+    - input_path: CSV file or Parquet store directory to read.
+    - output_path: CSV file to write (overwritten).
+    - filter_chunk: Function taking a DataFrame chunk and returning the rows to keep.
+    - chunk_size: Number of rows read per chunk.
+    - desc: Label for the progress bar.
+    - read_kwargs: Extra keyword arguments passed to pd.read_csv (CSV input only).
+
+    Returns:
+    - Dict with rows_read, rows_written, seconds and rows_per_second.
+    """
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+    rows_read = 0
+    rows_written = 0
+    start = time.perf_counter()
+
+    with tqdm(desc=desc or os.path.basename(input_path), unit='rows', unit_scale=True) as progress:
+        for chunk in read_chunks(input_path, chunk_size, **read_kwargs):
+            kept = filter_chunk(chunk)
+            # The first chunk writes the header, even when none of its rows are kept
+            kept.to_csv(output_path, mode='a', header=rows_read == 0, index=False)
+            rows_read += len(chunk)
+            rows_written += len(kept)
+            progress.update(len(chunk))
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows_read': rows_read,
+        'rows_written': rows_written,
+        'seconds': seconds,
+        'rows_per_second': rows_read / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def stream_merge(sources, output_path, chunk_size=DEFAULT_CHUNK_SIZE, tag_column='source_file'):
+    """
+    Merge CSVs into one de-duplicated file in a single streaming pass.
+
+    Sources are read in priority order (most recent year first), so the first
+    time a row is seen is the copy to keep and no sort is needed. Rows are read
+    as text and compared by a 64-bit hash over every column except tag_column;
+    only the hash set (8 bytes per distinct row) outlives a chunk.
+
+    Parameters:
+    - sources: (path, tag) pairs in priority order; tag is written to tag_column.
+    - output_path: .csv or .parquet file to write (overwritten).
+    - chunk_size: Number of rows read per chunk.
+    - tag_column: Column holding each row's tag, left out of the row hash.
+
+    Returns:
+    - Dict with rows_read, rows_written, seconds and rows_per_second.
+    """
+    # One header for every source: the union of their columns, in order of appearance
+    encodings = {path: detect_encoding(path) for path, _ in sources}
+    columns = []
+    for path, _ in sources:
+        for col in pd.read_csv(path, encoding=encodings[path], nrows=0).columns:
+            if col not in columns and col != tag_column:
+                columns.append(col)
+    columns.append(tag_column)
+
+    # Every column is written as text, as read
+    schema = pa.schema([(col, pa.string()) for col in columns])
+    seen = RowHashSet()
+    rows_read = 0
+    rows_written = 0
+    start = time.perf_counter()
+
+    if output_path.endswith('.parquet'):
+        writer = pq.ParquetWriter(output_path, schema)
+    else:
+        # Arrow's writer quotes every text value; pandas reads the file back the same
+        writer = pa_csv.CSVWriter(output_path, schema)
+
+    with writer, tqdm(desc=os.path.basename(output_path), unit='rows', unit_scale=True) as progress:
+        for path, tag in sources:
+            for chunk in pd.read_csv(path, encoding=encodings[path], dtype=str, chunksize=chunk_size):
+                chunk = chunk.reindex(columns=columns[:-1])
+                kept = chunk[seen.first_occurrences(chunk)].assign(**{tag_column: tag})
+                writer.write_table(pa.Table.from_pandas(kept, schema=schema, preserve_index=False))
+                rows_read += len(chunk)
+                rows_written += len(kept)
+                progress.update(len(chunk))
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows_read': rows_read,
+        'rows_written': rows_written,
+        'seconds': seconds,
+        'rows_per_second': rows_read / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def report(name, stats):
+    print(f"{name}: kept {stats['rows_written']:,} of {stats['rows_read']:,} rows "
+          f"in {stats['seconds']:.1f}s ({stats['rows_per_second']:,.0f} rows/s)")
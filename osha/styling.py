@@ -0,0 +1,111 @@
+"""Vectorized heat-map cell styles for pandas Stylers."""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Cell style of each red level of the black-to-red row scale (white text for readability)
+RED_STYLES = np.array([f'background-color: rgb({red}, 0, 0); color: white' for red in range(256)], dtype=object)
+
+# Relative luminance above which text is drawn dark, as in Styler.background_gradient
+TEXT_COLOR_THRESHOLD = 0.408
+
+
+def numeric_cells(frame):
+    """
+    Values of a (possibly mixed-type) frame as a float array, with a mask of
+    the cells holding a number; text and missing values are never numbers.
+    """
+    flat = pd.Series(frame.to_numpy(dtype=object).ravel())
+    values = pd.to_numeric(flat, errors='coerce').to_numpy(dtype='float64')
+    # .str.len() is only defined for text values
+    is_text = flat.str.len().notna().to_numpy() if flat.dtype == object else np.zeros(len(flat), dtype=bool)
+    mask = ~np.isnan(values) & ~is_text
+    return values.reshape(frame.shape), mask.reshape(frame.shape)
+
+
+def scale_rows(values, mask):
+    """
+    Min/max-normalize each row over its masked cells.
+
+    Returns:
+    - (intensity, styled): intensities in [0, 1] and the cells to style, which
+      excludes rows with no numbers or a single distinct value.
+    """
+    masked = np.where(mask, values, np.nan)
+    has_values = mask.any(axis=1)
+    low = np.full(len(values), np.nan)
+    high = np.full(len(values), np.nan)
+    low[has_values] = np.nanmin(masked[has_values], axis=1)
+    high[has_values] = np.nanmax(masked[has_values], axis=1)
+
+    spread = (high - low)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        intensity = (masked - low[:, None]) / np.where(spread > 0, spread, 1)
+    styled = mask & (spread > 0)
+    return np.nan_to_num(intensity), styled
+
+
+def row_heat_styles(frame, skip_rows=()):
+    """
+    Black-to-red background of every numeric cell, scaled between its row's
+    minimum and maximum.
+
+    Parameters:
+    - frame: Table to style (rows are measures, columns are years or establishments).
+    - skip_rows: Index labels of rows left unstyled (identifiers and codes).
+
+    Returns:
+    - DataFrame of CSS strings shaped like frame, for Styler.apply(axis=None).
+    """
+    values, mask = numeric_cells(frame)
+    mask &= ~frame.index.isin(list(skip_rows))[:, None]
+    intensity, styled = scale_rows(values, mask)
+
+    styles = np.where(styled, RED_STYLES[(255 * intensity).astype(int)], '')
+    return pd.DataFrame(styles, index=frame.index, columns=frame.columns)
+
+
+@lru_cache(maxsize=None)
+def palette_styles(colorscale, steps=256):
+    """
+    Cell style of each step of a Plotly color scale, with dark or light text
+    chosen by the background's luminance.
+    """
+    from plotly.colors import sample_colorscale, unlabel_rgb
+
+    colors = sample_colorscale(colorscale, np.linspace(0, 1, steps))
+    rgb = np.array([unlabel_rgb(color) for color in colors]) / 255
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    luminance = linear @ np.array([0.2126, 0.7152, 0.0722])
+    text = np.where(luminance < TEXT_COLOR_THRESHOLD, '#f1f1f1', '#000000')
+    return np.array([f'background-color: {color}; color: {t}' for color, t in zip(colors, text)], dtype=object)
+
+
+def gradient_styles(frame, colorscale='Viridis', axis=0):
+    """
+    Background gradient of a numeric table, like Styler.background_gradient
+    without the matplotlib colormap.
+
+    Parameters:
+    - frame: Numeric table to style.
+    - colorscale: Name of a Plotly color scale.
+    - axis: 0 scales each column, 1 each row, None the whole table.
+
+    Returns:
+    - DataFrame of CSS strings shaped like frame, for Styler.apply(axis=None).
+    """
+    values = frame.to_numpy(dtype='float64')
+    mask = ~np.isnan(values)
+    if axis == 0:
+        intensity = scale_rows(values.T, mask.T)[0].T
+    elif axis == 1:
+        intensity = scale_rows(values, mask)[0]
+    else:
+        intensity = scale_rows(values.reshape(1, -1), mask.reshape(1, -1))[0].reshape(values.shape)
+
+    # Constant columns take the low end of the scale, as with matplotlib
+    palette = palette_styles(colorscale)
+    steps = (intensity * (len(palette) - 1)).round().astype(int)
+    styles = np.where(mask, palette[steps], '')
+    return pd.DataFrame(styles, index=frame.index, columns=frame.columns)
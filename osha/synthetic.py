@@ -0,0 +1,304 @@
+"""Deterministic synthetic ITA data (300A summaries and case detail) for benchmarks."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from osha.cases import CASE_DETAIL_DTYPES
+from osha.cube import US_STATES
+
+# Rough size of one real calendar year of data
+REAL_YEAR_ROWS = 370_000
+REAL_YEAR_CASES = 800_000
+
+# Share of the establishment universe filing in any one year
+FILING_RATE = 0.8
+
+# Establishments generated per block; every block has its own seeded generators,
+# so files of any size are written in bounded memory and independent of chunking
+BLOCK_ROWS = 100_000
+
+SUMMARY_COLUMNS = [
+    'id', 'establishment_name', 'establishment_id', 'street_address', 'company_name', 'city', 'state',
+    'zip_code', 'naics_code', 'industry_description', 'size', 'annual_average_employees',
+    'total_hours_worked', 'total_deaths', 'total_dafw_cases', 'total_djtr_cases', 'total_other_cases',
+    'total_dafw_days', 'total_djtr_days', 'total_injuries', 'total_skin_disorders',
+    'total_respiratory_conditions', 'total_poisonings', 'total_hearing_loss', 'total_other_illnesses',
+    'created_timestamp', 'change_reason', 'year_filing_for'
+]
+
+# Formats of the real case-detail files
+CASE_DATE_FORMAT = '%m/%d/%Y'
+CASE_TIMESTAMP_FORMAT = '%d%b%y:%H:%M:%S'
+
+# (code, description, weight) of the industries drawn from
+INDUSTRIES = [
+    ('111998', 'All Other Miscellaneous Crop Farming', 1),
+    ('212312', 'Crushed and Broken Limestone Mining and Quarrying', 1),
+    ('221122', 'Electric Power Distribution', 1),
+    ('236220', 'Commercial and Institutional Building Construction', 3),
+    ('238220', 'Plumbing, Heating, and Air-Conditioning Contractors', 3),
+    ('311612', 'Meat Processed from Carcasses', 2),
+    ('326199', 'All Other Plastics Product Manufacturing', 2),
+    ('332710', 'Machine Shops', 2),
+    ('336111', 'Automobile Manufacturing', 1),
+    ('336390', 'Other Motor Vehicle Parts Manufacturing', 2),
+    ('423830', 'Industrial Machinery and Equipment Merchant Wholesalers', 2),
+    ('445110', 'Supermarkets and Other Grocery Retailers (except Convenience Retailers)', 6),
+    ('452311', 'Warehouse Clubs and Supercenters', 4),
+    ('484121', 'General Freight Trucking, Long-Distance, Truckload', 2),
+    ('493110', 'General Warehousing and Storage', 4),
+    ('517311', 'Wired Telecommunications Carriers', 1),
+    ('561320', 'Temporary Help Services', 3),
+    ('611110', 'Elementary and Secondary Schools', 2),
+    ('622110', 'General Medical and Surgical Hospitals', 5),
+    ('623110', 'Nursing Care Facilities (Skilled Nursing Facilities)', 5),
+    ('713940', 'Fitness and Recreational Sports Centers', 1),
+    ('721110', 'Hotels (except Casino Hotels) and Motels', 2),
+    ('722511', 'Full-Service Restaurants', 4),
+    ('811111', 'General Automotive Repair', 1),
+    ('921190', 'Other General Government Support', 1),
+]
+
+# ITA size codes and the employee range of each
+SIZES = {'1': (1, 19), '21': (20, 99), '22': (100, 249), '3': (250, 5000)}
+SIZE_WEIGHTS = [0.15, 0.45, 0.25, 0.15]
+
+NAME_WORDS = ['Acme', 'Summit', 'Pioneer', 'Liberty', 'Cedar', 'Harbor', 'Keystone', 'Granite',
+              'Blue Ridge', 'Prairie', 'Atlas', 'Riverside', 'Beacon', 'Café', 'Northwind', 'Union']
+NAME_KINDS = ['Foods', 'Logistics', 'Manufacturing', 'Health', 'Services', 'Supply', 'Hospital',
+              'Distribution', 'Construction', 'Market', 'Plant', 'Center']
+CITIES = ['Springfield', 'Riverside', 'Franklin', 'Greenville', 'Bristol', 'Clinton', 'Fairview',
+          'Salem', 'Madison', 'Georgetown', 'Arlington', 'Ashland', 'Dover', 'Oxford', 'Jackson']
+STREETS = ['Main St', 'Oak Ave', 'Industrial Pkwy', 'Commerce Dr', 'Park Rd', 'Route 9', 'Elm St']
+
+# Share of raw summary rows that break a cleaning rule or repeat an earlier row
+DIRTY_RATE = 0.02
+DUPLICATE_RATE = 0.01
+
+INCIDENT_OUTCOMES = ['1', '2', '3', '4']      # death, days away, job transfer/restriction, other
+INCIDENT_OUTCOME_WEIGHTS = [0.002, 0.398, 0.25, 0.35]
+INCIDENT_TYPES = ['1', '2', '3', '4', '5', '6']   # injury, skin, respiratory, poisoning, hearing loss, other illness
+INCIDENT_TYPE_WEIGHTS = [0.9, 0.02, 0.04, 0.005, 0.015, 0.02]
+JOBS = [('Laborer', '53-7062', 'Laborers and Freight, Stock, and Material Movers, Hand'),
+        ('Registered Nurse', '29-1141', 'Registered Nurses'),
+        ('Driver', '53-3032', 'Heavy and Tractor-Trailer Truck Drivers'),
+        ('Assembler', '51-2090', 'Miscellaneous Assemblers and Fabricators'),
+        ('Cook', '35-2014', 'Cooks, Restaurant'),
+        ('Stocker', '53-7065', 'Stockers and Order Fillers')]
+NARRATIVES = ['lifting boxes from a pallet', 'walking across the loading dock', 'transferring a patient',
+              'operating a forklift', 'cutting product on the line', 'climbing a ladder']
+
+
+def universe_size(rows_per_year):
+    """
+    Number of establishments needed for rows_per_year filings per year.
+    """
+    return max(int(np.ceil(rows_per_year / FILING_RATE)), 1)
+
+
+def _pick(rng, values, n, weights=None):
+    values = np.asarray(values, dtype=object)
+    if weights is None:
+        return values[rng.integers(0, len(values), n)]
+    weights = np.asarray(weights, dtype=float)
+    return values[rng.choice(len(values), n, p=weights / weights.sum())]
+
+
+def establishments(start, stop, seed=0):
+    """
+    Fixed attributes of establishments start..stop-1 (the same in every year).
+
+    Returns:
+    - DataFrame indexed by position with establishment_id, names, address,
+      NAICS code and description, size and the base employee count.
+    """
+    rng = np.random.default_rng([seed, start])
+    n = stop - start
+    ids = np.arange(start, stop)
+
+    industry = rng.choice(len(INDUSTRIES), n, p=np.array([w for _, _, w in INDUSTRIES]) / sum(w for _, _, w in INDUSTRIES))
+    size = _pick(rng, list(SIZES), n, SIZE_WEIGHTS)
+    low = np.array([SIZES[s][0] for s in size])
+    high = np.array([SIZES[s][1] for s in size])
+    employees = np.exp(rng.uniform(np.log(low), np.log(high + 1))).astype(int).clip(low, high)
+
+    company = _pick(rng, NAME_WORDS, n) + ' ' + _pick(rng, NAME_KINDS, n)
+    # A third of the establishments have no company name
+    company[rng.random(n) < 0.33] = ''
+    name = np.where(company != '', company, _pick(rng, NAME_WORDS, n) + ' ' + _pick(rng, NAME_KINDS, n))
+    name = name + ' #' + (ids % 997).astype(str)
+
+    return pd.DataFrame({
+        'establishment_id': ids + 1,
+        'establishment_name': name,
+        'company_name': company,
+        'street_address': rng.integers(1, 9999, n).astype(str) + ' ' + _pick(rng, STREETS, n),
+        'city': _pick(rng, CITIES, n),
+        'state': _pick(rng, US_STATES, n),
+        'zip_code': rng.integers(501, 99951, n),
+        'naics_code': np.array([INDUSTRIES[i][0] for i in industry]),
+        'industry_description': np.array([INDUSTRIES[i][1] for i in industry]),
+        'size': size,
+        'base_employees': employees,
+    })
+
+
+def summary_block(year, start, stop, seed=0):
+    """
+    Raw 300A rows of one year for establishments start..stop-1 (those filing that year).
+    """
+    estab = establishments(start, stop, seed)
+    rng = np.random.default_rng([seed, year, start])
+    n = len(estab)
+    estab = estab[rng.random(n) < FILING_RATE].reset_index(drop=True)
+    n = len(estab)
+
+    employees = (estab['base_employees'].to_numpy() * rng.uniform(0.85, 1.15, n)).round().clip(1)
+    hours = (employees * 2080 * rng.uniform(0.7, 1.2, n)).round()
+    injuries = rng.poisson(employees * rng.gamma(2.0, 0.02, n))
+    dafw = rng.binomial(injuries, 0.35)
+    djtr = rng.binomial(injuries - dafw, 0.4)
+    other = injuries - dafw - djtr
+    illnesses = {
+        col: rng.binomial(injuries, p)
+        for col, p in [('total_skin_disorders', 0.02), ('total_respiratory_conditions', 0.04),
+                       ('total_poisonings', 0.005), ('total_hearing_loss', 0.01), ('total_other_illnesses', 0.03)]
+    }
+
+    df = pd.DataFrame({
+        'id': year * 10_000_000 + estab['establishment_id'],
+        'establishment_name': estab['establishment_name'],
+        'establishment_id': estab['establishment_id'],
+        'street_address': estab['street_address'],
+        'company_name': estab['company_name'],
+        'city': estab['city'],
+        'state': estab['state'],
+        'zip_code': estab['zip_code'],
+        'naics_code': estab['naics_code'],
+        'industry_description': estab['industry_description'],
+        'size': estab['size'],
+        'annual_average_employees': employees.astype(int),
+        'total_hours_worked': hours.astype(np.int64),
+        'total_deaths': rng.binomial(dafw, 0.002),
+        'total_dafw_cases': dafw,
+        'total_djtr_cases': djtr,
+        'total_other_cases': other,
+        'total_dafw_days': dafw * rng.integers(1, 40, n),
+        'total_djtr_days': djtr * rng.integers(1, 30, n),
+        'total_injuries': injuries,
+        **illnesses,
+        'created_timestamp': pd.Timestamp(f'{year + 1}-01-02') + pd.to_timedelta(rng.integers(0, 90 * 86400, n), unit='s'),
+        'change_reason': '',
+        'year_filing_for': year,
+    })
+    df['created_timestamp'] = df['created_timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Rows the cleaning rules drop: missing values, implausible hours, injuries above headcount
+    dirty = np.flatnonzero(rng.random(n) < DIRTY_RATE)
+    kind = rng.integers(0, 3, len(dirty))
+    df.loc[dirty[kind == 0], 'total_hours_worked'] = None
+    df.loc[dirty[kind == 1], 'total_hours_worked'] = df.loc[dirty[kind == 1], 'annual_average_employees'] * 10
+    df.loc[dirty[kind == 2], 'total_injuries'] = df.loc[dirty[kind == 2], 'annual_average_employees'] + 1
+
+    # Exact repeats, as left by resubmissions
+    repeats = df.iloc[np.flatnonzero(rng.random(n) < DUPLICATE_RATE)]
+    return pd.concat([df, repeats], ignore_index=True)[SUMMARY_COLUMNS]
+
+
+def case_block(year, start, stop, cases_per_establishment, seed=0):
+    """
+    Case-detail rows of one year for establishments start..stop-1.
+    """
+    estab = establishments(start, stop, seed)
+    rng = np.random.default_rng([seed, year, start, 1])
+    counts = rng.poisson(cases_per_establishment, len(estab))
+    estab = estab.loc[estab.index.repeat(counts)].reset_index(drop=True)
+    n = len(estab)
+
+    outcome = _pick(rng, INCIDENT_OUTCOMES, n, INCIDENT_OUTCOME_WEIGHTS)
+    incident_date = pd.Timestamp(f'{year}-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D')
+    job = rng.integers(0, len(JOBS), n)
+    started = rng.integers(5, 10, n)
+    incident_hour = started + rng.integers(0, 8, n)
+    employees = estab['base_employees'].to_numpy()
+    case_number = estab.groupby('establishment_id').cumcount().to_numpy() + 1
+
+    return pd.DataFrame({
+        'ID': (year * 10**13 + estab['establishment_id'].to_numpy() * 10**4 + case_number).astype(str),
+        'establishment_ID': estab['establishment_id'].astype(str),
+        'establishment_name': estab['establishment_name'],
+        'ein': '',
+        'company_name': estab['company_name'],
+        'street_address': estab['street_address'],
+        'city': estab['city'],
+        'state': estab['state'],
+        'zip_code': estab['zip_code'].astype(str).str.zfill(5),
+        'naics_code': estab['naics_code'],
+        'naics_year': '2022',
+        'industry_description': estab['industry_description'],
+        'establishment_type': '1',
+        'size': estab['size'],
+        'annual_average_employees': employees,
+        'total_hours_worked': employees * 2080.0,
+        'case_number': case_number.astype(str),
+        'date_of_incident': incident_date.strftime(CASE_DATE_FORMAT),
+        'incident_outcome': outcome,
+        'dafw_num_away': np.where(outcome == '2', rng.integers(1, 60, n), 0).astype(float),
+        'djtr_num_tr': np.where(outcome == '3', rng.integers(1, 45, n), 0).astype(float),
+        'type_of_incident': _pick(rng, INCIDENT_TYPES, n, INCIDENT_TYPE_WEIGHTS),
+        'time_started_work': pd.Series(started).map('{}:00:00.000'.format).to_numpy(),
+        'time_of_incident': pd.Series(incident_hour).map('{}:30:00.000'.format).to_numpy(),
+        'time_unknown': '0',
+        'date_of_death': np.where(outcome == '1', incident_date.strftime(CASE_DATE_FORMAT), ''),
+        'created_timestamp': (incident_date + pd.Timedelta(days=400)).strftime(CASE_TIMESTAMP_FORMAT).str.upper(),
+        'year_of_filing': str(year),
+        'job_title': np.array([JOBS[i][0] for i in job]),
+        'SOC_code': np.array([JOBS[i][1] for i in job]),
+        'SOC_description': np.array([JOBS[i][2] for i in job]),
+        'incident_location': 'On site',
+        'incident_description': _pick(rng, NARRATIVES, n),
+        'nar_before_incident': _pick(rng, NARRATIVES, n),
+        'nar_what_happened': 'Employee was injured while ' + _pick(rng, NARRATIVES, n),
+        'nar_injury_illness': _pick(rng, ['Strain', 'Laceration', 'Fracture', 'Contusion', 'Sprain'], n),
+        'nar_object_substance': _pick(rng, ['Box', 'Floor', 'Patient', 'Forklift', 'Knife', 'Ladder'], n),
+    })[list(CASE_DETAIL_DTYPES)]
+
+
+def _write_blocks(blocks, output_path):
+    rows = 0
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    for block in blocks:
+        block.to_csv(output_path, mode='a', header=rows == 0, index=False)
+        rows += len(block)
+    return rows
+
+
+def write_summary_year(output_path, year, rows_per_year=REAL_YEAR_ROWS, seed=0):
+    """
+    Write one raw ITA 300A year (about rows_per_year rows) to output_path.
+
+    Returns:
+    - Number of rows written.
+    """
+    total = universe_size(rows_per_year)
+    return _write_blocks(
+        (summary_block(year, start, min(start + BLOCK_ROWS, total), seed) for start in range(0, total, BLOCK_ROWS)),
+        output_path
+    )
+
+
+def write_case_detail(output_path, year, cases=REAL_YEAR_CASES, rows_per_year=REAL_YEAR_ROWS, seed=0):
+    """
+    Write one year of case detail (about `cases` rows) for the same establishments as the summaries.
+
+    Returns:
+    - Number of rows written.
+    """
+    total = universe_size(rows_per_year)
+    per_establishment = cases / total
+    return _write_blocks(
+        (case_block(year, start, min(start + BLOCK_ROWS, total), per_establishment, seed) for start in range(0, total, BLOCK_ROWS)),
+        output_path
+    )
@@ -1,37 +1,57 @@
+import os
+import sys
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.scatter import scatter_3d_figure
+from osha.store import CLEANED_CSV_PATH, load_cleaned_year
 
 st.set_page_config(layout='wide')
 
-# Title of the app
-st.title("3D Scatter Plot with Plotly and Streamlit")
+# Rows per page of the table preview
+preview_rows = 100
 
-# Predefined file path
-file_path = "data/injury data/ITA Data CY 2016_cleaned.csv"
+# Load one year of cleaned data (Parquet store when available), cached across reruns
+@st.cache_data
+def load_data(year):
+    return load_cleaned_year(year)
 
-# Load the CSV file into a DataFrame
-df = pd.read_csv(file_path)
+# Title of the app
+st.title("3D Scatter Plot with Plotly and Streamlit")
 
-df['injury_rate'] = df['total_injuries'] / df['annual_average_employees']
+year = st.selectbox("Select year for data", list(reversed(range(2016, 2024))))
+df = load_data(year)
+if df is None:
+    st.error(f"Failed to load data for year {year}: neither the Parquet store nor "
+             f"'{CLEANED_CSV_PATH.format(year=year)}' exists. Run scripts/clean_summary_data.py first.")
+    st.stop()
 
-# Display the DataFrame
+# Display a capped, paginated preview of the DataFrame
 st.write("DataFrame:")
-st.write(df)
+page_count = max((len(df) - 1) // preview_rows + 1, 1)
+page = st.number_input(f"Page (of {page_count:,})", min_value=1, max_value=page_count, value=1)
+st.dataframe(df.iloc[(page - 1) * preview_rows:page * preview_rows])
+
+# Axis choices limited to numeric columns
+numeric_fields = df.select_dtypes(include=['number']).columns.tolist()
 
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 # Placeholder for 3D scatter plot fields
 with col1:
-    x_field = st.selectbox("Select X-axis field", df.columns)
+    x_field = st.selectbox("Select X-axis field", numeric_fields)
 with col2:
-    y_field = st.selectbox("Select Y-axis field", df.columns)
+    y_field = st.selectbox("Select Y-axis field", numeric_fields)
 with col3:
-    z_field = st.selectbox("Select Z-axis field", df.columns)
+    z_field = st.selectbox("Select Z-axis field", numeric_fields)
 with col4:
-    color_field = st.selectbox("Select Color field", df.columns)
+    color_field = st.selectbox("Select Color field", numeric_fields)
+with col5:
+    reduce_mode = st.radio("Large data", ['Sampled', 'Voxel'])
 
-# Create 3D scatter plot
-fig = px.scatter_3d(df, x=x_field, y=y_field, z=z_field, color=color_field, height=800, log_x=True, log_y=True, log_z=True)
+# Create 3D scatter plot within the point budget
+fig, note = scatter_3d_figure(df, x_field, y_field, z_field, color_field, reduce_mode)
+st.caption(note)
 
 # Display the 3D scatter plot
 st.plotly_chart(fig,use_container_width=True)
@@ -1,39 +1,27 @@
 import os
-import pandas as pd
-import json
+import sys
 
-# Directory containing the CSV files
-directory_path = 'data/injury data/'
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.panel import YEARS, build_panel, write_panel
+from osha.store import load_cleaned_year
 
-# Initialize a dictionary to store the aggregated data
-aggregated_data = {}
+# Output of the panel stage (one row per establishment and year)
+output_file = 'data/estab_panel.parquet'
 
-# Define the range of years you are interested in
-years = range(2016, 2024)
+# Keep establishments that reported in at least this many years
+min_years = 6
 
-# Loop through each year in the specified range
-for year in years:
-    filename = f'ITA Data CY {year}_cleaned.csv'
-    file_path = os.path.join(directory_path, filename)
-    
-    if os.path.exists(file_path):
-        df = pd.read_csv(file_path)
-        
-        # Loop through each row in the dataframe
-        for _, row in df.iterrows():
-            establishment_id = row['establishment_id']
-            
-            if establishment_id not in aggregated_data:
-                aggregated_data[establishment_id] = {}
-            
-            # Add data for the year
-            aggregated_data[establishment_id][year] = row.to_dict()
+# Load every cleaned year (Parquet store when available, cleaned CSV otherwise)
+frames = {}
+for year in YEARS:
+    df = load_cleaned_year(year)
+    if df is not None:
+        frames[year] = df
     else:
         print(f"File for year {year} not found.")
 
-# Save the aggregated data to a JSON file
-output_file = 'aggregated_injury_data.json'
-with open(output_file, 'w') as json_file:
-    json.dump(aggregated_data, json_file, indent=4)
+# Concatenate the years, apply the min-years mask and pivot by establishment and year
+panel = build_panel(frames, YEARS, min_years)
+write_panel(panel, output_file)
 
-print(f'Data successfully aggregated and saved to {output_file}')
+print(f'{len(panel) // len(YEARS)} establishments aggregated and saved to {output_file}')
@@ -0,0 +1,26 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.correlation import (CORRELATION_MEASURES, CORRELATION_PATH, finalize_correlations, injured_rows,
+                              year_correlations)
+from osha.panel import YEARS
+from osha.parallel import map_years
+from osha.store import load_cleaned_year
+
+# Load one cleaned year and correlate every pair of measures
+def year_table(year):
+    df = load_cleaned_year(year, CORRELATION_MEASURES)
+    return None if df is None else year_correlations(injured_rows(df), year)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute the pairwise correlations of the measures for every year.')
+    parser.add_argument('--workers', type=int, default=1, help='years processed in parallel (0 = one per CPU)')
+    args = parser.parse_args()
+
+    year_tables = [table for table in map_years(year_table, YEARS, args.workers) if table is not None]
+    correlations = finalize_correlations(year_tables)
+    correlations.to_parquet(CORRELATION_PATH, index=False)
+
+    print(f'{len(correlations)} correlation rows for {len(year_tables)} years saved to {CORRELATION_PATH}')
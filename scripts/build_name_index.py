@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.name_index import SUMMARY_INDEX, YEAR_INDEX_COLUMNS, build_indexes, index_path
+from osha.panel import YEARS
+
+# One index per name column across every year (positions are rows of the yearly store),
+# and one over the establishment names of the Business Injury Rates listing
+indexes = build_indexes(YEAR_INDEX_COLUMNS + [SUMMARY_INDEX])
+
+for year in YEARS:
+    if YEAR_INDEX_COLUMNS[0] in indexes and year not in indexes[YEAR_INDEX_COLUMNS[0]].years:
+        print(f"File for year {year} not found.")
+
+for name, index in indexes.items():
+    path = index_path(name)
+    index.save(path)
+    label = 'Establishment summary' if name == SUMMARY_INDEX else name
+    print(f'{label} index saved to {path}')
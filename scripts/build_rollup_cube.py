@@ -0,0 +1,32 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.cube import CUBE_PATH, SOURCE_COLUMNS, build_year_cube, finalize_cube
+from osha.naics import HIERARCHY_PATH, build_hierarchy
+from osha.panel import YEARS
+from osha.parallel import map_years
+from osha.store import load_cleaned_year
+
+# Load one cleaned year and sum it over every NAICS level
+def year_cube(year):
+    df = load_cleaned_year(year, SOURCE_COLUMNS)
+    return None if df is None else build_year_cube(df, year)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the year x state x NAICS x size rollup cube.')
+    parser.add_argument('--workers', type=int, default=1, help='years processed in parallel (0 = one per CPU)')
+    args = parser.parse_args()
+
+    year_cubes = [cube for cube in map_years(year_cube, YEARS, args.workers) if cube is not None]
+    cube = finalize_cube(year_cubes)
+    cube.to_parquet(CUBE_PATH, index=False)
+
+    print(f'{len(cube)} cube rows saved to {CUBE_PATH}')
+
+    # Sector -> subsector -> industry group -> industry aggregates for the drill-down treemap
+    hierarchy = build_hierarchy(cube)
+    hierarchy.to_parquet(HIERARCHY_PATH, index=False)
+
+    print(f'{len(hierarchy)} NAICS hierarchy rows saved to {HIERARCHY_PATH}')
@@ -1,70 +1,88 @@
-import pandas as pd
+import argparse
+import functools
+import os
+import sys
 
-def clean_osha_data(file_path):
-    # Attempt to load the data with different encodings if utf-8 fails
-    encodings = ['utf-8', 'ISO-8859-1', 'cp1252']
-    for encoding in encodings:
-        try:
-            df = pd.read_csv(file_path, encoding=encoding)
-            break
-        except UnicodeDecodeError:
-            continue
-    else:
-        raise ValueError("Failed to read the file with available encodings")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.cleaning import clean_csv_chunked, clean_frame, read_csv_any_encoding
+from osha.parallel import map_years
+from osha.store import YearWriter, write_year
+
+def clean_osha_data(file_path, year=None, chunked=False, memory_budget_mb=512):
+    """
+    Clean one ITA CSV and write it next to the input as *_cleaned.csv.
+
+    Parameters:
+    - file_path: Raw ITA CSV file.
+    - year: Calendar year of the file; when given the year is also written to the Parquet store.
+    - chunked: Stream the file in chunks sized to memory_budget_mb instead of loading it whole.
+    - memory_budget_mb: Target peak memory for chunked mode.
+
+    Returns:
+    - Path of the cleaned CSV file.
+    """
+    cleaned_data_path = file_path.replace('.csv', '_cleaned.csv')
+
+    if chunked:
+        if year is None:
+            clean_csv_chunked(file_path, cleaned_data_path, memory_budget_mb)
+        else:
+            # Stream the cleaned rows into the Parquet store as well
+            with YearWriter(year) as writer:
+                clean_csv_chunked(file_path, cleaned_data_path, memory_budget_mb, on_chunk=writer.write,
+                                  on_restart=writer.reset)
+        return cleaned_data_path
+
+    # Start with the encoding guessed from byte samples, falling back to the next one
+    # if a byte outside the samples does not decode
+    df = read_csv_any_encoding(file_path)
 
     # Remove duplicate rows
     df = df.drop_duplicates()
-    
-    # Handle missing values (dropping rows with any missing values for simplicity)
-    df = df.dropna(subset=[
-        'establishment_name', 'street_address', 'city', 'state', 'zip_code', 'naics_code', 
-        'annual_average_employees', 'total_hours_worked', 'total_deaths', 'total_dafw_cases', 
-        'total_djtr_cases', 'total_other_cases', 'total_dafw_days', 'total_djtr_days', 'total_injuries', 
-        'total_skin_disorders', 'total_respiratory_conditions', 'total_poisonings', 'total_hearing_loss', 
-        'total_other_illnesses', 'establishment_id', 'size', 'year_filing_for', 'created_timestamp'
-    ])
-    
-    # Correct data formatting
-    df['zip_code'] = df['zip_code'].astype(str).str.zfill(5)
-    df['naics_code'] = df['naics_code'].astype(str).str.zfill(6)
-    
-    # Ensure numeric columns are of numeric type
-    numeric_columns = [
-        'annual_average_employees', 'total_hours_worked', 'total_deaths', 
-        'total_dafw_cases', 'total_djtr_cases', 'total_other_cases', 
-        'total_dafw_days', 'total_djtr_days', 'total_injuries', 
-        'total_skin_disorders', 'total_respiratory_conditions', 
-        'total_poisonings', 'total_hearing_loss', 'total_other_illnesses'
-    ]
-    
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    # Remove rows with more injuries than annual average employees
-    df = df[df['total_injuries'] <= df['annual_average_employees']]
-    
-    # Remove rows where total hours worked are less than a quarter of expected or more than double
-    expected_hours_worked = df['annual_average_employees'] * 40 * 52
-    df = df[(df['total_hours_worked'] >= 0.25 * expected_hours_worked) & (df['total_hours_worked'] <= 2 * expected_hours_worked)]
-    
-    # Ensure logical consistency in injury data
-    df = df[(df['total_injuries'] >= df['total_skin_disorders'] + df['total_respiratory_conditions'] + 
-             df['total_poisonings'] + df['total_hearing_loss'] + df['total_other_illnesses'])]
-    
-    # Remove rows with non-positive total hours worked
-    df = df[df['total_hours_worked'] > 0]
-    
+
+    # Apply every validity rule (missing values, injuries vs employees, hours band,
+    # illness-sum consistency, positive hours) as one combined mask
+    df = clean_frame(df)
+
     # Save the cleaned dataframe to a new CSV file
-    cleaned_data_path = file_path.replace('.csv', '_cleaned.csv')
     df.to_csv(cleaned_data_path, index=False)
+
+    # Also write the typed, year-partitioned Parquet store read by the dashboard
+    if year is not None:
+        write_year(df, year)
     return cleaned_data_path
 
-# Example usage for multiple years of data
-years = range(2016, 2024)
-for year in years:
+def clean_year(year, chunked=False, memory_budget_mb=512):
+    """
+    Clean one year of ITA data, returning (success, status message) instead of raising.
+    """
     file_path = f'data/injury data/ITA Data CY {year}.csv'
     try:
-        cleaned_file_path = clean_osha_data(file_path)
-        print(f'Cleaned data saved to: {cleaned_file_path}')
+        cleaned_file_path = clean_osha_data(file_path, year, chunked, memory_budget_mb)
+        return True, f'Cleaned data saved to: {cleaned_file_path}'
     except Exception as e:
-        print(f'Failed to clean data for year {year}: {e}')
+        return False, f'Failed to clean data for year {year}: {e}'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean the yearly ITA summary files.')
+    parser.add_argument('--chunked', action='store_true', help='stream files in bounded memory')
+    parser.add_argument('--memory-budget-mb', type=int, default=512, help='target peak memory in chunked mode')
+    parser.add_argument('--workers', type=int, default=1, help='years cleaned in parallel (0 = one per CPU)')
+    parser.add_argument('--years', type=int, nargs='+', default=list(range(2016, 2024)), help='years to clean')
+    parser.add_argument('--input', help='clean this one file (e.g. ita-data-all.csv) instead of the yearly files')
+    args = parser.parse_args()
+
+    if args.input:
+        cleaned_file_path = clean_osha_data(args.input, None, args.chunked, args.memory_budget_mb)
+        print(f'Cleaned data saved to: {cleaned_file_path}')
+    else:
+        # Clean every year of data, one process per year when --workers > 1
+        years = args.years
+        clean = functools.partial(clean_year, chunked=args.chunked, memory_budget_mb=args.memory_budget_mb)
+        results = map_years(clean, years, args.workers)
+        for _, message in results:
+            print(message)
+
+        # A non-zero exit keeps the pipeline from recording a failed year as done
+        if not all(ok for ok, _ in results):
+            sys.exit(1)
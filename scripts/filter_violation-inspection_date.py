@@ -1,57 +1,72 @@
+import argparse
+import os
+import sys
+
+import numpy as np
 import pandas as pd
-from tqdm import tqdm
 
-def filter_inspections(inspections_df):
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.enforcement import INSPECTION_ROOT, VIOLATION_ROOT
+from osha.streaming import DEFAULT_CHUNK_SIZE, report, stream_filter
+
+def filter_inspections(inspections_path, output_path, min_year=2020, chunk_size=DEFAULT_CHUNK_SIZE):
     """
-    Filter inspections to only include those with a close_case_date of 2020 or later.
+    Filter inspections to only include those with a close_conf_date of min_year or later.
     
     Parameters:
-    - inspections_df: DataFrame containing inspection data.
+    - inspections_path: CSV file or Parquet store containing inspection data.
+    - output_path: CSV file the filtered inspections are streamed to.
+    - min_year: Earliest close_conf_date year to keep.
+    - chunk_size: Number of rows read per chunk.
     
     Returns:
-    - Filtered DataFrame with inspections from 2020 or later.
+    - Array of the activity_nr values of the kept inspections.
     """
-    inspections_df['close_conf_date'] = pd.to_datetime(inspections_df['close_conf_date'], format='%Y-%m-%d', errors='coerce')
-    filtered_inspections = inspections_df[inspections_df['close_conf_date'].dt.year >= 2020]
-    return filtered_inspections
+    activity_nr_chunks = []
+
+    def filter_chunk(chunk):
+        chunk['close_conf_date'] = pd.to_datetime(chunk['close_conf_date'], format='%Y-%m-%d', errors='coerce')
+        kept = chunk[chunk['close_conf_date'].dt.year >= min_year]
+        activity_nr_chunks.append(kept['activity_nr'].to_numpy())
+        return kept
 
-def filter_violations(violations_df, filtered_inspections):
+    stats = stream_filter(inspections_path, output_path, filter_chunk, chunk_size, desc="Filtering Inspections")
+    report('Inspections', stats)
+    return np.unique(np.concatenate(activity_nr_chunks)) if activity_nr_chunks else np.array([])
+
+def filter_violations(violations_path, activity_nrs, output_path, chunk_size=DEFAULT_CHUNK_SIZE):
     """
     Filter violations to only include those with activity_nr present in the filtered inspections.
     
     Parameters:
-    - violations_df: DataFrame containing violation data.
-    - filtered_inspections: DataFrame containing filtered inspection data.
+    - violations_path: CSV file or Parquet store containing violation data.
+    - activity_nrs: activity_nr values of the filtered inspections.
+    - output_path: CSV file the filtered violations are streamed to.
+    - chunk_size: Number of rows read per chunk.
     
     Returns:
-    - Filtered DataFrame with violations associated with the filtered inspections.
+    - Dict of row counts and throughput for the pass.
     """
-    filtered_activity_nrs = set(filtered_inspections['activity_nr'])
-    
-    # Initialize an empty list to store filtered violations
-    filtered_violations_list = []
-    
-    # Use tqdm to add a progress bar
-    for index, row in tqdm(violations_df.iterrows(), total=violations_df.shape[0], desc="Filtering Violations"):
-        if row['activity_nr'] in filtered_activity_nrs:
-            filtered_violations_list.append(row)
-    
-    # Convert the list back to a DataFrame
-    filtered_violations = pd.DataFrame(filtered_violations_list)
-    
-    return filtered_violations
+    activity_nrs = pd.Index(activity_nrs)
+
+    # Semi-join: vectorized membership test of each chunk against the key set
+    def filter_chunk(chunk):
+        return chunk[chunk['activity_nr'].isin(activity_nrs)]
 
-# Read the merged cleaned data
-# osha_inspection_df = pd.read_csv('merged_cleaned_osha_inspection.csv')
-osha_violation_df = pd.read_csv('merged_cleaned_osha_violation.csv')
+    stats = stream_filter(violations_path, output_path, filter_chunk, chunk_size, desc="Filtering Violations")
+    report('Violations', stats)
+    return stats
 
-# Filter inspections and violations
-# filtered_inspections_df = filter_inspections(osha_inspection_df)
-filtered_inspections_df = pd.read_csv('filtered_osha_inspection.csv')
-filtered_violations_df = filter_violations(osha_violation_df, filtered_inspections_df)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Filter inspections by close date and violations to those inspections.')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows read per chunk')
+    parser.add_argument('--min-year', type=int, default=2020, help='earliest close_conf_date year to keep')
+    parser.add_argument('--inspections', default=INSPECTION_ROOT, help='inspection store (or merged CSV)')
+    parser.add_argument('--violations', default=VIOLATION_ROOT, help='violation store (or merged CSV)')
+    args = parser.parse_args()
 
-# Save the filtered data to new CSV files
-# filtered_inspections_df.to_csv('filtered_osha_inspection.csv', index=False)
-filtered_violations_df.to_csv('filtered_osha_violation.csv', index=False)
+    # Filter inspections and violations, one streaming pass over each file
+    activity_nrs = filter_inspections(args.inspections, 'filtered_osha_inspection.csv', args.min_year, args.chunk_size)
+    filter_violations(args.violations, activity_nrs, 'filtered_osha_violation.csv', args.chunk_size)
 
-print("Data filtering completed successfully.")
+    print("Data filtering completed successfully.")
@@ -0,0 +1,28 @@
+import argparse
+import glob
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.cases import CASE_GLOB, CASE_MONTHLY_PATH, CASE_ROOT, CASE_WEEKDAY_PATH, ingest_case_files
+from osha.streaming import DEFAULT_CHUNK_SIZE
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert the ITA case-detail files to a typed Parquet store '
+                                                 'and precompute their monthly and weekday counts.')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows read per chunk')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(CASE_GLOB))
+    if not paths:
+        sys.exit(f'No case-detail files match {CASE_GLOB}')
+
+    monthly, weekday, rows = ingest_case_files(paths, CASE_ROOT, args.chunk_size)
+    for year, count in sorted(rows.items()):
+        print(f'{year}: {count:,} cases saved to {CASE_ROOT}')
+
+    # Small additive tables: the dashboard never reads the cases themselves
+    monthly.to_parquet(CASE_MONTHLY_PATH, index=False)
+    weekday.to_parquet(CASE_WEEKDAY_PATH, index=False)
+    print(f'{len(monthly)} monthly and {len(weekday)} weekday count rows saved to '
+          f'{CASE_MONTHLY_PATH} and {CASE_WEEKDAY_PATH}')
@@ -0,0 +1,30 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.linkage import (CROSSWALK_PATH, DEFAULT_THRESHOLD, link_records, load_establishments, load_inspections,
+                          prepare_establishments, prepare_inspections)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Link OSHA inspections to ITA establishments by name and address.')
+    parser.add_argument('--inspections', default='filtered_osha_inspection.csv', help='inspection file (CSV, Parquet or store directory)')
+    parser.add_argument('--output', default=CROSSWALK_PATH, help='crosswalk Parquet file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='lowest match score kept')
+    parser.add_argument('--top', type=int, default=1, help='matches kept per inspection')
+    parser.add_argument('--workers', type=int, default=0, help='states linked in parallel (0 = one per CPU)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    inspections = prepare_inspections(load_inspections(args.inspections))
+    establishments = prepare_establishments(load_establishments())
+    print(f'{len(inspections):,} inspections and {len(establishments):,} establishment records prepared '
+          f'in {time.perf_counter() - start:.1f}s')
+
+    crosswalk = link_records(inspections, establishments, args.threshold, args.top, args.workers)
+    crosswalk.to_parquet(args.output, index=False)
+
+    linked = crosswalk['activity_nr'].nunique()
+    print(f'{linked:,} of {inspections["record_id"].nunique():,} inspections linked '
+          f'({len(crosswalk):,} crosswalk rows) in {time.perf_counter() - start:.1f}s; saved to {args.output}')
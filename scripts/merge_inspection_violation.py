@@ -1,66 +1,47 @@
-import pandas as pd
+import argparse
 import glob
 import os
+import sys
 
-def merge_csv_files(folder_path, file_pattern):
-    """
-    Merge multiple CSV files into a single DataFrame.
-    
-    Parameters:
-    - folder_path: The path to the folder containing the CSV files.
-    - file_pattern: The pattern to match the CSV files (e.g., "osha_violation*.csv").
-    
-    Returns:
-    - A merged DataFrame containing all the data from the matched CSV files.
-    """
-    all_files = glob.glob(os.path.join(folder_path, file_pattern))
-    df_list = []
-    
-    for file in all_files:
-        df = pd.read_csv(file)
-        df_list.append(df)
-    
-    merged_df = pd.concat(df_list, ignore_index=True)
-    return merged_df
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.enforcement import DATASETS, ingest_shards
+from osha.streaming import read_chunks, report
 
-def basic_data_cleaning(df):
+# Merged CSVs written with --csv (the store is the default output)
+CSV_OUTPUTS = {
+    'inspections': 'merged_cleaned_osha_inspection.csv',
+    'violations': 'merged_cleaned_osha_violation.csv',
+}
+
+def export_csv(root, output_path):
     """
-    Perform basic data cleaning on the DataFrame.
-    
-    Parameters:
-    - df: The DataFrame to clean.
-    
-    Returns:
-    - The cleaned DataFrame.
+    Write a partitioned store out as one CSV, partition by partition.
     """
-    # Drop duplicate rows
-    df = df.drop_duplicates()
-    
-    # Handle missing values
-    df = df.fillna(method='ffill').fillna(method='bfill')
-    
-    # Convert date columns to datetime
-    date_columns = ['open_date', 'close_case_date', 'issuance_date', 'abate_date', 'contest_date']
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], format='%Y%m%d', errors='coerce')
-    
-    return df
-
-# Paths to the folders containing the CSV files
-osha_violation_folder = 'data/violations'
-osha_inspection_folder = 'data/inspections'
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    for i, chunk in enumerate(read_chunks(root)):
+        chunk.to_csv(output_path, mode='a', header=i == 0, index=False)
 
-# Merge the CSV files
-osha_violation_df = merge_csv_files(osha_violation_folder, 'osha_violation*.csv')
-osha_inspection_df = merge_csv_files(osha_inspection_folder, 'osha_inspection*.csv')
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Merge the OSHA inspection and violation shards into '
+                                                 'year-partitioned Parquet stores.')
+    parser.add_argument('--workers', type=int, default=0, help='shards parsed at the same time (0 = one per CPU)')
+    parser.add_argument('--csv', action='store_true', help='also write the merged_cleaned_osha_*.csv files')
+    args = parser.parse_args()
 
-# Perform basic data cleaning
-osha_violation_df_clean = basic_data_cleaning(osha_violation_df)
-osha_inspection_df_clean = basic_data_cleaning(osha_inspection_df)
+    for name, (pattern, types, partition_column, root) in DATASETS.items():
+        # Shards are read with an explicit schema, dates parsed on the way in,
+        # and rows repeated across shards written once
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            sys.exit(f'No shards match {pattern}')
+        stats = ingest_shards(paths, types, partition_column, root, args.workers)
+        report(name, stats)
+        print(f"{name}: {stats['shards']} shards, {stats['bytes_read'] / 2**20:,.0f} MB "
+              f"at {stats['mb_per_second']:,.1f} MB/s, saved to {root}")
 
-# Save the cleaned data to new CSV files
-osha_violation_df_clean.to_csv('merged_cleaned_osha_violation.csv', index=False)
-osha_inspection_df_clean.to_csv('merged_cleaned_osha_inspection.csv', index=False)
+        if args.csv:
+            export_csv(root, CSV_OUTPUTS[name])
+            print(f"{name}: merged CSV saved to {CSV_OUTPUTS[name]}")
 
-print("Data merging and cleaning completed successfully.")
+    print("Data merging and cleaning completed successfully.")
@@ -1,47 +1,32 @@
-import pandas as pd
+import argparse
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.streaming import DEFAULT_CHUNK_SIZE, report, stream_merge
 
 # Directory where the CSV files are stored
 directory = 'data/'
 
-# Initialize an empty DataFrame to hold the combined data
-combined_df = pd.DataFrame()
-
-# List of years to process
-years = range(2016, 2024)
-
-for year in years:
-    file_name = f'ITA Data CY {year}.csv'
-    file_path = os.path.join(directory, file_name)
-    
-    if os.path.exists(file_path):
-        try:
-            # Try reading the CSV file with default 'utf-8' encoding
-            df = pd.read_csv(file_path)
-        except UnicodeDecodeError:
-            # If there's an encoding error, try reading with 'latin1' encoding
-            df = pd.read_csv(file_path, encoding='latin1')
-        
-        # Add a column to track the original file name
-        df['source_file'] = file_name
-        
-        # Drop duplicate rows within the file
-        df.drop_duplicates(inplace=True)
-        
-        # Append to the combined DataFrame
-        combined_df = pd.concat([combined_df, df], ignore_index=True)
-
-# Drop duplicates across the combined DataFrame
-combined_df.drop_duplicates(inplace=True)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Merge the yearly ITA files into ita-data-all.csv.')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows read per chunk')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help='output file format')
+    args = parser.parse_args()
 
-# Sort by year to keep the most recent entries in case of duplicates
-combined_df.sort_values(by='source_file', ascending=False, inplace=True)
+    # List of years to process
+    years = range(2016, 2024)
 
-# Drop duplicates again, keeping the first occurrence (most recent year due to sorting)
-combined_df.drop_duplicates(subset=combined_df.columns.difference(['source_file']), keep='first', inplace=True)
+    # Most recent year first: a row repeated in several years keeps its latest source_file
+    sources = [
+        (os.path.join(directory, f'ITA Data CY {year}.csv'), f'ITA Data CY {year}.csv')
+        for year in reversed(years)
+        if os.path.exists(os.path.join(directory, f'ITA Data CY {year}.csv'))
+    ]
 
-# Save the combined DataFrame to a new CSV file
-output_file = os.path.join(directory, 'ita-data-all.csv')
-combined_df.to_csv(output_file, index=False)
+    # Stream every year once, dropping rows already seen (all columns but source_file)
+    output_file = os.path.join(directory, f'ita-data-all.{args.format}')
+    stats = stream_merge(sources, output_file, args.chunk_size)
+    report('ita-data-all', stats)
 
-print(f"Combined data saved to {output_file}")
+    print(f"Combined data saved to {output_file}")
@@ -1,50 +1,53 @@
-import pandas as pd
+import argparse
 import glob
+import os
+import sys
 
-# Function to load the OSHA data for all years
-def load_all_data():
-    all_files = glob.glob('data/injury data/ITA Data CY *_cleaned.csv')
-    df_list = []
-    for file in all_files:
-        year = int(file.split('CY ')[1].split('_')[0])
-        df = pd.read_csv(file)
-        df['year'] = year
-        df_list.append(df)
-    return pd.concat(df_list, ignore_index=True)
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.cube import US_STATES as valid_states
+from osha.parallel import map_years
 
-# Load all data
-data = load_all_data()
+# Function to find the cleaned OSHA data for every year
+def find_years():
+    all_files = glob.glob('data/injury data/ITA Data CY *_cleaned.csv')
+    return sorted(int(os.path.basename(file).split('CY ')[1].split('_')[0]) for file in all_files)
 
 # Function to clean the data
 def clean_data(data):
     # Convert state abbreviations to uppercase
     data['state'] = data['state'].str.upper()
 
-    # List of valid US state abbreviations
-    valid_states = [
-        'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 
-        'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 
-        'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
-    ]
-
     # Filter out invalid state abbreviations
     data = data[data['state'].isin(valid_states)]
 
     return data
 
-# Clean the data
-data = clean_data(data)
+# Per-year partial: load, clean and sum one year by state
+def year_state_totals(year):
+    file = f'data/injury data/ITA Data CY {year}_cleaned.csv'
+    data = pd.read_csv(file, usecols=['state', 'total_injuries', 'annual_average_employees'])
+    data = clean_data(data)
+    data['year'] = year
+
+    return data.groupby(['state', 'year']).agg(
+        total_injuries=('total_injuries', 'sum'),
+        total_annual_average_employees=('annual_average_employees', 'sum')
+    ).reset_index()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compute injuries per employee by state and year.')
+    parser.add_argument('--workers', type=int, default=1, help='years processed in parallel (0 = one per CPU)')
+    args = parser.parse_args()
 
-# Data processing
-data['injuries_per_employee'] = data['total_injuries'] / data['annual_average_employees']
+    # Compute cumulative metrics for each state and year, one partial per year
+    partials = map_years(year_state_totals, find_years(), args.workers)
 
-# Compute cumulative metrics for each state and year
-state_year_metrics = data.groupby(['state', 'year']).agg(
-    total_injuries=('total_injuries', 'sum'),
-    total_annual_average_employees=('annual_average_employees', 'sum')
-).reset_index()
+    # Merge the partials in a fixed order so serial and parallel runs match
+    state_year_metrics = pd.concat(partials, ignore_index=True).sort_values(['state', 'year'], ignore_index=True)
 
-state_year_metrics['avg_injuries_per_employee'] = state_year_metrics['total_injuries'] / state_year_metrics['total_annual_average_employees']
+    state_year_metrics['avg_injuries_per_employee'] = state_year_metrics['total_injuries'] / state_year_metrics['total_annual_average_employees']
 
-# Save the state_year_metrics data to a CSV file
-state_year_metrics.to_csv('data/state_year_metrics.csv', index=False)
+    # Save the state_year_metrics data to a CSV file
+    state_year_metrics.to_csv('data/state_year_metrics.csv', index=False)
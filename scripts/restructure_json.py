@@ -1,39 +1,36 @@
-import json
-import numpy as np
+import argparse
+import os
+import sys
 
-# Path to the filtered JSON file
-input_file = 'filtered_aggregated_data.json'
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.estab_store import ESTAB_STORE_PATH, ESTAB_SUMMARY_PATH, iter_panel_records, write_store
+from osha.panel import YEARS, panel_to_records, read_panel, summarize_panel, write_records_json
+
+# Panel written by aggregate_injury_summary.py
+input_file = 'data/estab_panel.parquet'
 output_file = 'reformatted_aggregated_data.json'
 
-# Load the filtered data
-with open(input_file, 'r') as json_file:
-    filtered_data = json.load(json_file)
-
-# Initialize a dictionary to store the reformatted data
-reformatted_data = {}
-
-# Define the range of years to check
-years = range(2016, 2024)
-
-# Extract keys from one of the years (assuming all years have the same keys)
-sample_year = next(iter(filtered_data.values()))
-sample_keys = next(iter(sample_year.values())).keys()
-
-# Reformat data
-for establishment_id, yearly_data in filtered_data.items():
-    reformatted_data[establishment_id] = {key: [None] * len(years) for key in sample_keys}
-    
-    for i, year in enumerate(years):
-        year_str = str(year)
-        if year_str in yearly_data:
-            for key in sample_keys:
-                reformatted_data[establishment_id][key][i] = yearly_data[year_str].get(key, None)
-        else:
-            for key in sample_keys:
-                reformatted_data[establishment_id][key][i] = None
-
-# Save the reformatted data to a new JSON file
-with open(output_file, 'w') as json_file:
-    json.dump(reformatted_data, json_file, indent=4)
-
-print(f'Data successfully reformatted and saved to {output_file}')
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the per-establishment store from the panel.')
+    parser.add_argument('--json', action='store_true', help=f'also write {output_file}')
+    args = parser.parse_args()
+
+    # Load the panel
+    panel = read_panel(input_file)
+
+    # Indexed establishment store read by the Business Injury Rates page
+    count = write_store(iter_panel_records(panel, YEARS), ESTAB_STORE_PATH)
+    print(f'{count} establishments saved to {ESTAB_STORE_PATH}')
+
+    # Listing table (first non-null names, mean employees and injuries) for the same page
+    summarize_panel(panel).to_parquet(ESTAB_SUMMARY_PATH, index=False)
+    print(f'Establishment summary saved to {ESTAB_SUMMARY_PATH}')
+
+    if args.json:
+        # Reformat to {establishment_id: {field: [one value per year]}}
+        reformatted_data = panel_to_records(panel, YEARS)
+
+        # Save the reformatted data to a new JSON file
+        write_records_json(reformatted_data, output_file)
+
+        print(f'Data successfully reformatted and saved to {output_file}')
@@ -0,0 +1,121 @@
+import argparse
+import glob
+import os
+import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.cases import CASE_GLOB, CASE_MONTHLY_PATH, CASE_ROOT, CASE_WEEKDAY_PATH
+from osha.correlation import CORRELATION_PATH
+from osha.cube import CUBE_PATH
+from osha.enforcement import INSPECTION_ROOT, VIOLATION_ROOT
+from osha.estab_store import ESTAB_STORE_PATH, ESTAB_SUMMARY_PATH
+from osha.linkage import CROSSWALK_PATH
+from osha.naics import HIERARCHY_PATH
+from osha.name_index import NAME_INDEX_DIR
+from osha.pipeline import Manifest, Stage, run_pipeline
+from osha.result_cache import CACHE_DIR
+from osha.store import CLEANED_CSV_PATH, PARQUET_ROOT, year_path
+
+# Raw yearly ITA files, one clean stage per year found
+RAW_ITA_GLOB = 'data/injury data/ITA Data CY [0-9][0-9][0-9][0-9].csv'
+CLEANED_CSV_GLOB = CLEANED_CSV_PATH.format(year='*')
+PARQUET_GLOB = os.path.join(PARQUET_ROOT, 'year=*', '*.parquet')
+INSPECTION_GLOB = os.path.join(INSPECTION_ROOT, 'year=*', '*.parquet')
+VIOLATION_GLOB = os.path.join(VIOLATION_ROOT, 'year=*', '*.parquet')
+
+def raw_years():
+    return sorted(int(re.search(r'CY (\d{4})\.csv$', path).group(1)) for path in glob.glob(RAW_ITA_GLOB))
+
+def build_stages():
+    """
+    The preprocessing DAG: establishment panel, state table, case detail and enforcement data.
+    """
+    years = raw_years()
+    clean_stages = [
+        Stage(
+            f'clean_{year}', 'scripts/clean_summary_data.py',
+            inputs=[f'data/injury data/ITA Data CY {year}.csv'],
+            outputs=[CLEANED_CSV_PATH.format(year=year), year_path(year)],
+            args=['--years', str(year)],
+        )
+        for year in years
+    ]
+    cleaned = [stage.name for stage in clean_stages]
+
+    return clean_stages + [
+        # clean -> aggregate -> restructure -> name index, for the establishment panel
+        Stage('aggregate', 'scripts/aggregate_injury_summary.py',
+              inputs=[PARQUET_GLOB, CLEANED_CSV_GLOB], outputs=['data/estab_panel.parquet'], deps=cleaned),
+        Stage('restructure', 'scripts/restructure_json.py',
+              inputs=['data/estab_panel.parquet'], outputs=[ESTAB_STORE_PATH, ESTAB_SUMMARY_PATH], deps=['aggregate']),
+        Stage('name_index', 'scripts/build_name_index.py',
+              inputs=[PARQUET_GLOB, CLEANED_CSV_GLOB, ESTAB_SUMMARY_PATH], outputs=[os.path.join(NAME_INDEX_DIR, '*.npz')],
+              deps=cleaned + ['restructure']),
+
+        # Rollup cube behind the aggregate pages
+        Stage('rollup_cube', 'scripts/build_rollup_cube.py',
+              inputs=[PARQUET_GLOB, CLEANED_CSV_GLOB], outputs=[CUBE_PATH, HIERARCHY_PATH], deps=cleaned),
+
+        # Per-year pairwise correlations behind the correlation page and heatmap
+        Stage('correlations', 'scripts/build_correlations.py',
+              inputs=[PARQUET_GLOB, CLEANED_CSV_GLOB], outputs=[CORRELATION_PATH], deps=cleaned),
+
+        # Shared disk cache of the dashboard loaders, so a deploy starts warm
+        Stage('warm_cache', 'scripts/warm_cache.py',
+              inputs=[PARQUET_GLOB, CLEANED_CSV_GLOB, CUBE_PATH, ESTAB_SUMMARY_PATH],
+              outputs=[os.path.join(CACHE_DIR, 'index.sqlite')], deps=cleaned + ['rollup_cube', 'restructure']),
+
+        # State table
+        Stage('state_rates', 'scripts/preprocess_state_injury_rates.py',
+              inputs=[CLEANED_CSV_GLOB], outputs=['data/state_year_metrics.csv'], deps=cleaned),
+
+        # Case detail store and the seasonal counts behind the seasonal page
+        Stage('ingest_cases', 'scripts/ingest_case_detail.py',
+              inputs=[CASE_GLOB],
+              outputs=[os.path.join(CASE_ROOT, 'year=*', '*.parquet'), CASE_MONTHLY_PATH, CASE_WEEKDAY_PATH]),
+
+        # Multi-year raw merge
+        Stage('merge_summary', 'scripts/merge_summary_data.py',
+              inputs=['data/ITA Data CY *.csv'], outputs=['data/ita-data-all.csv']),
+
+        # merge_inspection_violation -> filter_violation-inspection_date, for enforcement data
+        Stage('merge_enforcement', 'scripts/merge_inspection_violation.py',
+              inputs=['data/violations/osha_violation*.csv', 'data/inspections/osha_inspection*.csv'],
+              outputs=[VIOLATION_GLOB, INSPECTION_GLOB]),
+        Stage('filter_enforcement', 'scripts/filter_violation-inspection_date.py',
+              inputs=[VIOLATION_GLOB, INSPECTION_GLOB],
+              outputs=['filtered_osha_violation.csv', 'filtered_osha_inspection.csv'], deps=['merge_enforcement']),
+
+        # Inspection -> ITA establishment crosswalk
+        Stage('link_inspections', 'scripts/link_inspections.py',
+              inputs=['filtered_osha_inspection.csv', PARQUET_GLOB, CLEANED_CSV_GLOB], outputs=[CROSSWALK_PATH],
+              deps=cleaned + ['filter_enforcement'], required=['filtered_osha_inspection.csv']),
+    ]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild the preprocessing outputs whose inputs changed.')
+    parser.add_argument('stages', nargs='*', help='only consider these stages (and what they depend on)')
+    parser.add_argument('--workers', type=int, default=2, help='stages run at the same time')
+    parser.add_argument('--force', action='store_true', help='rerun every stage')
+    parser.add_argument('--dry-run', action='store_true', help='list out-of-date stages without running them')
+    args = parser.parse_args()
+
+    stages = build_stages()
+    if args.stages:
+        # Keep the requested stages and everything upstream of them
+        by_name = {stage.name: stage for stage in stages}
+        wanted, todo = set(), list(args.stages)
+        while todo:
+            name = todo.pop()
+            if name not in by_name:
+                parser.error(f'unknown stage {name}; choose from {", ".join(by_name)}')
+            if name not in wanted:
+                wanted.add(name)
+                todo.extend(by_name[name].deps)
+        stages = [stage for stage in stages if stage.name in wanted]
+
+    status = run_pipeline(stages, Manifest(), args.workers, args.force, args.dry_run)
+    failed = [name for name, result in status.items() if result in ('failed', 'blocked')]
+    if failed:
+        sys.exit(f'Pipeline stages did not complete: {", ".join(failed)}')
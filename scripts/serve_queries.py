@@ -0,0 +1,21 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.service import CACHE_BYTES, DEFAULT_HOST, DEFAULT_PORT, ENDPOINTS, QueryService, serve
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve the dashboard aggregates over HTTP (read-only, JSON or Arrow).')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on')
+    parser.add_argument('--cache-mb', type=float, default=CACHE_BYTES / 2**20, help='memory for cached responses')
+    args = parser.parse_args()
+
+    print(f'Serving on http://{args.host}:{args.port}')
+    for endpoint, params in ENDPOINTS.items():
+        print(f'  {endpoint:<22} {params}')
+    try:
+        serve(args.host, args.port, QueryService(cache_bytes=int(args.cache_mb * 2**20)))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,18 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from osha.result_cache import CACHE_DIR, default_cache, warm
+from views.loaders import warm_calls
+
+if __name__ == '__main__':
+    cache = default_cache()
+    if cache is None:
+        sys.exit('The result cache is turned off (OSHA_CACHE_MB=0).')
+
+    start = time.perf_counter()
+    computed = warm(warm_calls())
+    stats = cache.stats()
+    print(f'{computed} results computed in {time.perf_counter() - start:.1f}s; '
+          f'{stats["entries"]} entries, {stats["bytes"] / 2**20:.1f} of {stats["max_bytes"] / 2**20:.0f} MB in {CACHE_DIR}')
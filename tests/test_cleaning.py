@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from osha.cleaning import SAMPLE_BYTES, clean_csv_chunked, clean_frame, detect_encoding, read_csv_any_encoding
+from osha.synthetic import write_summary_year
+
+
+@pytest.fixture(scope='module')
+def latin1_outside_samples(tmp_path_factory):
+    """
+    A UTF-8 ITA file of about 6 MB with one Latin-1 byte between the 1 MB
+    windows detect_encoding samples (0, ~1.67, ~3.33 and ~5 MB).
+    """
+    path = tmp_path_factory.mktemp('encoding') / 'ITA Data CY 2023.csv'
+    write_summary_year(path, 2023, rows_per_year=30_000)
+    data = bytearray(path.read_bytes())
+    assert len(data) > 5 * SAMPLE_BYTES
+
+    # First letter of the establishment name on the first row past 1.3 MB
+    row = data.index(b'\n', int(1.3 * SAMPLE_BYTES)) + 1
+    position = data.index(b',', row) + 1
+    assert chr(data[position]).isalpha()
+    data[position] = 0xC9  # 'É' in Latin-1, invalid on its own in UTF-8
+    path.write_bytes(bytes(data))
+    return path
+
+
+def test_detect_encoding_misses_byte_outside_samples(latin1_outside_samples):
+    # The precondition of the fallback tests below
+    assert detect_encoding(latin1_outside_samples) == 'utf-8'
+    with pytest.raises(UnicodeDecodeError):
+        pd.read_csv(latin1_outside_samples, encoding='utf-8')
+
+
+def test_read_csv_any_encoding_falls_back(latin1_outside_samples):
+    df = read_csv_any_encoding(latin1_outside_samples)
+    expected = pd.read_csv(latin1_outside_samples, encoding='ISO-8859-1')
+    pd.testing.assert_frame_equal(df, expected)
+    assert df['establishment_name'].str.startswith('É').sum() == 1
+
+
+def test_clean_csv_chunked_restarts_with_next_encoding(latin1_outside_samples, tmp_path):
+    output_path = tmp_path / 'cleaned.csv'
+    chunks = []
+    restarts = []
+
+    stats = clean_csv_chunked(latin1_outside_samples, output_path, chunk_rows=2_000, on_chunk=chunks.append,
+                              on_restart=lambda: (restarts.append(len(chunks)), chunks.clear()))
+
+    # Chunks before the bad byte had been passed on with UTF-8 and were discarded
+    assert len(restarts) == 1 and restarts[0] > 0
+
+    raw = pd.read_csv(latin1_outside_samples, encoding='ISO-8859-1', dtype=str)
+    expected = clean_frame(raw.drop_duplicates())
+    written = pd.read_csv(output_path, dtype=str)
+    assert stats == {'rows_read': len(raw), 'rows_written': len(expected)}
+    assert len(written) == len(expected)
+    assert sum(len(chunk) for chunk in chunks) == len(expected)
+    assert written['establishment_name'].str.startswith('É').sum() == 1
@@ -0,0 +1,30 @@
+import numpy as np
+
+from osha.cleaning import clean_frame
+from osha.name_index import NameIndex, build_indexes, index_path, load_index
+from osha.store import read_year, write_year
+from osha.synthetic import summary_block
+
+YEAR = 2023
+
+
+def test_load_index_rebuilds_after_reordered_year(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = clean_frame(summary_block(YEAR, 0, 3_000).drop_duplicates()).reset_index(drop=True)
+    write_year(df, YEAR)
+    build_indexes(['establishment_name'])['establishment_name'].save(index_path('establishment_name'))
+    term = df['establishment_name'].iloc[0]
+
+    # Same row count, different order: the saved positions now point at other rows
+    write_year(df.iloc[::-1].reset_index(drop=True), YEAR)
+    saved = NameIndex.load(index_path('establishment_name'))
+    assert saved.year_rows(YEAR) == len(df)
+
+    index = load_index('establishment_name')
+    rows = index.search(term, year=YEAR)
+    stored = read_year(YEAR, ['establishment_name'])
+    expected = np.flatnonzero(stored['establishment_name'].str.casefold().str.contains(term.casefold(), regex=False))
+    np.testing.assert_array_equal(rows, expected)
+
+    # The rebuilt index was saved and is current
+    assert np.array_equal(NameIndex.load(index_path('establishment_name')).sources, index.sources)
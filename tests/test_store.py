@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from osha.cleaning import clean_frame
+from osha.store import YearWriter, read_year, to_typed
+from osha.synthetic import summary_block
+
+
+def test_year_writer_later_chunk_with_missing_values(tmp_path):
+    # Text chunks, as the chunked cleaner reads them
+    raw = summary_block(2023, 0, 2_000).astype(str).replace('nan', np.nan)
+    cleaned = clean_frame(raw.drop_duplicates())
+    first, later = cleaned.iloc[:500].copy(), cleaned.iloc[500:].copy()
+
+    # Only the later chunk has missing ids, years and counts, or any change_reason
+    first['change_reason'] = np.nan
+    later.loc[later.index[:3], 'id'] = np.nan
+    later.loc[later.index[3:6], 'year_filing_for'] = np.nan
+    later.loc[later.index[6:9], 'total_deaths'] = np.nan
+    later.loc[later.index[9], 'change_reason'] = 'Correction'
+
+    with YearWriter(2023, tmp_path) as writer:
+        writer.write(first)
+        writer.write(later)
+
+    stored = read_year(2023, root=tmp_path)
+    expected = to_typed(pd.concat([first, later]))
+    assert len(stored) == len(cleaned)
+    assert stored['id'].isna().sum() == 3
+    assert stored['year_filing_for'].isna().sum() == 3
+    assert stored['total_deaths'].isna().sum() == expected['total_deaths'].isna().sum()
+    assert (stored['change_reason'] == 'Correction').sum() == 1
+    np.testing.assert_array_equal(stored['establishment_id'].to_numpy(), expected['establishment_id'].to_numpy())
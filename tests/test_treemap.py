@@ -0,0 +1,40 @@
+import pandas as pd
+import streamlit as st
+
+from osha.cleaning import clean_frame
+from osha.cube import CUBE_PATH, SOURCE_COLUMNS, build_year_cube, finalize_cube, slice_cube
+from osha.result_cache import use_cache
+from osha.store import load_cleaned_year, write_year
+from osha.synthetic import summary_block
+from views import loaders
+
+YEAR = 2023
+
+
+def normalized(table):
+    table = table.astype({'naics_code': str, 'industry_description': str}).astype(
+        {col: 'float64' for col in ['total_employees', 'total_hours_worked', 'total_injuries']}
+    )
+    return table.sort_values('naics_code', ignore_index=True)
+
+
+def test_treemap_table_same_with_and_without_cube(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    use_cache(str(tmp_path / 'cache'))
+    write_year(clean_frame(summary_block(YEAR, 0, 5_000).drop_duplicates()), YEAR)
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    from_rows = loaders.load_treemap_data(YEAR)
+
+    cube = finalize_cube([build_year_cube(load_cleaned_year(YEAR, SOURCE_COLUMNS), YEAR)])
+    cube.to_parquet(CUBE_PATH, index=False)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    from_cube = loaders.load_treemap_data(YEAR)
+
+    # Establishments without injuries are in the cube but left out of the treemap
+    assert (~cube['injured']).any()
+    assert from_cube['total_employees'].sum() < slice_cube(cube, ['year'])['employees'].sum()
+
+    pd.testing.assert_frame_equal(normalized(from_cube), normalized(from_rows))
@@ -0,0 +1,23 @@
+"""
+Dashboard pages. Each page is a module with a render() function, imported the
+first time it is shown, so light pages never pay for the heavy imports of
+others. Cached loaders live in views.loaders and are shared by every page.
+"""
+import importlib
+
+# Sidebar title -> page module in this package
+PAGES = {
+    'Home': 'home',
+    'Correlation Analysis': 'correlation',
+    'Correlation Heatmap': 'correlation_heatmap',
+    'NAICS Treemap': 'naics_treemap',
+    'Business Injury Rates': 'business',
+    'State Injury Rate Trends': 'state_trends',
+    '3D Scatterplots': 'scatter_3d',
+    'DAFW by VA ZIP': 'dafw_va',
+    'Seasonal Injury Patterns': 'seasonal',
+}
+
+
+def render(title):
+    importlib.import_module(f'{__name__}.{PAGES[title]}').render()
@@ -0,0 +1,92 @@
+"""Business Injury Rates page: one establishment's filings across years."""
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from osha import instrument
+from views.loaders import load_business_info, load_business_source, load_name_index
+from views.styling import style_rows
+
+
+def render():
+    # Streamlit app layout
+    st.title('Business Data Visualization')
+
+    data = load_business_source()
+    business_info_df = load_business_info()
+    instrument.mark('transform')
+
+    # Search bar to filter based on establishment name
+    search_term = st.text_input('Search Establishment Name').lower()
+    name_index = load_name_index('estab_summary')
+    if search_term and name_index is not None and len(name_index.name_ids) == len(business_info_df):
+        # Best matches first (exact, prefix, word prefix, then any substring)
+        filtered_business_info_df = business_info_df.iloc[name_index.top_k(search_term, k=None)]
+    else:
+        filtered_business_info_df = business_info_df[
+            business_info_df['Establishment Name'].str.lower().str.contains(search_term)
+        ]
+
+    # Display filtered business IDs and company names table
+    instrument.dataframe(filtered_business_info_df,use_container_width=True,hide_index=True)
+
+    # Search box to enter business ID
+    business_id = st.text_input('Enter Business ID')
+
+    business_data = data.get(business_id.strip())
+
+    if business_data is not None:
+        
+        # Display business information in a table
+        instrument.mark('figure')
+        years = list(range(2016, 2024))
+        business_df = pd.DataFrame(business_data, index=years).T
+        st.write("### Business Information")
+
+        # Define the list of row keys to skip for stylization
+        skip_keys = ['id', 'zip_code', 'year_filing_for']  # Replace with your actual keys
+
+        # Apply row-wise color scale styling, skipping specified rows
+        styled_df = style_rows(business_df, skip_keys)
+
+        # Display the styled dataframe
+        instrument.dataframe(styled_df, use_container_width=True,height=1000)
+        
+        # Prepare data for the calculated values
+        fields_to_calculate = [
+            'total_injuries', 'total_poisonings', 'total_respiratory_conditions',
+            'total_skin_disorders', 'total_hearing_loss', 'total_other_illnesses'
+        ]
+        
+        if all(field in business_data for field in fields_to_calculate) and 'annual_average_employees' in business_data:
+            df_calculations = pd.DataFrame({'Year': years})
+            for field in fields_to_calculate:
+                df_calculations[field] = [
+                    v / h if v is not None and h is not None and h != 0 else None 
+                    for v, h in zip(business_data[field], business_data['annual_average_employees'])
+                ]
+
+            # Plot the calculated values
+            fig = go.Figure()
+            for field in fields_to_calculate:
+                fig.add_trace(go.Scatter(x=df_calculations['Year'], y=df_calculations[field], mode='lines', name=field))
+
+            fig.update_layout(title='Injury Types/Total Employees', xaxis_title='Year', yaxis_title='Value')
+            instrument.plotly_chart(fig, use_container_width=True)
+            
+        # Prepare data for plotting
+        year_data = {'Year': years}
+        for key, values in business_data.items():
+            if all(isinstance(v, (int, float)) for v in values):
+                year_data[key] = values
+
+        # Convert to DataFrame
+        all_df = pd.DataFrame(year_data)
+
+        # Plot all numeric key data
+        fig = px.line(all_df, x='Year', y=all_df.columns[1:], title='Business Data Over Years')
+
+        instrument.plotly_chart(fig, use_container_width=True)
+    else:
+        st.write('Business ID not found.')
@@ -0,0 +1,184 @@
+"""Correlation Analysis page: scatter of two measures for one year."""
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from osha import instrument
+from osha.correlation import lookup, year_correlations
+from osha.scatter import (RENDER_MODES, WEBGL_MAX_POINTS, add_region_points, choose_strategy, density_figure,
+                          points_in_region, stratified_sample)
+from views.loaders import CORRELATION_COLUMNS, load_correlations, load_data, load_name_index
+
+
+def render():
+    # Set up the main page and navigation
+    st.title("Injury Rate Analysis Dashboard")
+    
+    year_select,name_search = st.columns(2)
+    
+    placeholder = 'Select a year'
+    with year_select:
+        year = st.selectbox("Select year for data",list(reversed(range(2016,2024))),index = 7)
+    
+    if year != placeholder:
+        data_cleaned = load_data(year, CORRELATION_COLUMNS)
+        instrument.mark('transform')
+        
+        with name_search:
+            search_column = st.selectbox('Search column', ['establishment_name', 'company_name'])
+            search_term = st.text_input(f'Search in {search_column}')
+            
+        # Filter data based on search term
+        if search_term:
+            name_index = load_name_index(search_column)
+            if name_index is not None and year in name_index.years and name_index.year_rows(year) > data_cleaned.index.max():
+                # Index positions are rows of the yearly store, which load_data keeps as the index
+                rows = name_index.search(search_term, year=year)
+                filtered_df = data_cleaned.loc[data_cleaned.index.intersection(rows)]
+            else:
+                filtered_df = data_cleaned[data_cleaned[search_column].str.contains(search_term, case=False, na=False)]
+            # Display filtered data
+            instrument.dataframe(filtered_df)
+        else:
+            instrument.dataframe(data_cleaned)
+            
+        # Dropdowns for selecting x and y axis fields
+        numeric_fields = data_cleaned.select_dtypes(include=['number']).columns.tolist()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            x_field = st.selectbox("Select the field for the x-axis", numeric_fields, index=numeric_fields.index('total_hours_worked'))
+            x_log = st.checkbox("Log scale for x-axis",value=True)
+        with col2:
+            y_field = st.selectbox("Select the field for the y-axis", numeric_fields, index=numeric_fields.index('total_dafw_days'))
+            y_log = st.checkbox("Log scale for y-axis",value=True)
+        with col3:
+            color_field = st.selectbox("Select the field for color scale", numeric_fields, index=numeric_fields.index('injury_rate'))
+            color_log = st.checkbox("Log scale for color field")
+        with col4:
+            filter_min, filter_max = 0.0, 1.0  # Default values
+            if color_field:
+                if color_log:
+                    valid_color_data = data_cleaned[color_field].replace([np.inf, -np.inf], np.nan).dropna()
+                    filter_min, filter_max = float(valid_color_data.min()), float(valid_color_data.max())
+                else:
+                    filter_min, filter_max = float(data_cleaned[color_field].min()), float(data_cleaned[color_field].max())
+            selected_range = st.slider(
+                "Select range for color scale",
+                min_value=filter_min,
+                max_value=filter_max,
+                value=(0.15, filter_max),
+            )
+
+        # Define hover data
+        hover_data = {
+            'company_name': True,
+            'id': True,
+            'naics_code': True,
+            'state': True,
+            'city': True,
+            'industry_description': True,
+            'annual_average_employees': True,
+            'total_injuries': True,
+            'injury_rate': True
+        }
+
+        # Customize hover template
+        hovertemplate = "<br>".join([
+            "Company: %{customdata[0]}",
+            "Company ID: %{customdata[1]}",
+            "NAICS Code: %{customdata[2]}",
+            "State: %{customdata[3]}",
+            "City: %{customdata[4]}",
+            "Industry: %{customdata[5]}",
+            "Employees: %{customdata[6]}",
+            "Total Injuries: %{customdata[7]}",
+            "Injury Rate: %{customdata[8]:.2f}"
+        ])
+
+        # How to draw the points: Auto picks SVG, WebGL or a density grid from the point count
+        render_mode = st.radio("Rendering", RENDER_MODES, horizontal=True)
+
+        # Transform the color field to log scale if needed
+        if color_field:
+            data_filtered = data_cleaned[(data_cleaned[color_field] >= selected_range[0]) & (data_cleaned[color_field] <= selected_range[1])]
+
+            if color_log:
+                # On the filtered copy: the loaded frame is shared and read-only
+                data_filtered = data_filtered.assign(log_color=np.log1p(data_filtered[color_field]))  # log1p to handle zero values
+                color_col = 'log_color'
+                color_label = color_field + " (log scale)"
+            else:
+                color_col = color_field
+                color_label = color_field
+            strategy = choose_strategy(len(data_filtered), render_mode)
+            instrument.mark('figure')
+
+            if strategy == 'density':
+                # Server-side binning: the payload is the grid, not the points
+                fig = density_figure(data_filtered, x_field, y_field, x_log, y_log, title=f"Density of {x_field} vs {y_field}")
+                st.caption(f"{len(data_filtered):,} points binned into a density grid.")
+
+                with st.expander("Show points in a region"):
+                    x_min, x_max = float(data_filtered[x_field].min()), float(data_filtered[x_field].max())
+                    y_min, y_max = float(data_filtered[y_field].min()), float(data_filtered[y_field].max())
+                    x_range = st.slider(f"{x_field} range", x_min, x_max, (x_min, x_max))
+                    y_range = st.slider(f"{y_field} range", y_min, y_max, (y_min, y_max))
+                    region_df = points_in_region(data_filtered, x_field, y_field, x_range, y_range)
+                    if len(region_df) <= WEBGL_MAX_POINTS:
+                        add_region_points(fig, region_df, x_field, y_field, x_log, y_log, hover_data, hovertemplate)
+                        st.write(f"Showing {len(region_df):,} points in the selected region.")
+                    else:
+                        st.write(f"{len(region_df):,} points in the selected region; narrow it to see individual points.")
+            else:
+                if strategy == 'sample':
+                    # Even coverage of the plot area, keeping sparse cells and extreme values
+                    plot_df = stratified_sample(data_filtered, x_field, y_field, log_x=x_log, log_y=y_log, outlier_columns=[color_field])
+                    st.caption(f"Showing a stratified sample of {len(plot_df):,} of {len(data_filtered):,} points.")
+                else:
+                    plot_df = data_filtered
+
+                fig = px.scatter(
+                    plot_df, 
+                    x=x_field, 
+                    y=y_field, 
+                    title=f"Scatter Plot of {x_field} vs {y_field}",
+                    log_x=x_log,
+                    log_y=y_log,
+                    color=color_col,  # Use the transformed or original color field
+                    color_continuous_scale=px.colors.sequential.Sunset,
+                    hover_data=hover_data,
+                    render_mode='svg' if strategy == 'svg' else 'webgl'
+                )
+
+                # Update color bar title to reflect the scale
+                fig.update_coloraxes(colorbar_title=color_label)
+                fig.update_traces(hovertemplate=hovertemplate)
+        else:
+            fig = px.scatter(
+                data_cleaned, 
+                x=x_field, 
+                y=y_field, 
+                title=f"Scatter Plot of {x_field} vs {y_field}",
+                log_x=x_log,
+                log_y=y_log,
+                hover_data=hover_data
+            )
+            fig.update_traces(hovertemplate=hovertemplate)
+        
+        fig.update_layout(height=800)  # Adjust height here
+        
+        instrument.plotly_chart(fig, use_container_width=True)
+        
+        # Display the correlation coefficient
+        instrument.mark('transform')
+        coefficients = lookup(load_correlations(), year, x_field, y_field)
+        if coefficients is None:
+            # Not precomputed (e.g. the id column): correlate the pair here
+            coefficients = lookup(year_correlations(data_cleaned, year, [x_field, y_field]), year, x_field, y_field)
+        st.write(f"Correlation coefficient between {x_field} and {y_field}: {coefficients['pearson']}")
+        st.write(f"Pearson on log1p values: {coefficients['pearson_log1p']:.4f}, "
+                 f"Spearman: {coefficients['spearman']:.4f} ({coefficients['pairs']:,} pairs)")
+        
+        # Display DataFrame
+        if st.checkbox('Show raw data'):
+            st.write(data_filtered)
@@ -0,0 +1,43 @@
+"""Correlation Heatmap page: every pairwise coefficient of the measures for one year."""
+import plotly.express as px
+import streamlit as st
+
+from osha import instrument
+from osha.correlation import METHODS, correlation_matrix
+from views.loaders import load_correlations
+
+
+def render():
+    st.title("Correlation Heatmap")
+
+    # Precomputed by scripts/build_correlations.py; no establishment rows are read here
+    correlations = load_correlations()
+    if correlations is None:
+        st.warning("No correlations found. Run scripts/build_correlations.py first.")
+        return
+
+    col1, col2 = st.columns(2)
+    years = sorted(correlations['year'].unique().tolist(), reverse=True)
+    year = col1.selectbox("Select year", years)
+    method = col2.radio("Coefficient", list(METHODS), format_func=METHODS.get, horizontal=True)
+
+    instrument.mark('transform')
+    matrix = correlation_matrix(correlations, year, method)
+
+    instrument.mark('figure')
+    fig = px.imshow(
+        matrix,
+        text_auto='.2f',
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale=px.colors.diverging.RdBu_r,
+        labels=dict(x='', y='', color=METHODS[method]),
+        title=f"{METHODS[method]} correlations, {year}",
+        aspect='auto',
+    )
+    fig.update_layout(height=800)
+    instrument.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("Pair counts"):
+        st.write("Establishments with both values present, for each pair of measures.")
+        instrument.dataframe(correlation_matrix(correlations, year, 'pairs'))
@@ -0,0 +1,11 @@
+"""DAFW by VA ZIP page: prebuilt map of days away from work."""
+import streamlit as st
+
+
+def render():
+    st.title("Days away from work grouped by VA Zip Code")
+    
+    with open('html/ita-data-map-va.html','r') as f: 
+        html_data = f.read()
+    
+    st.components.v1.html(html_data, scrolling=True, height=600)
@@ -0,0 +1,36 @@
+"""Home page: overview of the dashboard and the data."""
+import streamlit as st
+
+
+def render():
+    st.title("OSHA Data Visualization Webapp")
+    st.write("""
+    This webapp provides various visualizations and analyses of OSHA data related to workplace injuries. Use the sidebar to navigate through the different pages, each offering unique insights into the data.
+    
+    - **Correlation Analysis**: Explore relationships between various injury-related metrics.
+    - **Correlation Heatmap**: Compare the correlations between every pair of injury-related metrics for a year.
+    - **NAICS Treemap**: View businesses grouped by NAICS code, colored by injury rates.
+    - **Business Injury Rates**: Examine detailed injury data for specific businesses.
+    - **State Injury Rate Trends**: Analyze injury rate trends across different states over time.
+    - **3D Scatterplots**: Visualize multidimensional data with interactive scatter plots.
+    - **DAFW by VA ZIP**: See the distribution of days away from work grouped by ZIP codes in Virginia.
+    - **Seasonal Injury Patterns**: Compare injury and illness cases by month of the year and day of the week.
+
+    Select a page from the sidebar to begin exploring the data!
+    """)
+    
+    st.subheader("About the Data")
+    st.write("""
+    The data used in this webapp is sourced from the Occupational Safety and Health Administration (OSHA) Injury Tracking Application (ITA). 
+    The ITA collects data from establishments about work-related injuries and illnesses as required by OSHA's recordkeeping regulations. 
+    The data includes details such as the number of injuries, illnesses, and fatalities, as well as the total hours worked and the number of employees.
+    
+    The first year of data collection was for calendar year (CY) 2016, with subsequent years collected annually. 
+    Establishments with 250 or more employees and those with 20-249 employees in certain high-risk industries must submit their OSHA Form 300A data electronically each year.
+    """)
+    
+    st.subheader("Data Dictionary")
+
+    # Display PDF
+    dict_url = 'https://www.osha.gov/sites/default/files/summary_data_dictionary.pdf'
+    st.markdown("The following document provides a detailed explanation of the variables included in the dataset: [Data Dictionary](%s)" % dict_url)
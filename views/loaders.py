@@ -0,0 +1,211 @@
+"""Cached loaders shared by every dashboard page."""
+import json
+import os
+import threading
+
+import pandas as pd
+
+from osha import cases, correlation, instrument, name_index, result_cache
+from osha.cube import CUBE_PATH, load_cube, naics_table, state_year_metrics
+from osha.estab_store import ESTAB_STORE_PATH, ESTAB_SUMMARY_PATH, EstablishmentStore
+from osha.naics import HIERARCHY_PATH
+from osha.panel import YEARS
+from osha.result_cache import disk_cached
+from osha.store import CLEANED_CSV_PATH, ReadOnlyFrame, compact_dtypes, has_year, read_year, year_path
+
+# Columns each page reads from the per-year data
+CORRELATION_COLUMNS = (
+    'id', 'establishment_name', 'company_name', 'city', 'state', 'naics_code', 'industry_description',
+    'annual_average_employees', 'total_hours_worked', 'total_deaths', 'total_dafw_cases',
+    'total_djtr_cases', 'total_other_cases', 'total_dafw_days', 'total_djtr_days', 'total_injuries',
+    'total_skin_disorders', 'total_respiratory_conditions', 'total_poisonings', 'total_hearing_loss',
+    'total_other_illnesses', 'injury_rate'
+)
+TREEMAP_COLUMNS = (
+    'naics_code', 'industry_description', 'annual_average_employees', 'total_hours_worked', 'total_injuries'
+)
+
+# Rows per page of table previews
+PREVIEW_ROWS = 100
+
+# Columns load_data always needs for its own filtering
+LOAD_DATA_KEY_COLUMNS = ('total_injuries', 'annual_average_employees', 'injury_rate')
+
+# Loaded frames kept in memory per process: every year of both column sets the pages
+# read (CORRELATION_COLUMNS, and TREEMAP_COLUMNS without the rollup cube). Calls with
+# other column lists would otherwise each hold a frame for the life of the process;
+# past the cap the least recently used is dropped and re-read from the disk cache.
+MEMORY_ENTRIES = int(os.environ.get('OSHA_MEMORY_ENTRIES', 2 * len(YEARS)))
+
+BUSINESS_JSON_PATH = 'data/sample_by_estab_id.json'
+STATE_METRICS_PATH = 'data/state_year_metrics.csv'
+
+def year_inputs(year, *args, **kwargs):
+    # File load_data reads for a year
+    return [year_path(year)] if has_year(year) else [CLEANED_CSV_PATH.format(year=year)]
+
+# Load the data
+@disk_cached(inputs=year_inputs)
+def read_data(year, columns=None):
+    if columns is not None:
+        columns = list(dict.fromkeys(list(columns) + list(LOAD_DATA_KEY_COLUMNS)))
+
+    if has_year(year):
+        # Typed Parquet store written by scripts/clean_summary_data.py
+        data = read_year(year, columns)
+    else:
+        file_path = CLEANED_CSV_PATH.format(year=year)
+        usecols = [c for c in columns if c != 'injury_rate'] if columns is not None else None
+        data = pd.read_csv(file_path, usecols=usecols)
+
+        # Data cleaning and extraction
+        data['total_hours_worked'] = pd.to_numeric(data['total_hours_worked'], errors='coerce')
+        data['total_injuries'] = pd.to_numeric(data['total_injuries'], errors='coerce')
+        data['annual_average_employees'] = pd.to_numeric(data['annual_average_employees'], errors='coerce')
+
+        # Calculate the injury rate per employee
+        data['injury_rate'] = data['total_injuries'] / data['annual_average_employees']
+
+    # Non-zero injuries and no NaN values in key columns (the rows the correlations are precomputed on)
+    data_cleaned = correlation.injured_rows(data)
+    
+    # Categoricals for repeated strings, small integers for whole-number counts
+    return compact_dtypes(data_cleaned)
+
+@instrument.cache_resource(max_entries=MEMORY_ENTRIES)
+def load_data(year, columns=None):
+    # One shared, read-only copy per process (derive with .assign() or .copy() to add columns)
+    data = ReadOnlyFrame(read_data(year, columns))
+    instrument.track_frame(f'load_data {year}' + ('' if columns is None else f' ({len(columns)} columns)'), data)
+    return data
+
+@instrument.cache_data
+@disk_cached(inputs=lambda: [BUSINESS_JSON_PATH])
+def load_business_data():
+    with open(BUSINESS_JSON_PATH) as f:
+        data = json.load(f)
+    return data
+
+@instrument.cache_resource
+def load_establishment_store():
+    # Indexed store written by scripts/restructure_json.py; records are read on demand
+    if os.path.exists(ESTAB_STORE_PATH):
+        return EstablishmentStore(ESTAB_STORE_PATH)
+    return None
+
+def load_business_source():
+    store = load_establishment_store()
+    return store if store is not None else load_business_data()
+
+# Display names of the precomputed establishment summary columns
+BUSINESS_INFO_COLUMNS = {
+    'establishment_id': 'Business ID',
+    'company_name': 'Company Name',
+    'establishment_name': 'Establishment Name',
+    'avg_annual_employees': 'Avg Annual Employees',
+    'avg_annual_injuries': 'Avg Annual Injuries',
+    'avg_injuries_per_employee': 'Avg Annual Injuries/Employee',
+}
+
+@instrument.cache_data
+@disk_cached(inputs=lambda: [ESTAB_SUMMARY_PATH, ESTAB_STORE_PATH, BUSINESS_JSON_PATH])
+def load_business_info():
+    # Summary table precomputed by scripts/restructure_json.py
+    if os.path.exists(ESTAB_SUMMARY_PATH):
+        return pd.read_parquet(ESTAB_SUMMARY_PATH).rename(columns=BUSINESS_INFO_COLUMNS)
+
+    # Extract business IDs and corresponding first non-null company names and establishment names
+    business_info = {
+        biz_id: (
+            next((name for name in biz_data['company_name'] if name), 'N/A'),
+            next((name for name in biz_data['establishment_name'] if name), 'N/A'),
+            sum(x for x in biz_data['annual_average_employees'] if x is not None) / len([x for x in biz_data['annual_average_employees'] if x is not None]),
+            sum(x for x in biz_data['total_injuries'] if x is not None) / len([x for x in biz_data['total_injuries'] if x is not None]),
+        )
+        for biz_id, biz_data in load_business_source().items()
+    }
+    return pd.DataFrame(
+        [(biz_id, info[0], info[1], info[2], info[3], info[3]/info[2]) for biz_id, info in business_info.items()],
+        columns=['Business ID', 'Company Name', 'Establishment Name','Avg Annual Employees','Avg Annual Injuries','Avg Annual Injuries/Employee']
+    )
+
+@instrument.cache_data
+def load_rollup_cube():
+    # Year x state x NAICS prefix x size sums written by scripts/build_rollup_cube.py
+    return load_cube() if os.path.exists(CUBE_PATH) else None
+
+@instrument.cache_data
+def load_naics_hierarchy():
+    # Sector -> 6-digit NAICS aggregates written next to the rollup cube
+    return pd.read_parquet(HIERARCHY_PATH) if os.path.exists(HIERARCHY_PATH) else None
+
+@instrument.cache_data(max_entries=MEMORY_ENTRIES)
+@disk_cached(inputs=lambda year: [CUBE_PATH] + year_inputs(year))
+def load_treemap_data(year):
+    # NAICS x industry sums behind the flat treemap
+    cube = load_rollup_cube()
+    # Cubes built before the injured dimension are ignored until rebuilt
+    if cube is not None and 'injured' in cube.columns:
+        # 6-digit slice of the precomputed rollup cube, summing the same establishments
+        # with injuries as the fallback below
+        return naics_table(cube, year)
+
+    df = load_data(year, TREEMAP_COLUMNS)
+    return df.groupby(['naics_code', 'industry_description'], observed=True).agg(
+        total_employees=('annual_average_employees', 'sum'),
+        total_hours_worked=('total_hours_worked', 'sum'),
+        total_injuries=('total_injuries', 'sum')
+    ).reset_index()
+
+# Function to load the state_year_metrics data
+@instrument.cache_data
+@disk_cached(inputs=lambda: [CUBE_PATH, STATE_METRICS_PATH])
+def load_state_data():
+    cube = load_rollup_cube()
+    if cube is None:
+        return pd.read_csv(STATE_METRICS_PATH)
+
+    return state_year_metrics(cube)
+
+def state_pivot(state_year_metrics):
+    # State x year table of injuries per employee
+    return state_year_metrics.pivot(index='state', columns='year', values='avg_injuries_per_employee').fillna(0)
+
+@instrument.cache_resource
+def load_name_index(name):
+    # Prebuilt by scripts/build_name_index.py, loaded once per process (and rebuilt
+    # first if the data it indexes changed since)
+    return name_index.load_index(name)
+
+
+@instrument.cache_data
+def load_case_counts():
+    # Monthly and weekday case counts written by scripts/ingest_case_detail.py
+    return cases.load_case_counts()
+
+
+@instrument.cache_data
+def load_correlations():
+    # Per-year pairwise coefficients written by scripts/build_correlations.py
+    return correlation.load_correlations()
+
+
+def warm_calls(years=YEARS):
+    """
+    Disk-cached loader calls worth having ready after a restart: the
+    correlation rows and treemap table of every year with data, the state
+    table and the business listing.
+    """
+    calls = [(load_state_data.__wrapped__, ()), (load_business_info.__wrapped__, ())]
+    for year in reversed(years):
+        if os.path.exists(year_inputs(year)[0]):
+            calls.append((read_data, (year, CORRELATION_COLUMNS)))
+            calls.append((load_treemap_data.__wrapped__, (year,)))
+    return calls
+
+@instrument.cache_resource
+def start_cache_warmup():
+    # Once per server process: fill the disk cache in the background so the first visitors hit it
+    thread = threading.Thread(target=result_cache.warm, args=(warm_calls(),), daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,105 @@
+"""NAICS Treemap page: employees and injury rates by industry."""
+import plotly.express as px
+import streamlit as st
+
+from osha import instrument
+from osha.naics import ROOT, children_of, node_label, titled
+from views.loaders import load_naics_hierarchy, load_treemap_data
+
+
+# Function to wrap text at 20 characters
+def wrap_text(text, width=20):
+    return '<br>'.join([text[i:i+width] for i in range(0, len(text), width)])
+
+
+def render():
+    st.title('OSHA Injury Data Treemap')
+    col1,col2 = st.columns(2)
+    with col1:
+        st.subheader('Businesses grouped by NAICS code \nColored by Injury Rate (total_injuries/total_employees)')
+    with col2:
+        year = st.selectbox("Select year for data", reversed(range(2016,2024)), index=0)
+
+    hierarchy = load_naics_hierarchy()
+    view = st.radio('View', ['Drill-down', 'Flat (6-digit)'], horizontal=True) if hierarchy is not None else 'Flat (6-digit)'
+
+    if view == 'Drill-down':
+        rates = {
+            'Injuries per employee': 'injury_rate',
+            'Injuries per 200,000 hours worked': 'injuries_per_200k_hours',
+        }
+        col1, col2 = st.columns(2)
+        with col1:
+            rate = rates[st.selectbox('Color by', list(rates))]
+        with col2:
+            min_employees = st.number_input('Minimum employees per tile', min_value=0, value=0, step=1000)
+
+        # Treemap clicks are not sent back to Streamlit, so the drill path is kept in session
+        # state, one per year (a node drilled into in one year may not exist in another)
+        path = st.session_state.setdefault(f'naics_path_{year}', [ROOT])
+        node = path[-1]
+        instrument.mark('transform')
+        nodes = children_of(hierarchy, year, node)
+        nodes = nodes[nodes['employees'] >= min_employees]
+
+        parents = nodes[nodes['children'] > 0].sort_values('employees', ascending=False)
+        options = {titled(label, node): node for label, node in zip(parents['label'], parents['node'])}
+
+        def drill_into():
+            target = st.session_state['naics_drill']
+            if target:
+                path.append(options[target])
+                st.session_state['naics_drill'] = ''
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(' > '.join(node_label(hierarchy, n) for n in path))
+            if len(path) > 1:
+                st.button('Up one level', on_click=path.pop)
+        with col2:
+            st.selectbox('Drill into', [''] + list(options), key='naics_drill', on_change=drill_into)
+
+        if nodes.empty:
+            st.write('No industries match the current filters.')
+        else:
+            instrument.mark('figure')
+            fig = px.treemap(
+                nodes,
+                path=[px.Constant(node_label(hierarchy, node)), 'display_label'],
+                values='employees',
+                color=rate,
+                color_continuous_scale='reds',
+                hover_data={'establishments': True, 'injuries': True, rate: ':.4f'},
+            )
+            fig.update_traces(texttemplate='%{label}', textfont_size=14)
+            fig.update_layout(height=800)
+            instrument.plotly_chart(fig, use_container_width=True)
+
+    else:
+        filtered_df = load_treemap_data(year)
+        instrument.mark('transform')
+        filtered_df['injury_rate'] = filtered_df['total_injuries'] / filtered_df['total_employees']
+        filtered_df = filtered_df[filtered_df['total_employees'] > 50000]
+
+        # Cap the industry description and format labels with wrapping (each distinct description once)
+        descriptions = filtered_df['industry_description'].astype(str).astype('category')
+        wrapped = descriptions.cat.categories.map(wrap_text).to_numpy()
+        filtered_df['wrapped_industry_description'] = wrapped[descriptions.cat.codes.to_numpy()]
+        filtered_df['label'] = filtered_df['wrapped_industry_description'].astype(str) + '<br>(' + filtered_df['naics_code'].astype(str) + ')'
+
+        # Plotting
+        instrument.mark('figure')
+        fig = px.treemap(
+            filtered_df,
+            path=['label'],
+            values='total_employees',
+            color='injury_rate',
+            color_continuous_scale='reds',
+        )
+
+        # Update font size and format for treemap text
+        fig.update_traces(texttemplate='%{label}', textfont_size=14)
+
+        fig.update_layout(height=800)  # Adjust height here
+
+        instrument.plotly_chart(fig, use_container_width=True)
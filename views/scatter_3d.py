@@ -0,0 +1,55 @@
+"""3D Scatterplots page: three measures and a color field for one year."""
+import streamlit as st
+
+from osha import instrument
+from osha.scatter import scatter_3d_figure
+from views.loaders import CORRELATION_COLUMNS, PREVIEW_ROWS, load_data
+
+
+def render():
+    # Title of the app
+    st.title("3D Scatter Plot with Plotly and Streamlit")
+
+    year_col, mode_col = st.columns(2)
+    with year_col:
+        year = st.selectbox("Select year for data", list(reversed(range(2016, 2024))), index=7)
+    with mode_col:
+        # How to stay within the 3D point budget when the year has more points
+        reduce_mode = st.radio("Large data", ['Sampled', 'Voxel'], horizontal=True)
+
+    # Shared cached loader (injury_rate is precomputed)
+    df = load_data(year, CORRELATION_COLUMNS)
+    instrument.mark('transform')
+
+    # Display a capped, paginated preview of the DataFrame
+    st.write("DataFrame:")
+    page_count = max((len(df) - 1) // PREVIEW_ROWS + 1, 1)
+    preview_page = st.number_input(f"Page (of {page_count:,})", min_value=1, max_value=page_count, value=1)
+    instrument.dataframe(df.iloc[(preview_page - 1) * PREVIEW_ROWS:preview_page * PREVIEW_ROWS])
+
+    # Axis choices limited to numeric columns
+    numeric_fields = df.select_dtypes(include=['number']).columns.tolist()
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    # Placeholder for 3D scatter plot fields
+    with col1:
+        x_field = st.selectbox("Select X-axis field", numeric_fields, index=numeric_fields.index('annual_average_employees'))
+    with col2:
+        y_field = st.selectbox("Select Y-axis field", numeric_fields, index=numeric_fields.index('total_dafw_days'))
+    with col3:
+        z_field = st.selectbox("Select Z-axis field", numeric_fields, index=numeric_fields.index('total_injuries'))
+    with col4:
+        color_field = st.selectbox("Select Color field", numeric_fields, index=numeric_fields.index('injury_rate'))
+    with col5:
+        injury_rate_range = st.slider("Injury Rate Range", 0.0, 1.0, (0.3, 1.0))
+
+    # Filter the DataFrame based on the selected injury rate range
+    df_filtered = df[(df['injury_rate'] >= injury_rate_range[0]) & (df['injury_rate'] <= injury_rate_range[1])]
+
+    # Create 3D scatter plot within the point budget
+    instrument.mark('figure')
+    fig, note = scatter_3d_figure(df_filtered, x_field, y_field, z_field, color_field, reduce_mode)
+    st.caption(note)
+    
+    # Display the 3D scatter plot
+    instrument.plotly_chart(fig, use_container_width=True)
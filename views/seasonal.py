@@ -0,0 +1,68 @@
+"""Seasonal Injury Patterns page: case counts by month and weekday from the case-detail data."""
+import plotly.express as px
+import streamlit as st
+
+from osha import instrument
+from osha.cases import INCIDENT_OUTCOMES, INCIDENT_TYPES, WEEKDAYS, filter_counts, seasonal_index
+from osha.naics import SECTOR_NAMES, sector_of
+from views.loaders import load_case_counts
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def render():
+    st.title("Seasonal Variation in Workplace Injuries")
+
+    # Precomputed by scripts/ingest_case_detail.py; the cases themselves are never loaded here
+    counts = load_case_counts()
+    if counts is None:
+        st.warning("No case counts found. Run scripts/ingest_case_detail.py on the ITA case detail files first.")
+        return
+    monthly, weekday = counts
+
+    # Filters
+    col1, col2 = st.columns(2)
+    states = col1.multiselect("States", sorted(monthly['state'].astype(str).unique()))
+    sectors_present = sorted(sector_of(monthly['naics_prefix'].astype(str).unique()).unique())
+    sectors = col2.multiselect(
+        "Industry sectors", sectors_present, format_func=lambda node: SECTOR_NAMES.get(node, f'Sector {node}')
+    )
+    col3, col4 = st.columns(2)
+    outcomes = col3.multiselect("Incident outcome", list(INCIDENT_OUTCOMES), format_func=INCIDENT_OUTCOMES.get)
+    types = col4.multiselect("Type of incident", list(INCIDENT_TYPES), format_func=INCIDENT_TYPES.get)
+
+    instrument.mark('transform')
+    selected_monthly = filter_counts(monthly, states, sectors, outcomes, types)
+    selected_weekday = filter_counts(weekday, states, sectors, outcomes, types)
+    if selected_monthly.empty:
+        st.write("No cases match the selected filters.")
+        return
+
+    series = selected_monthly.groupby('month', as_index=False)[['cases', 'dafw_days']].sum()
+    by_month = seasonal_index(selected_monthly)
+    by_month['month_name'] = [MONTH_NAMES[m - 1] for m in by_month['month_of_year']]
+    by_weekday = selected_weekday.groupby('weekday', as_index=False)['cases'].sum()
+    by_weekday['day'] = [WEEKDAYS[d] for d in by_weekday['weekday']]
+    by_weekday['share'] = by_weekday['cases'] / by_weekday['cases'].sum()
+
+    st.write(f"**{series['cases'].sum():,} cases** with a known incident date match the selection.")
+
+    instrument.mark('figure')
+    fig_series = px.line(series, x='month', y='cases', markers=True, title='Cases by Month of Incident',
+                         labels={'month': 'Month', 'cases': 'Cases'})
+    fig_index = px.bar(by_month, x='month_name', y='seasonal_index', hover_data=['cases', 'cases_per_day'],
+                       title='Seasonal Index (cases per day relative to the average day)',
+                       labels={'month_name': 'Month', 'seasonal_index': 'Seasonal index'})
+    fig_index.add_hline(y=1.0, line_dash='dash', line_color='gray')
+    fig_weekday = px.bar(by_weekday, x='day', y='share', hover_data=['cases'],
+                         title='Share of Cases by Day of the Week', labels={'day': 'Day', 'share': 'Share of cases'})
+    fig_weekday.update_layout(yaxis_tickformat='.0%')
+
+    instrument.plotly_chart(fig_series, use_container_width=True)
+
+    st.write("""
+    The seasonal index divides the cases per day of each calendar month by the average cases per day, so months of
+    different lengths compare fairly. Values above 1 mark months with more incidents than an average month.
+    """)
+    instrument.plotly_chart(fig_index, use_container_width=True)
+    instrument.plotly_chart(fig_weekday, use_container_width=True)
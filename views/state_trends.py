@@ -0,0 +1,66 @@
+"""State Injury Rate Trends page: injuries per employee by state and year."""
+import plotly.express as px
+import streamlit as st
+
+from osha import instrument
+from views.loaders import load_state_data, state_pivot
+from views.styling import style_gradient
+
+
+def render():
+    # Load the preprocessed data
+    state_year_metrics = load_state_data()
+    instrument.mark('transform')
+
+    # Calculate global min and max for the color scale
+    global_min = state_year_metrics['avg_injuries_per_employee'].min()
+    global_max = state_year_metrics['avg_injuries_per_employee'].max()
+
+    # Pivot table for state-wise metrics
+    pivot_table = state_pivot(state_year_metrics)
+
+    # Plotly choropleth map animation
+    instrument.mark('figure')
+    fig_choropleth = px.choropleth(
+        state_year_metrics,
+        locations='state',
+        locationmode='USA-states',
+        color='avg_injuries_per_employee',
+        hover_name='state',
+        animation_frame='year',
+        scope='usa',
+        title='Cumulative Average of Injuries per Employee by State Over Time',
+        color_continuous_scale='viridis',
+        range_color=(global_min, global_max), # Set consistent color scale
+        height=800,
+    )
+
+    # Plotly line graph
+    fig_line = px.line(
+        state_year_metrics,
+        x='year',
+        y='avg_injuries_per_employee',
+        color='state',
+        title='Average Injuries per Employee by State Over Time',
+        height=800,
+    )
+
+    styled_table = style_gradient(pivot_table, 'Viridis')
+
+    # Streamlit app layout
+    st.title("Injury Rate (injuries/employees) by State (2016-2023)")
+
+    # Display dataframe
+    instrument.dataframe(state_year_metrics, hide_index=True, use_container_width=True)
+    
+    instrument.plotly_chart(fig_choropleth, use_container_width=True)
+
+    st.write("### State-wise Metrics Over Time")
+    st.write("""
+    This table shows the average injuries per employee for each state over the years with a color scale.
+    """)
+
+    # Display the styled pivot table
+    instrument.dataframe(styled_table.format("{:.4f}"),use_container_width=True)
+
+    instrument.plotly_chart(fig_line, use_container_width=True)
@@ -0,0 +1,23 @@
+"""Cached heat styling shared by the table pages."""
+from osha import instrument
+from osha.styling import gradient_styles, row_heat_styles
+
+
+@instrument.cache_data
+def row_heat(frame, skip_rows=()):
+    # CSS of the black-to-red row scale, computed once per table
+    return row_heat_styles(frame, skip_rows)
+
+
+@instrument.cache_data
+def gradient(frame, colorscale='Viridis', axis=0):
+    # CSS of a column-wise background gradient, computed once per table
+    return gradient_styles(frame, colorscale, axis)
+
+
+def style_rows(frame, skip_rows=()):
+    return frame.style.apply(lambda _: row_heat(frame, tuple(skip_rows)), axis=None)
+
+
+def style_gradient(frame, colorscale='Viridis', axis=0):
+    return frame.style.apply(lambda _: gradient(frame, colorscale, axis), axis=None)